@@ -2,61 +2,117 @@
 """
 Sail Purchase Heatmap Generator for Fleet22_us repository
 Generates heatmaps showing sail purchases by hull, year, sail type, and sailmaker.
+Each hull's slice is taken from the sail cube once and hashed; only hulls whose
+slice changed since the last run (per manifest.json in the output directory)
+are re-rendered, across a process pool whose workers read the sail tags from a
+shared-memory block instead of receiving pickled frames.
 """
 import sys
+import hashlib
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 from pathlib import Path
-import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
+import numpy as np
 from tqdm import tqdm
 
 # Add scripts directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'scripts'))
 
 from utils.logger import setup_logger
-from utils.data_loader import load_json
+from utils.data_loader import load_json, save_json
 from utils.path_utils import PROJECT_ROOT
+from utils.sailmakers import get_canonicalizer
+from utils.shared_dataset import SharedFleetDataset
+from processors.build_sail_cube import load_sail_cube
 
 # Setup logging
 logger = setup_logger('heatmap_generator', PROJECT_ROOT / 'logs' / 'analysis.log')
 
-def load_sail_data(file_path):
-    """Load and prepare sail data for analysis."""
-    try:
-        logger.info(f"Loading sail data from {file_path}")
-        df = pd.read_json(file_path)
-        
-        # Convert "Delivery Date" to datetime and "Fleet" to string for proper filtering
-        df["Delivery Date"] = pd.to_datetime(df["Delivery Date"], errors='coerce')
-        df = df.dropna(subset=["Delivery Date"])  # Drop rows where 'Delivery Date' is NaT
-        df["Fleet"] = df["Fleet"].astype(str)
-        
-        logger.info(f"Loaded {len(df)} sail records")
-        return df
-        
-    except Exception as e:
-        logger.error(f"Error loading sail data: {e}")
-        raise
+# Bump when the figure layout changes so every heatmap is re-rendered
+LAYOUT_VERSION = 1
+DPI = 300
 
-def filter_fleet_data(df, fleet_number='22'):
-    """Filter data for a specific fleet."""
-    fleet_data = df[df['Fleet'] == fleet_number]
-    logger.info(f"Found {len(fleet_data)} records for Fleet {fleet_number}")
-    return fleet_data
+# Set in each pool worker by _attach_sail_tags
+_worker_state = {}
 
-def generate_hull_heatmap(hull_data, hull_number, output_dir):
-    """Generate and save a heatmap for a specific hull."""
-    try:
-        # Group by year, sail type, and sailmaker
-        hull_purchases = hull_data.groupby([
-            hull_data['Delivery Date'].dt.year,
-            'Sail Type',
-            'Sailmaker'
-        ]).size().unstack(level=[1, 2], fill_value=0)
-        
+
+def hull_frames(cube, hulls):
+    """Year x 'sail type sailmaker' purchase frame for each hull, from the cube."""
+    frames = {}
+    for hull in hulls:
+        # Year x (sail type, sailmaker) slice for this hull
+        hull_purchases = cube.slice(hull=hull).to_frame('year', ('sail_type', 'sailmaker'))
         hull_purchases.columns = [' '.join(col).strip() for col in hull_purchases.columns.values]
-        
+        frames[hull] = hull_purchases
+    return frames
+
+
+def shared_hull_frame(dataset, hull, makers=None):
+    """
+    Year x 'sail type sailmaker' purchase frame for one hull, read straight from
+    the shared sail tag columns; matches hull_frames() for the same sail tags.
+
+    Args:
+        dataset: Attached SharedFleetDataset holding a 'sail_tags' table
+        hull: Hull number
+        makers: Canonical sailmaker per Sailmaker category (default: computed)
+    """
+    import pandas as pd
+
+    rows = dataset.rows_where('sail_tags', 'Hull', str(hull))
+    delivered = dataset.column('sail_tags', 'Delivery Date')[rows]
+    rows = rows[~np.isnat(delivered)]
+    delivered = delivered[~np.isnat(delivered)]
+    if makers is None:
+        canonical = get_canonicalizer().canonical
+        makers = np.array([canonical(m) for m in dataset.categories('sail_tags', 'Sailmaker')], dtype=object)
+
+    sail_types = dataset.categories('sail_tags', 'Sail Type')[dataset.column('sail_tags', 'Sail Type')[rows]]
+    hull_purchases = pd.crosstab(
+        pd.Index(delivered.astype('datetime64[Y]').astype(int) + 1970, name='year'),
+        [pd.Index(sail_types, name='sail_type'),
+         pd.Index(makers[dataset.column('sail_tags', 'Sailmaker')[rows]], name='sailmaker')],
+    )
+    hull_purchases.columns = [' '.join(col).strip() for col in hull_purchases.columns.values]
+    return hull_purchases
+
+
+def _attach_sail_tags(name):
+    """Pool initializer: map the shared sail tags and canonicalize sailmakers once."""
+    dataset = SharedFleetDataset.attach(name)
+    canonical = get_canonicalizer().canonical
+    _worker_state['dataset'] = dataset
+    _worker_state['makers'] = np.array(
+        [canonical(m) for m in dataset.categories('sail_tags', 'Sailmaker')], dtype=object)
+
+
+def frame_hash(hull, frame):
+    """Content hash of everything a hull's heatmap is drawn from."""
+    payload = frame.to_json(orient='split')
+    return hashlib.sha256(f"{LAYOUT_VERSION}:{DPI}:{hull}:{payload}".encode()).hexdigest()
+
+
+def render_heatmap(job):
+    """
+    Render and save one hull's heatmap (runs in a worker process).
+
+    Args:
+        job: (hull_number, hull_purchases frame, output_path); a frame of
+            None is built from the worker's shared sail tags
+
+    Returns:
+        (hull_number, output_path)
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    hull_number, hull_purchases, file_path = job
+    if hull_purchases is None:
+        hull_purchases = shared_hull_frame(_worker_state['dataset'], hull_number, _worker_state['makers'])
+    try:
         # Create the heatmap
         plt.figure(figsize=(12, 8))
         sns.heatmap(
@@ -70,23 +126,82 @@ def generate_hull_heatmap(hull_data, hull_number, output_dir):
         plt.xlabel('Year')
         plt.ylabel('Sail Type and Sailmaker')
         plt.tight_layout()
-        
+
         # Save the heatmap
-        file_path = output_dir / f'hull_{hull_number}_heatmap.png'
-        plt.savefig(file_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        logger.info(f"Saved heatmap for Hull {hull_number}")
-        return file_path
-        
-    except Exception as e:
-        logger.error(f"Error generating heatmap for Hull {hull_number}: {e}")
-        plt.close()
-        raise
+        plt.savefig(file_path, dpi=DPI, bbox_inches='tight')
+        return hull_number, str(file_path)
+    finally:
+        plt.close('all')
+
+
+def generate_heatmaps(cube, hulls, output_dir, workers=None, force=False, sails_file=None):
+    """
+    Render heatmaps for hulls whose data changed and update the manifest.
+
+    Manifest entries for hulls not in `hulls` are kept, so runs over a
+    subset of fleets or hulls do not invalidate each other. With a pool and a
+    `sails_file`, the sail tags are placed in shared memory once and workers
+    build their hull's frame from it; otherwise frames are pickled per job.
+
+    Returns:
+        (rendered, skipped) lists of hulls
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / 'manifest.json'
+    manifest = load_json(manifest_path) if manifest_path.exists() else {}
+    entries = manifest.get('heatmaps', {})
+    fleet_of = dict(zip(cube.axis_labels('hull'), (cube.fleets[i] for i in cube.hull_fleet)))
+
+    jobs, skipped = [], []
+    for hull, frame in hull_frames(cube, hulls).items():
+        content_hash = frame_hash(hull, frame)
+        filename = f'hull_{hull}_heatmap.png'
+        previous = entries.get(hull)
+        if (not force and previous and previous['sha256'] == content_hash
+                and (output_dir / previous['file']).exists()):
+            skipped.append(hull)
+            continue
+        jobs.append((hull, frame, output_dir / filename))
+        entries[hull] = {
+            'fleet': fleet_of.get(hull),
+            'file': filename,
+            'sha256': content_hash,
+            'generated': datetime.now().isoformat(timespec='seconds'),
+        }
+
+    rendered = []
+    if jobs:
+        if workers == 1 or len(jobs) == 1:
+            results = map(render_heatmap, jobs)
+            rendered = [hull for hull, _ in tqdm(results, total=len(jobs), desc="Generating Heatmaps")]
+        elif sails_file is None:
+            rendered = _render_in_pool(jobs, workers)
+        else:
+            with SharedFleetDataset.create({'sail_tags': load_json(Path(sails_file))}) as dataset:
+                rendered = _render_in_pool([(hull, None, path) for hull, _, path in jobs], workers,
+                                           initializer=_attach_sail_tags, initargs=(dataset.name,))
+
+    save_json({
+        'layout': LAYOUT_VERSION,
+        'updated': datetime.now().isoformat(timespec='seconds'),
+        'heatmaps': dict(sorted(entries.items(), key=lambda item: (not item[0].isdigit(), item[0].zfill(6)))),
+    }, manifest_path, create_backup=False)
+
+    logger.info(f"Rendered {len(rendered)} heatmaps, {len(skipped)} unchanged in {output_dir}")
+    return rendered, skipped
+
+
+def _render_in_pool(jobs, workers, initializer=None, initargs=()):
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        chunk = max(1, len(jobs) // ((workers or 4) * 4))
+        results = pool.map(render_heatmap, jobs, chunksize=chunk)
+        return [hull for hull, _ in tqdm(results, total=len(jobs), desc="Generating Heatmaps")]
+
 
 def main():
     parser = argparse.ArgumentParser(
-        description="Generate sail purchase heatmaps for Fleet 22 hulls"
+        description="Generate sail purchase heatmaps for J/105 hulls"
     )
     parser.add_argument(
         '--input',
@@ -102,9 +217,10 @@ def main():
     )
     parser.add_argument(
         '--fleet',
+        nargs='+',
         type=str,
-        default='22',
-        help="Fleet number to analyze (default: 22)"
+        default=['22'],
+        help="Fleet number(s) to analyze, or 'all' for every fleet (default: 22)"
     )
     parser.add_argument(
         '--limit',
@@ -118,57 +234,64 @@ def main():
         type=str,
         help="Specific hull numbers to process (e.g., --hulls 10 128 144)"
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help="Worker processes (1 = render in-process; default: CPU count)"
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help="Re-render every heatmap even if its data is unchanged"
+    )
     args = parser.parse_args()
-    
+
     try:
         logger.info("Starting heatmap generation...")
-        
-        # Load sail data
-        df = load_sail_data(args.input)
-        
-        # Filter for specific fleet
-        fleet_data = filter_fleet_data(df, args.fleet)
-        
-        if len(fleet_data) == 0:
-            logger.warning(f"No data found for Fleet {args.fleet}")
-            print(f"⚠️  No data found for Fleet {args.fleet}")
+
+        # Load pre-aggregated sail cube and slice out the fleets
+        cube = load_sail_cube(args.input)
+        fleets = cube.fleets if 'all' in args.fleet else args.fleet
+        fleet_cube = cube.slice(fleet=fleets)
+        fleet_hulls = fleet_cube.axis_labels('hull')
+        fleet_names = 'all fleets' if 'all' in args.fleet else f"Fleet {', '.join(fleets)}"
+        logger.info(f"Found {len(fleet_hulls)} hulls for {fleet_names}")
+
+        if len(fleet_hulls) == 0:
+            logger.warning(f"No data found for {fleet_names}")
+            print(f"⚠️  No data found for {fleet_names}")
             return 1
-        
+
         # Get unique hulls
         if args.hulls:
-            unique_hulls = [h for h in args.hulls if h in fleet_data['Hull'].astype(str).values]
+            unique_hulls = [h for h in args.hulls if h in fleet_hulls]
             logger.info(f"Processing specified hulls: {unique_hulls}")
         else:
-            unique_hulls = fleet_data['Hull'].unique()
+            unique_hulls = fleet_hulls
             if args.limit:
                 unique_hulls = unique_hulls[:args.limit]
                 logger.info(f"Limited to first {args.limit} hulls")
-        
-        # Create output directory
-        args.output.mkdir(parents=True, exist_ok=True)
+
         logger.info(f"Output directory: {args.output}")
-        
+
         # Generate heatmaps
-        print(f"Generating heatmaps for {len(unique_hulls)} hulls...")
-        generated_files = []
-        
-        for hull in tqdm(unique_hulls, desc="Generating Heatmaps"):
-            hull_data = fleet_data[fleet_data['Hull'] == hull]
-            if len(hull_data) > 0:
-                file_path = generate_hull_heatmap(hull_data, hull, args.output)
-                generated_files.append(file_path)
-        
+        print(f"Generating heatmaps for {len(unique_hulls)} hulls ({fleet_names})...")
+        rendered, skipped = generate_heatmaps(fleet_cube, unique_hulls, args.output,
+                                              workers=args.workers, force=args.force,
+                                              sails_file=args.input)
+
         # Summary
-        print(f"\n✅ Successfully generated {len(generated_files)} heatmaps")
+        print(f"\n✅ Generated {len(rendered)} heatmaps, {len(skipped)} unchanged")
         print(f"📁 Saved to: {args.output}")
-        logger.info(f"Completed heatmap generation: {len(generated_files)} files")
-        
+        logger.info(f"Completed heatmap generation: {len(rendered)} rendered, {len(skipped)} skipped")
+
         return 0
-        
+
     except Exception as e:
         logger.error(f"Error during heatmap generation: {e}")
         print(f"❌ Error: {e}")
         return 1
 
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -7,7 +7,7 @@ class SailAnalysisHeatmap {
     constructor(containerId, dataPath) {
         this.containerId = containerId;
         this.dataPath = dataPath;
-        this.sailData = [];
+        this.cube = null;
         this.currentHull = null;
         this.tooltip = null;
         this.init();
@@ -29,7 +29,21 @@ class SailAnalysisHeatmap {
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
-        this.sailData = await response.json();
+        // Pre-aggregated hull x year x sail type x sailmaker cube
+        this.cube = await response.json();
+    }
+
+    hullCells(hull) {
+        const hullIndex = this.cube.axes.hull.indexOf(hull);
+        const { year, sail_type: sailTypes, sailmaker } = this.cube.axes;
+        return this.cube.cells
+            .filter(([h]) => h === hullIndex)
+            .map(([h, y, t, m, count]) => ({
+                year: year[y],
+                sailType: sailTypes[t],
+                sailmaker: sailmaker[m],
+                count
+            }));
     }
 
     setupTooltip() {
@@ -41,7 +55,7 @@ class SailAnalysisHeatmap {
 
     populateHullDropdown() {
         const hullSelect = document.getElementById('hullSelect');
-        const hulls = [...new Set(this.sailData.map(item => item.Hull))]
+        const hulls = [...this.cube.axes.hull]
             .sort((a, b) => parseInt(a) - parseInt(b));
         
         hullSelect.innerHTML = '<option value="">Select a hull...</option>';
@@ -63,7 +77,7 @@ class SailAnalysisHeatmap {
     }
 
     updateVisualization(hull) {
-        const hullData = this.sailData.filter(item => item.Hull === hull);
+        const hullData = this.hullCells(hull);
         
         if (hullData.length === 0) {
             this.showNoData();
@@ -78,34 +92,13 @@ class SailAnalysisHeatmap {
     }
 
     processDataForHeatmap(hullData) {
-        const summary = {};
-        
-        hullData.forEach(({ 'Sail Type': sailType, 'Sailmaker': sailmaker, 'Delivery Date': date }) => {
-            if (!date) return;
-            
-            const year = new Date(date).getFullYear().toString();
-            const key = `${sailType} (${sailmaker})`;
-
-            if (!summary[key]) {
-                summary[key] = {};
-            }
-
-            if (!summary[key][year]) {
-                summary[key][year] = 0;
-            }
-
-            summary[key][year] += 1;
-        });
-
-        return Object.entries(summary).flatMap(([key, years]) => {
-            return Object.entries(years).map(([year, count]) => ({
-                key, 
-                year: parseInt(year), 
-                count,
-                sailType: key.split(' (')[0],
-                sailmaker: key.split(' (')[1].replace(')', '')
-            }));
-        });
+        return hullData.map(({ year, sailType, sailmaker, count }) => ({
+            key: `${sailType} (${sailmaker})`,
+            year,
+            count,
+            sailType,
+            sailmaker
+        }));
     }
 
     createHeatmap(data, hull) {
@@ -233,10 +226,10 @@ class SailAnalysisHeatmap {
 
     updateStats(hull, hullData) {
         const statsDiv = document.getElementById('hullStats');
-        const totalSails = hullData.length;
-        const sailmakers = [...new Set(hullData.map(item => item.Sailmaker))];
-        const sailTypes = [...new Set(hullData.map(item => item['Sail Type']))];
-        const years = [...new Set(hullData.map(item => new Date(item['Delivery Date']).getFullYear()))];
+        const totalSails = hullData.reduce((sum, item) => sum + item.count, 0);
+        const sailmakers = [...new Set(hullData.map(item => item.sailmaker))];
+        const sailTypes = [...new Set(hullData.map(item => item.sailType))];
+        const years = [...new Set(hullData.map(item => item.year))];
 
         statsDiv.innerHTML = `
             <strong>Hull ${hull} Statistics:</strong><br>
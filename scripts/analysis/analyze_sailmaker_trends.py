@@ -8,7 +8,6 @@ import argparse
 from pathlib import Path
 from datetime import datetime
 
-import pandas as pd
 import matplotlib.pyplot as plt
 
 # Add parent directory to path for imports
@@ -16,38 +15,25 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from utils.logger import setup_logger
 from utils.path_utils import PROJECT_ROOT, SAILS_FILE
+from utils.sailmakers import get_canonicalizer
+from processors.build_sail_cube import load_sail_cube
+from analysis.sailmaker_share import MarketShare
 
 # Setup logging
 logger = setup_logger('sailmaker_analysis', PROJECT_ROOT / 'logs' / 'scraping.log')
 
-def load_sail_data(file_path):
-    """Load sail tags data from JSON file."""
-    try:
-        df = pd.read_json(file_path)
-        logger.info(f"Loaded {len(df)} sail records from {file_path}")
-        return df
-    except Exception as e:
-        logger.error(f"Error loading sail data: {e}")
-        raise
-
-def analyze_sailmaker_trends(df, sailmakers=None, output_path=None):
-    """Analyze and visualize sailmaker purchase trends."""
+def analyze_sailmaker_trends(engine, sailmakers=None, output_path=None, sail_type=None, fleet=None):
+    """Analyze and visualize sailmaker purchase trends from the market share table."""
     if sailmakers is None:
         sailmakers = ['Quantum', 'North', 'Ullman']
     
-    # Filter for specified sailmakers
-    filtered_data = df[df['Sailmaker'].isin(sailmakers)].copy()
-    logger.info(f"Analyzing {len(filtered_data)} records for sailmakers: {', '.join(sailmakers)}")
-    
-    # Ensure 'Delivery Date' is in datetime format
-    filtered_data['Delivery Date'] = pd.to_datetime(filtered_data['Delivery Date'], errors='coerce')
-    filtered_data = filtered_data.dropna(subset=['Delivery Date'])
-    
-    # Extract year
-    filtered_data['Year'] = filtered_data['Delivery Date'].dt.year
-    
-    # Group by year and sailmaker, then count purchases
-    annual_purchases = filtered_data.groupby(['Year', 'Sailmaker']).size().unstack(fill_value=0)
+    # Year x sailmaker counts from the cumulative table; drop years with no sales
+    annual_purchases = engine.annual(sailmakers, sail_type=sail_type, fleet=fleet)
+    annual_purchases = annual_purchases.loc[annual_purchases.sum(axis=1) > 0,
+                                            annual_purchases.sum(axis=0) > 0]
+    annual_purchases.index.name = 'Year'
+    annual_purchases.columns.name = 'Sailmaker'
+    logger.info(f"Analyzing {int(annual_purchases.values.sum())} records for sailmakers: {', '.join(sailmakers)}")
     
     # Log summary statistics
     logger.info(f"Analysis period: {annual_purchases.index.min()} - {annual_purchases.index.max()}")
@@ -81,7 +67,8 @@ def analyze_sailmaker_trends(df, sailmakers=None, output_path=None):
     for sailmaker in sailmakers:
         if sailmaker in annual_purchases.columns:
             total = annual_purchases[sailmaker].sum()
-            print(f"  {sailmaker}: {total}")
+            share = engine.share(sailmaker, sail_type=sail_type, fleet=fleet)
+            print(f"  {sailmaker}: {total} ({share:.1%} of all sails)")
     
     return annual_purchases
 
@@ -101,6 +88,20 @@ def main():
         default=['Quantum', 'North', 'Ullman'],
         help="List of sailmakers to analyze (default: Quantum North Ullman)"
     )
+    parser.add_argument(
+        '--top',
+        type=int,
+        help="Chart the N best-selling sailmakers instead of --sailmakers"
+    )
+    parser.add_argument(
+        '--fleet',
+        help="Only count sails for hulls in this fleet"
+    )
+    parser.add_argument(
+        '--type',
+        dest='sail_type',
+        help="Only count this sail type (e.g. M, J, S89)"
+    )
     parser.add_argument(
         '--output',
         type=Path,
@@ -117,11 +118,17 @@ def main():
     try:
         logger.info("Starting sailmaker trends analysis...")
         
-        # Load data
-        df = load_sail_data(args.input)
+        # Load pre-aggregated cube (rebuilt if older than the sail tags)
+        engine = MarketShare.from_cube(load_sail_cube(args.input))
+        # The cube is keyed by canonical maker ("North Sails" -> "North")
+        canonical = get_canonicalizer().canonical
+        sailmakers = list(dict.fromkeys(canonical(m) for m in args.sailmakers))
+        if args.top:
+            sailmakers = engine.top_sailmakers(args.top, sail_type=args.sail_type, fleet=args.fleet)
         
         # Analyze trends
-        results = analyze_sailmaker_trends(df, args.sailmakers, args.output)
+        results = analyze_sailmaker_trends(engine, sailmakers, args.output,
+                                           sail_type=args.sail_type, fleet=args.fleet)
         
         # Optionally display the chart
         if args.show:
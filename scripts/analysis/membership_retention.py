@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Membership retention analysis for Fleet22_us repository
+Builds a hull x year membership matrix from j105_members_status.json and
+computes retention, churn, returning members, cohorts, lapse streaks and
+per-fleet renewal curves with array operations.
+
+Each members snapshot only records the latest paid year per member record,
+so history comes from every record on a hull (owners, co-owners) plus older
+snapshots: files passed with --members and/or committed versions of the
+members file read with --git-history. Years are unioned per hull. With only
+one distinct snapshot there is no year-over-year history, so the outputs are
+marked "single_snapshot" and the retention, churn, cohort and lapse figures
+(and the renewal chart) are left out.
+"""
+import sys
+import csv
+import json
+import argparse
+import subprocess
+from pathlib import Path
+from datetime import datetime
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.logger import setup_logger
+from utils.data_loader import load_json, save_json
+from utils.membership_index import MembershipIndex, BASE_YEAR
+from utils.path_utils import PROJECT_ROOT, MEMBERS_FILE, MEMBERS_DATA
+
+# Setup logging
+logger = setup_logger('membership_retention', PROJECT_ROOT / 'logs' / 'scraping.log')
+
+CURRENT_YEAR = datetime.now().year
+
+
+def load_git_snapshots(limit, members_file=MEMBERS_FILE):
+    """Return the member records of up to `limit` previous commits of the members file, one list per commit."""
+    rel_path = Path(members_file).resolve().relative_to(PROJECT_ROOT.resolve())
+    try:
+        revisions = subprocess.run(
+            ['git', 'log', f'-{limit}', '--format=%H', '--', str(rel_path)],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.split()
+    except (OSError, subprocess.CalledProcessError) as e:
+        logger.warning(f"Could not read git history for {rel_path}: {e}")
+        return []
+
+    snapshots = []
+    for rev in revisions:
+        shown = subprocess.run(
+            ['git', 'show', f'{rev}:{rel_path}'],
+            cwd=PROJECT_ROOT, capture_output=True, text=True
+        )
+        if shown.returncode != 0:
+            continue
+        try:
+            snapshots.append(json.loads(shown.stdout))
+        except json.JSONDecodeError:
+            logger.warning(f"Skipping unparsable snapshot {rev[:8]}")
+    logger.info(f"Loaded {len(snapshots)} historical member snapshots from git")
+    return snapshots
+
+
+def build_membership_matrix(index, include_associates=False, end_year=CURRENT_YEAR):
+    """
+    Return (hulls, fleets, years, matrix) where matrix[h, y] is True when
+    hull h held a paid class membership in years[y].
+
+    The matrix runs to `end_year` or the latest paid year, whichever is later,
+    so memberships already paid for a future season are kept.
+    """
+    hulls = np.array(index.hulls(), dtype=object)
+    fleets = np.array([index.fleet(h) for h in hulls], dtype=object)
+    raw_bits = [index.year_bits(h, include_associates) for h in hulls]
+    bits = np.array(raw_bits, dtype=np.uint64)
+    end_year = max([end_year] + [BASE_YEAR + b.bit_length() - 1 for b in raw_bits if b])
+
+    offsets = np.arange(end_year - BASE_YEAR + 1, dtype=np.uint64)
+    matrix = ((bits[:, None] >> offsets[None, :]) & np.uint64(1)).astype(bool)
+
+    # Trim leading years nobody paid in
+    active_cols = np.flatnonzero(matrix.any(axis=0))
+    start = active_cols[0] if len(active_cols) else len(offsets) - 1
+    years = BASE_YEAR + np.arange(start, len(offsets))
+    return hulls, fleets, years, matrix[:, start:]
+
+
+def yearly_flows(matrix):
+    """Active, new, retained, returning and churned counts per year (arrays)."""
+    prev = np.zeros_like(matrix)
+    prev[:, 1:] = matrix[:, :-1]
+    # Paid at any point before the previous year
+    seen_before = np.zeros_like(matrix)
+    seen_before[:, 2:] = np.logical_or.accumulate(matrix, axis=1)[:, :-2]
+
+    active = matrix.sum(axis=0)
+    retained = (matrix & prev).sum(axis=0)
+    returning = (matrix & ~prev & seen_before).sum(axis=0)
+    new = (matrix & ~prev & ~seen_before).sum(axis=0)
+    churned = (prev & ~matrix).sum(axis=0)
+
+    prev_active = prev.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        retention_rate = np.where(prev_active > 0, retained / prev_active, np.nan)
+    return {
+        'active': active,
+        'new': new,
+        'retained': retained,
+        'returning': returning,
+        'churned': churned,
+        'retention_rate': retention_rate,
+        'churn_rate': 1 - retention_rate,
+    }
+
+
+def lapse_streaks(matrix):
+    """Per-hull first/last paid column and longest gap between them."""
+    n_years = matrix.shape[1]
+    ever = matrix.any(axis=1)
+    first = np.where(ever, matrix.argmax(axis=1), -1)
+    last = np.where(ever, n_years - 1 - matrix[:, ::-1].argmax(axis=1), -1)
+
+    cols = np.arange(n_years)
+    within = (cols[None, :] >= first[:, None]) & (cols[None, :] <= last[:, None])
+    gaps = within & ~matrix
+
+    # Run length of consecutive gap years, reset at every paid year
+    positions = np.broadcast_to(cols + 1, gaps.shape)
+    last_reset = np.maximum.accumulate(np.where(gaps, 0, positions), axis=1)
+    runs = np.where(gaps, positions - last_reset, 0)
+    return first, last, runs.max(axis=1) if n_years else np.zeros(len(matrix), dtype=int)
+
+
+def cohort_retention(matrix, first):
+    """
+    Share of each first-year cohort still paid k years later.
+
+    Returns:
+        (cohort_sizes, table) where table[c, k] is NaN when c + k is in the future
+    """
+    n_hulls, n_years = matrix.shape
+    has_cohort = first >= 0
+    sizes = np.bincount(first[has_cohort], minlength=n_years)
+
+    counts = np.zeros((n_years, n_years), dtype=np.int64)
+    rows, cols = np.nonzero(matrix & has_cohort[:, None])
+    ks = cols - first[rows]
+    np.add.at(counts, (first[rows], ks), 1)
+
+    c, k = np.indices((n_years, n_years))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        table = np.where((c + k < n_years) & (sizes[:, None] > 0), counts / sizes[:, None], np.nan)
+    return sizes, table
+
+
+def fleet_renewal_curves(matrix, fleets, min_boats=5):
+    """Retention rate per year for each fleet with at least `min_boats` members ever."""
+    fleet_labels, fleet_idx = np.unique(fleets.astype(str), return_inverse=True)
+    prev = np.zeros_like(matrix)
+    prev[:, 1:] = matrix[:, :-1]
+
+    prev_active = np.zeros((len(fleet_labels), matrix.shape[1]), dtype=np.int64)
+    retained = np.zeros_like(prev_active)
+    np.add.at(prev_active, fleet_idx, prev)
+    np.add.at(retained, fleet_idx, matrix & prev)
+
+    ever = np.bincount(fleet_idx, weights=matrix.any(axis=1), minlength=len(fleet_labels))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rates = np.where(prev_active > 0, retained / prev_active, np.nan)
+    return {
+        fleet: rates[i] for i, fleet in enumerate(fleet_labels) if ever[i] >= min_boats
+    }
+
+
+def _clean(values):
+    return [None if isinstance(v, float) and np.isnan(v) else v for v in np.asarray(values).tolist()]
+
+
+def analyze_retention(members_files, include_associates=False, output_dir=MEMBERS_DATA,
+                      chart_path=None, min_fleet_boats=5, git_history=0):
+    """Run the full retention analysis and write JSON, CSV and chart outputs."""
+    snapshots = [load_json(Path(path)) for path in members_files]
+    if git_history:
+        snapshots.extend(load_git_snapshots(git_history))
+    distinct = {json.dumps(snapshot, sort_keys=True) for snapshot in snapshots}
+    single_snapshot = len(distinct) <= 1
+    if single_snapshot:
+        logger.warning("Only one distinct members snapshot; omitting retention and churn figures")
+    index = MembershipIndex.from_records([r for snapshot in snapshots for r in snapshot])
+
+    hulls, fleets, years, matrix = build_membership_matrix(index, include_associates)
+    future = years > CURRENT_YEAR
+    years_after_current = {int(y): int(n) for y, n in zip(years[future], matrix[:, future].sum(axis=0))}
+    if years_after_current:
+        logger.warning(f"Memberships paid for years after {CURRENT_YEAR}: {years_after_current}")
+    flows = yearly_flows(matrix)
+    first, last, longest_gap = lapse_streaks(matrix)
+    cohort_sizes, cohorts = cohort_retention(matrix, first)
+    curves = fleet_renewal_curves(matrix, fleets, min_fleet_boats)
+    # Seasons after the current one are still open; count them but leave rates blank
+    for rates in [flows['retention_rate'], flows['churn_rate']] + list(curves.values()):
+        rates[future] = np.nan
+    logger.info(f"Membership matrix: {matrix.shape[0]} hulls x {matrix.shape[1]} years")
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Per-year table
+    years_csv = output_dir / 'membership_retention_years.csv'
+    with open(years_csv, 'w', newline='') as f:
+        writer = csv.writer(f)
+        if single_snapshot:
+            writer.writerow(['Year', 'Active'])
+            for i, year in enumerate(years):
+                writer.writerow([int(year), int(flows['active'][i])])
+        else:
+            writer.writerow(['Year', 'Active', 'New', 'Retained', 'Returning', 'Churned',
+                             'Retention Rate', 'Churn Rate'])
+            for i, year in enumerate(years):
+                rate = flows['retention_rate'][i]
+                writer.writerow([
+                    int(year), int(flows['active'][i]), int(flows['new'][i]),
+                    int(flows['retained'][i]), int(flows['returning'][i]), int(flows['churned'][i]),
+                    '' if np.isnan(rate) else f"{rate:.3f}",
+                    '' if np.isnan(rate) else f"{1 - rate:.3f}",
+                ])
+
+    # Per-hull table
+    hulls_csv = output_dir / 'membership_retention_hulls.csv'
+    ever = first >= 0
+    with open(hulls_csv, 'w', newline='') as f:
+        writer = csv.writer(f)
+        if single_snapshot:
+            writer.writerow(['Hull', 'Fleet', 'Last Paid', 'Years Since Paid'])
+        else:
+            writer.writerow(['Hull', 'Fleet', 'First Paid', 'Last Paid', 'Years Paid',
+                             'Longest Lapse', 'Years Since Paid'])
+        paid_counts = matrix.sum(axis=1)
+        for i, hull in enumerate(hulls):
+            last_paid = int(years[last[i]]) if ever[i] else ''
+            since = max(CURRENT_YEAR - last_paid, 0) if ever[i] else ''
+            if single_snapshot:
+                writer.writerow([hull, fleets[i], last_paid, since])
+                continue
+            writer.writerow([
+                hull, fleets[i],
+                int(years[first[i]]) if ever[i] else '',
+                last_paid,
+                int(paid_counts[i]),
+                int(longest_gap[i]),
+                since,
+            ])
+
+    summary = {
+        'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'sources': [str(p) for p in members_files],
+        'git_snapshots': git_history,
+        'snapshots': len(distinct),
+        'single_snapshot': single_snapshot,
+        'include_associates': include_associates,
+        'hulls': int(len(hulls)),
+        'hulls_ever_paid': int(ever.sum()),
+        'years': [int(y) for y in years],
+        'years_after_current': years_after_current,
+        'lapsed_hulls': int((ever & (years[np.maximum(last, 0)] < CURRENT_YEAR)).sum()),
+    }
+    if single_snapshot:
+        summary['yearly'] = {'active': _clean(flows['active'])}
+    else:
+        summary['yearly'] = {key: _clean(values) for key, values in flows.items()}
+        summary['cohorts'] = {
+            int(years[c]): {'size': int(cohort_sizes[c]), 'retention': _clean(cohorts[c])}
+            for c in np.flatnonzero(cohort_sizes)
+        }
+        summary['fleet_renewal'] = {fleet: _clean(rates) for fleet, rates in curves.items()}
+    summary_path = output_dir / 'membership_retention.json'
+    save_json(summary, summary_path, create_backup=False)
+    outputs = [summary_path, years_csv, hulls_csv]
+    if single_snapshot:
+        return summary, outputs
+
+    # Chart: overall and per-fleet renewal curves
+    if chart_path is None:
+        chart_path = PROJECT_ROOT / 'scripts' / 'analysis' / 'MembershipRetention.png'
+    fig, ax = plt.subplots(figsize=(14, 7))
+    ax.plot(years, flows['retention_rate'], color='black', linewidth=2.5, label='All fleets')
+    for fleet, rates in curves.items():
+        ax.plot(years, rates, alpha=0.5, linewidth=1, label=f'Fleet {fleet}')
+    ax.set_title('Class Membership Renewal Rate by Year', fontsize=16, fontweight='bold')
+    ax.set_xlabel('Year', fontsize=12)
+    ax.set_ylabel('Share of prior-year members renewing', fontsize=12)
+    ax.set_ylim(0, 1.05)
+    ax.grid(True, alpha=0.3)
+    ax.legend(fontsize=8, ncol=2, loc='lower left')
+    plt.tight_layout()
+    plt.savefig(chart_path, dpi=150, bbox_inches='tight')
+    plt.close(fig)
+    logger.info(f"Chart saved to {chart_path}")
+
+    return summary, outputs + [Path(chart_path)]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Analyze class membership retention and churn by year"
+    )
+    parser.add_argument(
+        '--members',
+        type=Path,
+        nargs='+',
+        default=[MEMBERS_FILE],
+        help="One or more members snapshots to merge (default: current j105_members_status.json)"
+    )
+    parser.add_argument(
+        '--git-history',
+        type=int,
+        default=0,
+        metavar='N',
+        help="Also merge the members file from the last N commits that changed it"
+    )
+    parser.add_argument(
+        '--include-associates',
+        action='store_true',
+        help="Count Associate memberships as paid"
+    )
+    parser.add_argument(
+        '--output-dir',
+        type=Path,
+        default=MEMBERS_DATA,
+        help=f"Directory for JSON/CSV outputs (default: {MEMBERS_DATA})"
+    )
+    parser.add_argument(
+        '--chart',
+        type=Path,
+        default=None,
+        help="Output path for the renewal chart"
+    )
+    parser.add_argument(
+        '--min-fleet-boats',
+        type=int,
+        default=5,
+        help="Only plot fleets with at least this many member hulls (default: 5)"
+    )
+    args = parser.parse_args()
+
+    try:
+        logger.info("Starting membership retention analysis...")
+        started = datetime.now()
+        summary, outputs = analyze_retention(
+            args.members, args.include_associates, args.output_dir,
+            args.chart, args.min_fleet_boats, args.git_history
+        )
+        elapsed = (datetime.now() - started).total_seconds() * 1000
+
+        print(f"✅ Retention analysis for {summary['hulls']} hulls, "
+              f"{summary['years'][0]}-{summary['years'][-1]} ({elapsed:.0f} ms)")
+        print(f"   Hulls ever paid:   {summary['hulls_ever_paid']}")
+        print(f"   Currently lapsed:  {summary['lapsed_hulls']}")
+        for year, count in summary['years_after_current'].items():
+            print(f"⚠️  {count} hulls already paid for {year}")
+        if summary['single_snapshot']:
+            print("💡 Single snapshot: only each record's latest paid year is known, so retention "
+                  "and churn were not computed. Add --git-history N or older --members files.")
+        for path in outputs:
+            print(f"📄 {path}")
+        return 0
+
+    except Exception as e:
+        logger.error(f"Error during retention analysis: {e}")
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Regatta results analysis for Fleet22_us repository
+Reads published results such as data/races/2024_NA_Race_Results.csv (two-line
+"Race" / race-number header, "CAN 83" sail numbers, "27/UFD" penalty cells)
+into a boats x races points matrix, re-scores it with low-point rules from
+regatta_scoring.yaml (discards, penalty points, A8 tiebreaks) and computes
+consistency metrics for the whole fleet with array operations.
+"""
+import sys
+import csv
+import re
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.logger import setup_logger
+from utils.path_utils import PROJECT_ROOT
+from reports.event_roster import sail_number_to_hull
+
+# Setup logging
+logger = setup_logger('regatta_results', PROJECT_ROOT / 'logs' / 'scraping.log')
+
+SCORING_CONFIG_FILE = Path(__file__).parent / 'regatta_scoring.yaml'
+CELL_PATTERN = re.compile(r'^\(?\s*(?P<points>\d+(?:\.\d+)?)?\s*/?\s*(?P<code>[A-Z]{2,4})?\s*\)?$')
+BOAT_COLUMNS = {
+    'Bow': 'bow',
+    'Sail Number': 'sail_number',
+    'Yacht Name': 'yacht',
+    'Yacht Design': 'design',
+    'Owner/Skipper': 'skipper',
+    'Total': 'reported_total',
+}
+TIEBREAKS = ('a8.1', 'a8.2')
+
+
+def load_scoring_config(path=SCORING_CONFIG_FILE):
+    """
+    Load and check the scoring config.
+
+    Raises:
+        ValueError: On an unknown penalty value or tiebreak
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f) or {}
+
+    penalties = {}
+    for code, value in (config.get('penalties') or {}).items():
+        if value not in ('entries+1', 'recorded') and not isinstance(value, (int, float)):
+            raise ValueError(f"Penalty {code} in {path} must be entries+1, recorded or a number")
+        penalties[str(code).upper()] = value
+    tiebreaks = [str(t).lower() for t in config.get('tiebreaks') or []]
+    unknown = set(tiebreaks) - set(TIEBREAKS)
+    if unknown:
+        raise ValueError(f"Unknown tiebreaks in {path}: {', '.join(sorted(unknown))}")
+
+    return {
+        'discards': sorted((int(d['races']), int(d['discards'])) for d in config.get('discards') or []),
+        'penalties': penalties,
+        'not_excludable': [str(c).upper() for c in config.get('not_excludable') or []],
+        'tiebreaks': tiebreaks,
+    }
+
+
+class RegattaResults:
+    """One regatta: boat details plus recorded points and penalty codes per race."""
+
+    def __init__(self, boats, races, points, codes, name=None):
+        self.boats = boats.reset_index(drop=True)
+        self.races = list(races)
+        self.points = np.asarray(points, dtype=float)
+        self.codes = np.asarray(codes, dtype=object)
+        self.name = name
+
+    @classmethod
+    def from_csv(cls, path):
+        """
+        Parse a results CSV.
+
+        Race columns are headed "Race" (numbered on the next header row) or
+        "R1"/"Race 1"; the unnamed first column is the published place.
+        """
+        with open(path, 'r', encoding='utf-8-sig', newline='') as csvfile:
+            rows = [[cell.strip() for cell in row] for row in csv.reader(csvfile) if any(c.strip() for c in row)]
+        if not rows:
+            raise ValueError(f"{path} is empty")
+
+        header = rows[0]
+        race_columns = [i for i, name in enumerate(header) if re.match(r'^(Race|R)\s*\d*$', name, re.IGNORECASE)]
+        if not race_columns:
+            raise ValueError(f"{path} has no race columns")
+        body = rows[1:]
+        # Two-line header: second row holds race numbers and nothing before them
+        if body and not body[0][0] and all(body[0][i].isdigit() for i in race_columns if i < len(body[0])):
+            races = [int(body[0][i]) for i in race_columns]
+            body = body[1:]
+        else:
+            races = [int(re.sub(r'\D', '', header[i]) or n + 1) for n, i in enumerate(race_columns)]
+
+        points = np.full((len(body), len(races)), np.nan)
+        codes = np.full((len(body), len(races)), '', dtype=object)
+        for r, row in enumerate(body):
+            for c, column in enumerate(race_columns):
+                cell = row[column] if column < len(row) else ''
+                match = CELL_PATTERN.match(cell.upper())
+                if not cell or not match:
+                    if cell:
+                        logger.warning(f"{path}: unreadable score {cell!r} for row {r + 1}, race {races[c]}")
+                    continue
+                if match.group('points'):
+                    points[r, c] = float(match.group('points'))
+                codes[r, c] = match.group('code') or ''
+
+        boats = pd.DataFrame({'published_place': [row[0] for row in body]})
+        for name, column in BOAT_COLUMNS.items():
+            position = header.index(name) if name in header else None
+            boats[column] = [row[position] if position is not None and position < len(row) else ''
+                             for row in body]
+        boats['hull'] = boats['sail_number'].map(sail_number_to_hull)
+        boats['reported_total'] = pd.to_numeric(boats['reported_total'], errors='coerce')
+        boats['published_place'] = pd.to_numeric(boats['published_place'], errors='coerce')
+        logger.info(f"Read {len(boats)} boats x {len(races)} races from {path}")
+        return cls(boats, races, points, codes, name=Path(path).stem)
+
+    def race_points(self, config):
+        """Points matrix with penalty codes scored per the config."""
+        points = self.points.copy()
+        entries = len(self.boats)
+        for code, value in config['penalties'].items():
+            mask = self.codes == code
+            if value == 'recorded':
+                continue
+            points[mask] = entries + 1 if value == 'entries+1' else float(value)
+        # Codes without a rule or printed points count as entries + 1
+        missing = np.isnan(points)
+        if missing.any():
+            logger.warning(f"{int(missing.sum())} scores without points scored as {entries + 1}")
+            points[missing] = entries + 1
+        return points
+
+    def score(self, config):
+        """
+        Re-score the series.
+
+        Returns:
+            (standings DataFrame in finishing order, race points matrix,
+             discard mask) - the matrix and mask rows follow self.boats
+        """
+        points = self.race_points(config)
+        n_boats, n_races = points.shape
+        discards = 0
+        for races, count in config['discards']:
+            if n_races >= races:
+                discards = count
+
+        # Worst excludable scores per boat
+        excludable = ~np.isin(self.codes, config['not_excludable'])
+        discarded = np.zeros_like(points, dtype=bool)
+        if discards:
+            candidates = np.where(excludable, points, -np.inf)
+            worst = np.argsort(-candidates, axis=1, kind='stable')[:, :discards]
+            np.put_along_axis(discarded, worst, True, axis=1)
+            discarded &= excludable
+        total = points.sum(axis=1)
+        net = total - np.where(discarded, points, 0).sum(axis=1)
+
+        # np.lexsort: last key is the primary one
+        keys = []
+        if 'a8.2' in config['tiebreaks']:
+            keys += [points[:, i] for i in range(n_races)]
+        if 'a8.1' in config['tiebreaks']:
+            counting = np.sort(np.where(discarded, np.inf, points), axis=1)
+            keys += [counting[:, i] for i in reversed(range(n_races))]
+        keys.append(net)
+        order = np.lexsort(keys)
+
+        ranked = np.column_stack([k[order] for k in reversed(keys)])
+        new_place = np.ones(n_boats, dtype=bool)
+        new_place[1:] = (ranked[1:] != ranked[:-1]).any(axis=1)
+        places = np.empty(n_boats, dtype=int)
+        places[order] = np.where(new_place, np.arange(1, n_boats + 1), 0)
+        places[order] = np.maximum.accumulate(places[order])
+
+        standings = self.boats.assign(place=places, total=total, net=net,
+                                      discards=discarded.sum(axis=1),
+                                      penalties=(self.codes != '').sum(axis=1))
+        return standings.iloc[order], points, discarded
+
+    def consistency(self, points, discarded):
+        """
+        Per-boat consistency metrics, vectorized over the fleet.
+
+        Args:
+            points: Race points matrix from score()
+            discarded: Discard mask from score()
+
+        Returns:
+            DataFrame (self.boats order) with mean, std, median, best and
+            worst over all races, worst_race_cost (worst counting score minus
+            the mean of the boat's other races) and places_gained_without_worst
+            (if that score were dropped, everyone else's net unchanged)
+        """
+        n_races = points.shape[1]
+        counting = np.where(discarded, -np.inf, points)
+        worst_counting = counting.max(axis=1)
+        net = np.where(discarded, 0, points).sum(axis=1)
+        others_mean = (points.sum(axis=1) - worst_counting) / max(n_races - 1, 1)
+
+        sorted_net = np.sort(net)
+        current_place = np.searchsorted(sorted_net, net, side='left') + 1
+        place_without = np.searchsorted(sorted_net, net - worst_counting, side='left') + 1
+        return pd.DataFrame({
+            'mean': points.mean(axis=1).round(2),
+            'std': points.std(axis=1, ddof=1).round(2) if n_races > 1 else 0.0,
+            'median': np.median(points, axis=1),
+            'best': points.min(axis=1),
+            'worst': points.max(axis=1),
+            'worst_race_cost': (worst_counting - others_mean).round(2),
+            'places_gained_without_worst': current_place - place_without,
+        })
+
+
+def analyze(results, config):
+    """
+    Re-score and measure consistency in one go.
+
+    Returns:
+        (standings with consistency columns in finishing order, race points matrix)
+    """
+    standings, points, discarded = results.score(config)
+    return standings.join(results.consistency(points, discarded)), points
+
+
+def plot_consistency(results, points, standings, output_path):
+    """Box plot of every boat's race scores in finishing order."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    order = standings.index.to_numpy()
+    labels = [f"{row.place}. {row.yacht or row.sail_number}" for row in standings.itertuples()]
+    fig, ax = plt.subplots(figsize=(max(12, len(order) * 0.6), 8))
+    ax.boxplot([points[i] for i in order])
+    ax.set_xticks(range(1, len(order) + 1))
+    ax.set_xticklabels(labels, rotation=60, ha='right')
+    ax.set_ylabel('Race points (lower is better)')
+    ax.set_title(f"Consistency Analysis - {results.name or 'Regatta'}", fontsize=14, fontweight='bold')
+    ax.grid(True, axis='y', alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(output_path, dpi=150, bbox_inches='tight')
+    plt.close(fig)
+    logger.info(f"Consistency chart saved to {output_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Re-score regatta results and report consistency metrics"
+    )
+    parser.add_argument('results_file', type=Path, help="Results CSV (e.g. data/races/2024_NA_Race_Results.csv)")
+    parser.add_argument('--config', type=Path, default=SCORING_CONFIG_FILE,
+                        help=f"Scoring config YAML (default: {SCORING_CONFIG_FILE.name})")
+    parser.add_argument('--discards', type=int, help="Override the config: discard this many worst races")
+    parser.add_argument('--output', type=Path, help="CSV file for standings and metrics")
+    parser.add_argument('--chart', type=Path, help="PNG box plot of each boat's race scores")
+    args = parser.parse_args()
+
+    try:
+        config = load_scoring_config(args.config)
+        if args.discards is not None:
+            config['discards'] = [(1, args.discards)]
+        results = RegattaResults.from_csv(args.results_file)
+        table, points = analyze(results, config)
+
+        print(f"📊 {results.name}: {len(table)} boats, {len(results.races)} races")
+        columns = ['place', 'sail_number', 'yacht', 'net', 'mean', 'std', 'median', 'worst',
+                   'places_gained_without_worst']
+        print(table[columns].to_string(index=False))
+
+        if table['reported_total'].notna().any():
+            mismatched = table[table['reported_total'].notna() & (table['total'] != table['reported_total'])]
+            if mismatched.empty:
+                print("✅ Totals match the published results")
+            else:
+                print(f"⚠️  {len(mismatched)} totals differ from the published results: "
+                      f"{', '.join(mismatched['sail_number'])}")
+        if table['published_place'].notna().any():
+            moved = table[table['published_place'].notna() & (table['place'] != table['published_place'])]
+            if moved.empty:
+                print("✅ Places match the published results")
+            else:
+                print(f"💡 {len(moved)} boats place differently under this scoring: "
+                      f"{', '.join(moved['sail_number'])}")
+
+        if args.output:
+            table.to_csv(args.output, index=False)
+            print(f"📁 Standings written to: {args.output}")
+        if args.chart:
+            plot_consistency(results, points, table, args.chart)
+            print(f"📁 Consistency chart saved to: {args.chart}")
+        return 0
+
+    except Exception as e:
+        logger.error(f"Error analyzing regatta results: {e}")
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
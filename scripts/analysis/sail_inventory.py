@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Active sail inventory model for Fleet22_us repository
+Works out which sails each boat still has and how old they are. Per hull and
+sail type, tags are ordered by delivery date and every delivery replaces the
+oldest sail in the inventory; sails past their lifetime, or whose notes say
+they were sold/lost/destroyed, drop out. The whole class is modelled in one
+sorted, vectorized pass; outputs are per-fleet age histograms and a per-hull
+"oldest active sail" table. Lifetimes and note keywords live in
+sail_inventory.yaml.
+"""
+import sys
+import re
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.logger import setup_logger
+from utils.data_loader import load_json
+from utils.path_utils import PROJECT_ROOT, SAILS_FILE
+from utils.sailmakers import get_canonicalizer
+
+# Setup logging
+logger = setup_logger('sail_inventory', PROJECT_ROOT / 'logs' / 'scraping.log')
+
+SAIL_INVENTORY_CONFIG = Path(__file__).parent / 'sail_inventory.yaml'
+FIRST_J105_YEAR = 1991
+STATUSES = ('active', 'expired', 'retired', 'replaced')
+INVENTORY_COLUMNS = ['Hull', 'Fleet', 'Sail Type', 'Certificate No.', 'Sailmaker', 'Delivery Date',
+                     'age_years', 'status']
+
+
+def load_inventory_config(path=SAIL_INVENTORY_CONFIG):
+    """
+    Load and check the inventory model config.
+
+    Raises:
+        ValueError: If a lifetime or slot count is not a positive number
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f) or {}
+
+    def per_type(name, fallback):
+        values = {str(k): v for k, v in (config.get(name) or {}).items()}
+        values.setdefault('default', fallback)
+        for sail_type, value in values.items():
+            if not isinstance(value, (int, float)) or value <= 0:
+                raise ValueError(f"{name}.{sail_type} in {path} must be a positive number")
+        return values
+
+    def keywords(name):
+        return [str(k).lower() for k in config.get(name) or []]
+
+    return {
+        'active_per_type': {k: int(v) for k, v in per_type('active_per_type', 1).items()},
+        'lifetimes': {k: float(v) for k, v in per_type('lifetimes', 6).items()},
+        'retired_keywords': keywords('retired_keywords'),
+        'replacement_keywords': keywords('replacement_keywords'),
+        'ignored_keywords': keywords('ignored_keywords'),
+    }
+
+
+def _mentions(notes, keywords):
+    if not keywords:
+        return pd.Series(False, index=notes.index)
+    return notes.str.contains('|'.join(re.escape(k) for k in keywords), regex=True)
+
+
+def _per_type(sail_types, values):
+    return sail_types.map(values).fillna(values['default'])
+
+
+def compute_inventory(records, config, as_of=None):
+    """
+    Status and age of every usable sail tag as of a date.
+
+    Tags without a real delivery date, delivered after `as_of`, on hull 0
+    (sailmaker entries), without a sail type, or whose notes match
+    ignored_keywords are left out.
+
+    Returns:
+        DataFrame with INVENTORY_COLUMNS; status is one of STATUSES
+    """
+    as_of = pd.Timestamp(as_of or datetime.now().date())
+    df = pd.DataFrame.from_records(records)
+    for column in ('Hull', 'Fleet', 'Sail Type', 'Certificate No.', 'Sailmaker', 'Delivery Date', 'Notes'):
+        if column not in df.columns:
+            df[column] = ''
+        df[column] = df[column].fillna('').astype(str)
+
+    dates = pd.to_datetime(df['Delivery Date'], format='%Y-%m-%d', errors='coerce')
+    notes = df['Notes'].str.lower()
+    usable = (dates.notna() & (dates.dt.year >= FIRST_J105_YEAR) & (dates <= as_of)
+              & (df['Hull'] != '0') & (df['Sail Type'] != '')
+              & ~_mentions(notes, config['ignored_keywords']))
+    tags = df[usable].assign(date=dates[usable], notes=notes[usable])
+    logger.info(f"Modelling {len(tags)} of {len(df)} sail tags as of {as_of.date()}")
+
+    # One sort; every per-hull/type quantity below is a grouped scan over it
+    tags = tags.sort_values(['Hull', 'Sail Type', 'date', 'Certificate No.'], kind='stable')
+    newer = tags.groupby(['Hull', 'Sail Type'], sort=False).cumcount(ascending=False)
+    age = (as_of - tags['date']).dt.days / 365.25
+    retired = (_mentions(tags['notes'], config['retired_keywords'])
+               & ~_mentions(tags['notes'], config['replacement_keywords']))
+
+    status = np.select(
+        [newer >= _per_type(tags['Sail Type'], config['active_per_type']),
+         retired,
+         age > _per_type(tags['Sail Type'], config['lifetimes'])],
+        ['replaced', 'retired', 'expired'],
+        default='active',
+    )
+
+    # A hull's fleet is the fleet on its most recent tag
+    latest_fleet = tags.sort_values('date', kind='stable').groupby('Hull')['Fleet'].last()
+    canonical = get_canonicalizer().canonical
+    return pd.DataFrame({
+        'Hull': tags['Hull'],
+        'Fleet': tags['Hull'].map(latest_fleet),
+        'Sail Type': tags['Sail Type'],
+        'Certificate No.': tags['Certificate No.'],
+        'Sailmaker': tags['Sailmaker'].map(canonical),
+        'Delivery Date': tags['Delivery Date'],
+        'age_years': age.round(2),
+        'status': status,
+    })[INVENTORY_COLUMNS]
+
+
+def age_histograms(inventory, by=('Fleet',)):
+    """Active sails per age in whole years (columns) for each fleet (rows)."""
+    active = inventory[inventory['status'] == 'active']
+    buckets = np.floor(active['age_years']).astype(int).rename('age')
+    return pd.crosstab([active[c] for c in by], buckets).sort_index(
+        key=lambda index: index.map(lambda v: int(v) if str(v).isdigit() else 1 << 30))
+
+
+def oldest_active(inventory):
+    """
+    Per hull: its oldest active sail plus active sail count and mean age.
+
+    Returns:
+        DataFrame sorted oldest first
+    """
+    active = inventory[inventory['status'] == 'active'].sort_values('age_years', ascending=False,
+                                                                  kind='stable')
+    grouped = active.groupby('Hull', sort=False)
+    table = grouped.first()[['Fleet', 'Sail Type', 'Certificate No.', 'Sailmaker', 'Delivery Date',
+                             'age_years']]
+    table['active_sails'] = grouped.size()
+    table['mean_age'] = grouped['age_years'].mean().round(2)
+    return table.reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Model each boat's active sail inventory and sail ages"
+    )
+    parser.add_argument('--input', type=Path, default=SAILS_FILE,
+                        help=f"Path to sail_tags.json file (default: {SAILS_FILE})")
+    parser.add_argument('--config', type=Path, default=SAIL_INVENTORY_CONFIG,
+                        help=f"Lifetimes and note keywords (default: {SAIL_INVENTORY_CONFIG.name})")
+    parser.add_argument('--as-of', help="Model the inventory on this date, YYYY-MM-DD (default: today)")
+    parser.add_argument('--fleet', help="Only report this fleet")
+    parser.add_argument('--by-type', action='store_true', help="Split age histograms by sail type")
+    parser.add_argument('--top', type=int, default=15, help="Hulls to list in the oldest-sail table")
+    parser.add_argument('--output', type=Path,
+                        help="Directory for active_inventory.csv, age_histograms.csv and oldest_active_sails.csv")
+    args = parser.parse_args()
+
+    try:
+        config = load_inventory_config(args.config)
+        inventory = compute_inventory(load_json(args.input), config, args.as_of)
+        if args.fleet:
+            inventory = inventory[inventory['Fleet'] == str(args.fleet)]
+
+        counts = inventory['status'].value_counts().reindex(STATUSES, fill_value=0)
+        histograms = age_histograms(inventory, ('Fleet', 'Sail Type') if args.by_type else ('Fleet',))
+        oldest = oldest_active(inventory)
+
+        print(f"📊 Sail inventory as of {args.as_of or datetime.now().date()}"
+              f"{f' (fleet {args.fleet})' if args.fleet else ''}: "
+              + ', '.join(f"{count} {status}" for status, count in counts.items()))
+        print("\nActive sails by age (years):")
+        print(histograms.to_string())
+        print(f"\nOldest active sail per hull (top {args.top}):")
+        print(oldest.head(args.top).to_string(index=False))
+
+        if args.output:
+            args.output.mkdir(parents=True, exist_ok=True)
+            inventory[inventory['status'] == 'active'].to_csv(args.output / 'active_inventory.csv', index=False)
+            histograms.to_csv(args.output / 'age_histograms.csv')
+            oldest.to_csv(args.output / 'oldest_active_sails.csv', index=False)
+            print(f"\n📁 Tables written to: {args.output}")
+        return 0
+
+    except Exception as e:
+        logger.error(f"Error modelling sail inventory: {e}")
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Sailmaker market share for Fleet22_us repository
+Answers "how many sails / what share did each sailmaker sell" for any window
+of years, optionally restricted to a sail type and fleet. Counts are kept as
+cumulative sums over years for every (sailmaker, sail type, fleet) cell, with
+an extra "all" slot on each axis, so any query is two array lookups.
+"""
+import sys
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.logger import setup_logger
+from utils.path_utils import PROJECT_ROOT, SAILS_FILE
+from utils.sailmakers import get_canonicalizer
+from processors.build_sail_cube import load_sail_cube
+
+# Setup logging
+logger = setup_logger('sailmaker_share', PROJECT_ROOT / 'logs' / 'scraping.log')
+
+
+class MarketShare:
+    """Cumulative sail counts by sailmaker x sail type x fleet over years."""
+
+    def __init__(self, cumulative, sailmakers, sail_types, fleets, first_year):
+        # cumulative[m, t, f, k] = sails sold in years first_year .. first_year + k - 1;
+        # the last position on the maker, type and fleet axes is the total over that axis
+        self.cumulative = cumulative
+        self.sailmakers = list(sailmakers)
+        self.sail_types = list(sail_types)
+        self.fleets = list(fleets)
+        self.first_year = first_year
+        self.last_year = first_year + cumulative.shape[3] - 2
+        self._maker_pos = {m: i for i, m in enumerate(self.sailmakers)}
+        self._type_pos = {t: i for i, t in enumerate(self.sail_types)}
+        self._fleet_pos = {f: i for i, f in enumerate(self.fleets)}
+
+    @classmethod
+    def from_cube(cls, cube):
+        """Build from a SailCube (one pass over its sailmaker x type x fleet x year totals)."""
+        counts = cube.totals(('sailmaker', 'sail_type', 'fleet', 'year'))
+        years = np.asarray(cube.axis_labels('year'), dtype=np.int64)
+        first_year = int(years.min()) if len(years) else datetime.now().year
+        span = int(years.max()) - first_year + 1 if len(years) else 0
+
+        # Spread onto a contiguous year range so windows are plain index arithmetic
+        m, t, f, _ = counts.shape
+        dense = np.zeros((m + 1, t + 1, f + 1, span), dtype=np.int64)
+        dense[:m, :t, :f, years - first_year] = counts
+        dense[m] = dense[:m].sum(axis=0)
+        dense[:, t] = dense[:, :t].sum(axis=1)
+        dense[:, :, f] = dense[:, :, :f].sum(axis=2)
+
+        cumulative = np.zeros(dense.shape[:3] + (span + 1,), dtype=np.int64)
+        np.cumsum(dense, axis=3, out=cumulative[..., 1:])
+        logger.info(f"Built market share table {cumulative.shape} for {first_year}-{first_year + span - 1}")
+        return cls(cumulative, cube.axis_labels('sailmaker'), cube.axis_labels('sail_type'),
+                   cube.axis_labels('fleet'), first_year)
+
+    def _window(self, start, end):
+        """Inclusive year window -> (lo, hi) positions in the cumulative axis."""
+        size = self.cumulative.shape[3] - 1
+        lo = 0 if start is None else min(max(start - self.first_year, 0), size)
+        hi = size if end is None else min(max(end - self.first_year + 1, 0), size)
+        return lo, max(lo, hi)
+
+    @staticmethod
+    def _position(positions, label, total):
+        if label is None:
+            return total
+        if label not in positions:
+            return None
+        return positions[label]
+
+    def _cells(self, sailmaker, sail_type, fleet):
+        m = self._position(self._maker_pos, sailmaker, len(self.sailmakers))
+        t = self._position(self._type_pos, sail_type, len(self.sail_types))
+        f = self._position(self._fleet_pos, None if fleet is None else str(fleet), len(self.fleets))
+        return None if None in (m, t, f) else (m, t, f)
+
+    def count(self, sailmaker=None, sail_type=None, fleet=None, start=None, end=None):
+        """Sails sold in years start..end (inclusive); None means any / unbounded."""
+        cell = self._cells(sailmaker, sail_type, fleet)
+        if cell is None:
+            return 0
+        lo, hi = self._window(start, end)
+        row = self.cumulative[cell]
+        return int(row[hi] - row[lo])
+
+    def share(self, sailmaker, sail_type=None, fleet=None, start=None, end=None):
+        """Fraction of the window's sails (same type/fleet filter) sold by sailmaker."""
+        total = self.count(None, sail_type, fleet, start, end)
+        return self.count(sailmaker, sail_type, fleet, start, end) / total if total else 0.0
+
+    def shares(self, sail_type=None, fleet=None, start=None, end=None):
+        """
+        Counts and shares for every sailmaker in the window.
+
+        Returns:
+            DataFrame indexed by sailmaker with 'count' and 'share', largest first,
+            sailmakers with no sales in the window omitted
+        """
+        cell = self._cells(None, sail_type, fleet)
+        if cell is None:
+            return pd.DataFrame({'count': [], 'share': []}).rename_axis('sailmaker')
+        _, t, f = cell
+        lo, hi = self._window(start, end)
+        counts = self.cumulative[:, t, f, hi] - self.cumulative[:, t, f, lo]
+        total = counts[-1]
+        frame = pd.DataFrame({
+            'count': counts[:-1],
+            'share': counts[:-1] / total if total else 0.0,
+        }, index=pd.Index(self.sailmakers, name='sailmaker'))
+        frame = frame[frame['count'] > 0]
+        return frame.sort_values(['count'], ascending=False, kind='stable')
+
+    def annual(self, sailmakers=None, sail_type=None, fleet=None, start=None, end=None):
+        """Year x sailmaker counts (every sailmaker when sailmakers is None)."""
+        cell = self._cells(None, sail_type, fleet)
+        lo, hi = self._window(start, end)
+        years = pd.RangeIndex(self.first_year + lo, self.first_year + hi, name='year')
+        names = self.sailmakers if sailmakers is None else [m for m in sailmakers if m in self._maker_pos]
+        if cell is None or hi == lo:
+            return pd.DataFrame(0, index=years, columns=pd.Index(names, name='sailmaker'))
+        _, t, f = cell
+        rows = [self._maker_pos[m] for m in names]
+        per_year = np.diff(self.cumulative[rows, t, f, lo:hi + 1], axis=1)
+        return pd.DataFrame(per_year.T, index=years, columns=pd.Index(names, name='sailmaker'))
+
+    def top_sailmakers(self, n, sail_type=None, fleet=None, start=None, end=None):
+        return list(self.shares(sail_type, fleet, start, end).index[:n])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Sailmaker counts and market share for a window of years"
+    )
+    parser.add_argument('--input', type=Path, default=SAILS_FILE,
+                        help=f"Path to sail_tags.json file (default: {SAILS_FILE})")
+    parser.add_argument('--start', type=int, help="First year of the window (default: earliest)")
+    parser.add_argument('--end', type=int, help="Last year of the window (default: latest)")
+    parser.add_argument('--last', type=int, metavar='N',
+                        help="Window is the last N seasons up to --end (or the current year)")
+    parser.add_argument('--fleet', help="Only sails for hulls in this fleet")
+    parser.add_argument('--type', dest='sail_type', help="Only this sail type (e.g. M, J, S89)")
+    parser.add_argument('--sailmaker', nargs='+', help="Only report these sailmakers")
+    parser.add_argument('--top', type=int, default=15, help="Sailmakers to list (default: 15, 0 = all)")
+    parser.add_argument('--output', type=Path, help="Optional CSV file for the share table")
+    args = parser.parse_args()
+
+    try:
+        engine = MarketShare.from_cube(load_sail_cube(args.input))
+        end = args.end
+        start = args.start
+        if args.last:
+            end = end or datetime.now().year
+            start = end - args.last + 1
+
+        table = engine.shares(args.sail_type, args.fleet, start, end)
+        if args.sailmaker:
+            # The cube is keyed by canonical maker ("North Sails" -> "North")
+            canonical = get_canonicalizer().canonical
+            table = table.reindex(list(dict.fromkeys(canonical(m) for m in args.sailmaker)),
+                                  fill_value=0)
+            table.index.name = 'sailmaker'
+        elif args.top:
+            table = table.head(args.top)
+
+        total = engine.count(None, args.sail_type, args.fleet, start, end)
+        window = f"{start or engine.first_year}-{end or engine.last_year}"
+        filters = ', '.join(x for x in (args.fleet and f"fleet {args.fleet}",
+                                        args.sail_type and f"type {args.sail_type}") if x)
+        print(f"📊 Sailmaker share {window}{f' ({filters})' if filters else ''}: {total} sails")
+        for sailmaker, row in table.iterrows():
+            print(f"   {sailmaker:<32} {int(row['count']):>6}  {row['share']:6.1%}")
+
+        if args.output:
+            table.to_csv(args.output)
+            print(f"📁 Share table written to: {args.output}")
+        return 0
+
+    except Exception as e:
+        logger.error(f"Error computing sailmaker share: {e}")
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
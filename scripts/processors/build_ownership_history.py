@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Hull ownership history builder for Fleet22_us repository
+Reconstructs a per-hull ownership timeline from sail tag purchasers (one
+sorted scan over hull and delivery date; a new period starts when the
+purchaser's surnames change) and merges the current owners from the
+membership data. The timeline is written to ownership_history.json, keyed
+by hull with periods in date order, so "who owned hull X in year Y" is a
+dictionary lookup plus a binary search.
+"""
+import sys
+import re
+import argparse
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.logger import setup_logger
+from utils.data_loader import load_json, save_json
+from utils.path_utils import (
+    PROJECT_ROOT,
+    SAILS_FILE,
+    MEMBERS_FILE,
+    OWNERSHIP_HISTORY_FILE,
+    ensure_directories
+)
+
+# Setup logging
+logger = setup_logger('ownership_history', PROJECT_ROOT / 'logs' / 'scraping.log')
+
+CURRENT_YEAR = datetime.now().year
+FIRST_J105_YEAR = 1991
+OWNER_STATUSES = ('OW', 'CO')
+NAME_SEPARATORS = re.compile(r'\s*(?:&|/|,|\band\b)\s*', re.IGNORECASE)
+NAME_SUFFIXES = {'jr', 'sr', 'ii', 'iii', 'iv', 'md', 'dr'}
+
+
+def name_key(name):
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return ' '.join(re.sub(r'[^a-z0-9 ]+', ' ', str(name or '').lower()).split())
+
+
+def surnames(name):
+    """
+    Family names in a purchaser string.
+
+    "Will & Kelly Benedict" -> {'benedict'}; "Laby and Pipkin" -> {'laby', 'pipkin'}.
+    Single-word parts are first names when another part has a surname.
+    """
+    parts = [name_key(part).split() for part in NAME_SEPARATORS.split(str(name or ''))]
+    parts = [[t for t in tokens if t not in NAME_SUFFIXES] for tokens in parts]
+    parts = [tokens for tokens in parts if tokens]
+    full = [tokens for tokens in parts if len(tokens) > 1]
+    return {tokens[-1] for tokens in (full or parts)}
+
+
+def _period(owner_names, start, end, first_tag, last_tag, tags, source):
+    return {
+        'owner': owner_names.most_common(1)[0][0] if owner_names else None,
+        'names': sorted(owner_names),
+        'from': start,
+        'until': end,
+        'first_tag': first_tag,
+        'last_tag': last_tag,
+        'tags': tags,
+        'source': source,
+    }
+
+
+def build_ownership_history(sail_tags, members):
+    """
+    Ownership periods per hull.
+
+    Each period has the most common purchaser spelling ('owner'), every name
+    seen, 'from' / 'until' years ('until' None = present), the first/last sail
+    tag dates and a 'source' of sail_tags, members or both. A period ends the
+    year before the next owner's first tag, so periods never overlap: a year
+    with tags from both owners belongs to the later one, and a purchaser with
+    tags only in that year is listed under the later owner's names.
+
+    Returns:
+        {hull: [period, ...]} with periods in date order
+    """
+    df = pd.DataFrame.from_records(sail_tags, columns=['Hull', 'Purchaser', 'Delivery Date'])
+    df = df.fillna('').astype(str)
+    dates = pd.to_datetime(df['Delivery Date'], format='%Y-%m-%d', errors='coerce')
+    usable = (dates.dt.year >= FIRST_J105_YEAR) & (df['Hull'] != '0') & (df['Purchaser'].str.strip() != '')
+    df = (df[usable].assign(year=dates[usable].dt.year)
+          .rename(columns={'Delivery Date': 'delivered'})
+          .sort_values(['Hull', 'delivered'], kind='stable'))
+
+    history = defaultdict(list)
+    hull = None
+    for row in df.itertuples(index=False):
+        family = surnames(row.Purchaser)
+        if row.Hull == hull and not (family & current['family']):
+            if history[hull] and family & history[hull][-1]['family']:
+                # A, B, A: B bought sails while A owned the boat (crew or co-owner)
+                reopened = history[hull].pop()
+                reopened['names'].update(current['names'])
+                reopened['tags'] += current['tags']
+                current = reopened
+            else:
+                history[hull].append(current)
+                current = None
+        elif row.Hull != hull:
+            if hull is not None:
+                history[hull].append(current)
+            hull, current = row.Hull, None
+        if current is None:
+            current = {'family': set(family), 'names': Counter(), 'start': row.year,
+                       'first_tag': row.delivered, 'tags': 0}
+        current['names'][' '.join(row.Purchaser.split())] += 1
+        current['family'] |= family
+        current['last_tag'] = row.delivered
+        current['last_year'] = row.year
+        current['tags'] += 1
+    if hull is not None:
+        history[hull].append(current)
+    history = defaultdict(list, {hull: [_close(p) for p in periods] for hull, periods in history.items()})
+
+    # Each period ends the year before the next one starts; a handover year
+    # (last tag of one owner, first of the next) goes to the later owner
+    for hull, periods in history.items():
+        history[hull] = periods = _fold_handover_buyers(periods)
+        for period, following in zip(periods, periods[1:]):
+            period['until'] = following['from'] - 1
+
+    _merge_members(history, members)
+    return dict(history)
+
+
+def _fold_handover_buyers(periods):
+    """
+    Fold periods that start in the same year as the next one into it.
+
+    Such a purchaser (a dealer, club or one-off buyer) only has tags in the
+    next owner's first year, so it would own no year of its own; its names
+    and tags are kept on the following period instead.
+    """
+    folded = []
+    for i, period in enumerate(periods):
+        following = periods[i + 1] if i + 1 < len(periods) else None
+        if following is not None and following['from'] <= period['from']:
+            following['names'] = sorted(set(following['names']) | set(period['names']))
+            following['tags'] += period['tags']
+            following['first_tag'] = min(following['first_tag'], period['first_tag'])
+            continue
+        folded.append(period)
+    return folded
+
+
+def _close(current):
+    return _period(current['names'], current['start'], current['last_year'],
+                   current['first_tag'], current['last_tag'], current['tags'], 'sail_tags')
+
+
+def _merge_members(history, members):
+    """Extend or append each hull's current period from the membership data."""
+    owners = defaultdict(list)
+    for row in members:
+        if row.get('Status') in OWNER_STATUSES and str(row.get('Owners/Helmsmen') or '').strip():
+            owners[str(row.get('Hull', ''))].append(row)
+
+    for hull, rows in owners.items():
+        # Owner before co-owners
+        rows = sorted(rows, key=lambda r: OWNER_STATUSES.index(r['Status']))
+        names = [' '.join(r['Owners/Helmsmen'].split()) for r in rows]
+        family = set().union(*(surnames(n) for n in names))
+        periods = history[hull]
+        handover = None
+        if (periods and periods[-1]['from'] >= CURRENT_YEAR
+                and not surnames(' & '.join(periods[-1]['names'])) & family):
+            # Someone else's tags only this year: the current owner gets the year
+            handover = periods.pop()
+        last = periods[-1] if periods else None
+        if last and surnames(' & '.join(last['names'])) & family:
+            last['until'] = None
+            last['source'] = 'both'
+            last['current_owners'] = names
+        else:
+            # Bought after the last sail tag; the actual purchase year is unknown
+            start = last['until'] + 1 if last else None
+            if last and start > CURRENT_YEAR:
+                start = CURRENT_YEAR
+                last['until'] = start - 1
+            last = {
+                **_period(Counter({names[0]: 1}), start, None, None, None, 0, 'members'),
+                'names': names,
+                'current_owners': names,
+                'from_estimated': True,
+            }
+            periods.append(last)
+        if handover:
+            last['names'] = last['names'] + [n for n in handover['names'] if n not in last['names']]
+            last['tags'] += handover['tags']
+            last['first_tag'] = last['first_tag'] or handover['first_tag']
+            last['last_tag'] = handover['last_tag']
+
+
+def owner_in_year(history, hull, year):
+    """
+    The ownership period covering `year` for a hull, or None.
+
+    Periods are in date order, so this is a binary search on their start years.
+    A period with an unknown start (current owners from the membership data,
+    no sail tags) only answers for the current year onwards.
+    """
+    periods = history.get(str(hull), [])
+    starts = [p['from'] if p['from'] is not None else CURRENT_YEAR for p in periods]
+    i = bisect_right(starts, year) - 1
+    if i < 0:
+        return None
+    period = periods[i]
+    if period['until'] is not None and year > period['until']:
+        return None
+    return period
+
+
+def load_ownership_history(history_file=OWNERSHIP_HISTORY_FILE, sails_file=SAILS_FILE,
+                           members_file=MEMBERS_FILE, rebuild=False):
+    """
+    Load the saved history, rebuilding and saving it when missing or older than
+    the sail tags or members file.
+
+    Returns:
+        (history dict, rebuilt flag)
+    """
+    history_file = Path(history_file)
+    sources = [Path(sails_file), Path(members_file)]
+    if (not rebuild and history_file.exists()
+            and all(not s.exists() or history_file.stat().st_mtime >= s.stat().st_mtime for s in sources)):
+        return load_json(history_file)['hulls'], False
+
+    history = build_ownership_history(load_json(sails_file), load_json(members_file))
+    save_json({
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'sources': [str(s.relative_to(PROJECT_ROOT)) if s.is_relative_to(PROJECT_ROOT) else str(s)
+                    for s in sources],
+        'hulls': history,
+    }, history_file, create_backup=False)
+    logger.info(f"Ownership history for {len(history)} hulls saved to {history_file}")
+    return history, True
+
+
+def _format_period(period):
+    until = 'present' if period['until'] is None else period['until']
+    start = period['from'] if period['from'] is not None else '?'
+    estimated = ' (start estimated)' if period.get('from_estimated') else ''
+    others = [n for n in period['names'] if n != period['owner']]
+    also = f" (also: {', '.join(others)})" if others else ''
+    tags = f", {period['tags']} sail tags" if period['tags'] else ''
+    return f"{start}-{until}{estimated}: {period['owner']}{also}{tags} [{period['source']}]"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build hull ownership history and answer 'who owned hull X in year Y'"
+    )
+    parser.add_argument('--hull', help="Show this hull's ownership timeline")
+    parser.add_argument('--year', type=int, help="With --hull: only the owner in this year")
+    parser.add_argument('--output', type=Path, default=OWNERSHIP_HISTORY_FILE,
+                        help=f"History file (default: {OWNERSHIP_HISTORY_FILE})")
+    parser.add_argument('--rebuild', action='store_true', help="Rebuild even if the file is up to date")
+    args = parser.parse_args()
+
+    try:
+        ensure_directories()
+        history, rebuilt = load_ownership_history(args.output, rebuild=args.rebuild)
+        if rebuilt:
+            periods = sum(len(p) for p in history.values())
+            print(f"✅ Ownership history: {len(history)} hulls, {periods} periods")
+            print(f"📁 {args.output}")
+
+        if args.hull and args.year:
+            period = owner_in_year(history, args.hull, args.year)
+            if period is None:
+                print(f"💡 No known owner for hull {args.hull} in {args.year}")
+            else:
+                print(f"📄 Hull {args.hull} in {args.year}: {_format_period(period)}")
+        elif args.hull:
+            periods = history.get(str(args.hull))
+            if not periods:
+                print(f"💡 No ownership history for hull {args.hull}")
+            else:
+                print(f"📄 Hull {args.hull} ownership:")
+                for period in periods:
+                    print(f"   {_format_period(period)}")
+        return 0
+
+    except Exception as e:
+        logger.error(f"Error building ownership history: {e}")
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
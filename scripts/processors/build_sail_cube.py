@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Sail purchase cube builder for Fleet22_us repository
+Materializes sail tag counts as a dense hull x year x sail type x sailmaker
+array (fleet is derived from hull) so analysis scripts and browser pages can
+read pre-aggregated slices instead of re-grouping every sail tag record.
+Sailmakers are grouped by canonical name (utils/sailmakers.py).
+"""
+import sys
+import json
+import argparse
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.logger import setup_logger
+from utils.data_loader import load_json
+from utils.sailmakers import SailmakerCanonicalizer, aliases_digest
+from utils.path_utils import (
+    PROJECT_ROOT,
+    SAILS_FILE,
+    SAIL_CUBE_FILE,
+    SAIL_CUBE_JSON,
+    ensure_directories
+)
+
+# Setup logging
+logger = setup_logger('sail_cube', PROJECT_ROOT / 'logs' / 'scraping.log')
+
+# Dense axes, in array order. Fleet is not stored as an axis: a hull's tags
+# almost all carry the same fleet, so a fleet axis would be almost entirely
+# zeros. It is resolved through hull_fleet (fleet on the latest tag) instead.
+AXES = ('hull', 'year', 'sail_type', 'sailmaker')
+GROUP_AXES = ('fleet',) + AXES
+
+
+def _hull_sort_key(hull):
+    return (0, int(hull)) if str(hull).isdigit() else (1, str(hull))
+
+
+def latest_fleet_by_hull(hulls, dates, fleets):
+    """
+    Each hull's fleet taken from its most recently delivered tag.
+
+    Takes parallel sequences; dates only need to be comparable (date objects,
+    Timestamps or ISO strings). On equal dates the later record wins.
+
+    Returns:
+        {hull: fleet}
+    """
+    latest = {}
+    for hull, delivered, fleet in zip(hulls, dates, fleets):
+        seen = latest.get(hull)
+        if seen is None or delivered >= seen[0]:
+            latest[hull] = (delivered, fleet)
+    return {hull: fleet for hull, (_, fleet) in latest.items()}
+
+
+def _as_list(value):
+    return list(value) if isinstance(value, (list, tuple, set, np.ndarray)) else [value]
+
+
+class SailCube:
+    """Dense sail purchase counts with label-based slicing."""
+
+    def __init__(self, counts, labels, fleets, hull_fleet, aliases=None, unknown_sailmakers=None):
+        self.counts = counts
+        self.labels = {axis: list(labels[axis]) for axis in AXES}
+        self.fleets = list(fleets)
+        self.hull_fleet = np.asarray(hull_fleet, dtype=np.int16)
+        self._positions = {
+            axis: {label: i for i, label in enumerate(self.labels[axis])} for axis in AXES
+        }
+        # Digest of the alias table the sailmaker axis was canonicalized with
+        self.aliases = aliases
+        self.unknown_sailmakers = unknown_sailmakers or []
+
+    @classmethod
+    def from_records(cls, records):
+        """Build the cube from sail_tags.json records in one pass."""
+        hulls, dates, years, types, makers, fleets = [], [], [], [], [], []
+        canonicalizer = SailmakerCanonicalizer()
+        skipped = 0
+        for item in records:
+            try:
+                delivered = date.fromisoformat(str(item.get('Delivery Date', '')))
+            except ValueError:
+                skipped += 1
+                continue
+            hulls.append(str(item.get('Hull', '')))
+            dates.append(delivered)
+            years.append(delivered.year)
+            types.append(item.get('Sail Type', ''))
+            makers.append(canonicalizer.canonical(item.get('Sailmaker', '')))
+            fleets.append(str(item.get('Fleet', '')))
+
+        if skipped:
+            logger.info(f"Skipped {skipped} sail tags with unparsable delivery dates")
+
+        hull_labels = sorted(set(hulls), key=_hull_sort_key)
+        year_labels = sorted(set(years))
+        type_labels = sorted(set(types))
+        maker_labels = sorted(set(makers))
+        fleet_labels = sorted(set(fleets), key=_hull_sort_key)
+
+        index = {
+            'hull': {h: i for i, h in enumerate(hull_labels)},
+            'year': {y: i for i, y in enumerate(year_labels)},
+            'sail_type': {t: i for i, t in enumerate(type_labels)},
+            'sailmaker': {m: i for i, m in enumerate(maker_labels)},
+        }
+        coords = np.array([
+            [index['hull'][h] for h in hulls],
+            [index['year'][y] for y in years],
+            [index['sail_type'][t] for t in types],
+            [index['sailmaker'][m] for m in makers],
+        ], dtype=np.intp).reshape(len(AXES), -1)
+
+        shape = tuple(len(index[axis]) for axis in AXES)
+        flat = np.ravel_multi_index(tuple(coords), shape) if hulls else np.array([], dtype=np.intp)
+        counts = np.bincount(flat, minlength=int(np.prod(shape))).astype(np.uint16).reshape(shape)
+
+        fleet_pos = {f: i for i, f in enumerate(fleet_labels)}
+        fleet_by_hull = latest_fleet_by_hull(hulls, dates, fleets)
+        hull_fleet = np.array([fleet_pos[fleet_by_hull[h]] for h in hull_labels], dtype=np.int16)
+
+        labels = {'hull': hull_labels, 'year': year_labels,
+                  'sail_type': type_labels, 'sailmaker': maker_labels}
+        unknown = canonicalizer.review_list()
+        if unknown:
+            logger.warning(f"{len(unknown)} unrecognized sailmaker names kept as-is: "
+                           f"{', '.join(entry['Sailmaker'] for entry in unknown)}")
+        logger.info(f"Built sail cube {shape} from {len(hulls)} sail tags")
+        return cls(counts, labels, fleet_labels, hull_fleet, aliases_digest(), unknown)
+
+    def _indices(self, axis, values):
+        """Label(s) -> positions on an axis; unknown labels are ignored."""
+        positions = self._positions[axis]
+        return [positions[v] for v in _as_list(values) if v in positions]
+
+    def slice(self, fleet=None, hull=None, year=None, sail_type=None, sailmaker=None):
+        """
+        Return a sub-cube restricted to the given labels.
+
+        Each filter accepts a single label or a list of labels. Years are ints.
+        """
+        counts = self.counts
+        labels = dict(self.labels)
+        hull_fleet = self.hull_fleet
+
+        hull_idx = np.arange(len(labels['hull']))
+        if hull is not None:
+            hull_idx = np.array(self._indices('hull', hull), dtype=np.intp)
+        if fleet is not None:
+            wanted = [self.fleets.index(f) for f in _as_list(fleet) if f in self.fleets]
+            hull_idx = hull_idx[np.isin(hull_fleet[hull_idx], wanted)]
+        if hull is not None or fleet is not None:
+            counts = counts[hull_idx]
+            labels['hull'] = [labels['hull'][i] for i in hull_idx]
+            hull_fleet = hull_fleet[hull_idx]
+
+        for pos, (axis, values) in enumerate(
+                (('year', year), ('sail_type', sail_type), ('sailmaker', sailmaker)), start=1):
+            if values is None:
+                continue
+            idx = self._indices(axis, values)
+            counts = np.take(counts, idx, axis=pos)
+            labels[axis] = [labels[axis][i] for i in idx]
+
+        return SailCube(counts, labels, self.fleets, hull_fleet, self.aliases)
+
+    def totals(self, by=('year',)):
+        """
+        Sum counts down to the requested axes (any of fleet, hull, year,
+        sail_type, sailmaker), returned in the order given.
+        """
+        by = (by,) if isinstance(by, str) else tuple(by)
+        unknown = set(by) - set(GROUP_AXES)
+        if unknown:
+            raise ValueError(f"Unknown cube axes: {', '.join(sorted(unknown))}")
+        if 'fleet' in by and 'hull' in by:
+            raise ValueError("Group by either fleet or hull, not both")
+
+        kept = [axis for axis in AXES if axis in by or (axis == 'hull' and 'fleet' in by)]
+        drop = tuple(i for i, axis in enumerate(AXES) if axis not in kept)
+        result = self.counts.sum(axis=drop, dtype=np.int64)
+
+        if 'fleet' in by:
+            # Fold the hull axis (always first) into fleets
+            folded = np.zeros((len(self.fleets),) + result.shape[1:], dtype=np.int64)
+            np.add.at(folded, self.hull_fleet, result)
+            result = folded
+            kept[0] = 'fleet'
+
+        return np.transpose(result, [kept.index(axis) for axis in by])
+
+    def axis_labels(self, axis):
+        return self.fleets if axis == 'fleet' else self.labels[axis]
+
+    def to_frame(self, index, columns=None, drop_empty=True):
+        """
+        Return totals as a pandas DataFrame.
+
+        Args:
+            index: Axis for rows (e.g. 'year')
+            columns: Axis or tuple of axes for columns (MultiIndex when several)
+            drop_empty: Drop all-zero rows and columns
+        """
+        import pandas as pd
+
+        column_axes = () if columns is None else ((columns,) if isinstance(columns, str) else tuple(columns))
+        data = self.totals((index,) + column_axes)
+        rows = pd.Index(self.axis_labels(index), name=index)
+
+        if not column_axes:
+            frame = pd.Series(data, index=rows).to_frame('count')
+        else:
+            cols = pd.MultiIndex.from_product(
+                [self.axis_labels(a) for a in column_axes], names=list(column_axes)
+            ) if len(column_axes) > 1 else pd.Index(self.axis_labels(column_axes[0]), name=column_axes[0])
+            frame = pd.DataFrame(data.reshape(len(rows), -1), index=rows, columns=cols)
+
+        if drop_empty:
+            frame = frame.loc[frame.sum(axis=1) > 0, frame.sum(axis=0) > 0]
+        return frame
+
+    def save(self, path=SAIL_CUBE_FILE):
+        """Save as a compressed .npz archive."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            counts=self.counts,
+            hull_fleet=self.hull_fleet,
+            labels=json.dumps({**self.labels, 'fleet': self.fleets, 'aliases': self.aliases}),
+        )
+        logger.info(f"Sail cube saved to {path}")
+        return path
+
+    @classmethod
+    def load(cls, path=SAIL_CUBE_FILE):
+        """Load a cube written by save()."""
+        with np.load(path) as archive:
+            labels = json.loads(str(archive['labels']))
+            return cls(archive['counts'], labels, labels['fleet'], archive['hull_fleet'],
+                       labels.get('aliases'))
+
+    def to_json_dict(self):
+        """Sparse representation for the browser pages: axes plus non-zero cells."""
+        nonzero = np.nonzero(self.counts)
+        cells = np.column_stack(nonzero + (self.counts[nonzero],)).tolist()
+        return {
+            'axes': {**self.labels, 'fleet': self.fleets},
+            'cell_axes': list(AXES) + ['count'],
+            'hull_fleet': self.hull_fleet.tolist(),
+            'cells': cells,
+        }
+
+    def save_json(self, path=SAIL_CUBE_JSON):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_json_dict(), f, separators=(',', ':'), ensure_ascii=False)
+        logger.info(f"Sail cube JSON saved to {path}")
+        return path
+
+
+def load_sail_cube(sails_file=SAILS_FILE, cube_file=SAIL_CUBE_FILE):
+    """
+    Load the saved cube when it is up to date for sails_file and the current
+    sailmaker alias table, else build it.
+    """
+    cube_file = Path(cube_file)
+    sails_file = Path(sails_file)
+    if (cube_file.exists() and sails_file.resolve() == SAILS_FILE.resolve()
+            and (not sails_file.exists() or cube_file.stat().st_mtime >= sails_file.stat().st_mtime)):
+        cube = SailCube.load(cube_file)
+        if cube.aliases == aliases_digest():
+            return cube
+        logger.info("Sailmaker aliases changed since the cube was saved; rebuilding")
+    return SailCube.from_records(load_json(sails_file))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the pre-aggregated sail purchase cube"
+    )
+    parser.add_argument(
+        '--input',
+        type=Path,
+        default=SAILS_FILE,
+        help=f"Path to sail_tags.json file (default: {SAILS_FILE})"
+    )
+    parser.add_argument(
+        '--output',
+        type=Path,
+        default=SAIL_CUBE_FILE,
+        help=f"Output .npz path (default: {SAIL_CUBE_FILE})"
+    )
+    parser.add_argument(
+        '--json',
+        type=Path,
+        default=SAIL_CUBE_JSON,
+        help=f"Output JSON path for the browser pages (default: {SAIL_CUBE_JSON})"
+    )
+    args = parser.parse_args()
+
+    try:
+        ensure_directories()
+        cube = SailCube.from_records(load_json(args.input))
+        cube.save(args.output)
+        cube.save_json(args.json)
+
+        shape = ' x '.join(f"{len(cube.labels[a])} {a}" for a in AXES)
+        print(f"✅ Sail cube: {shape} ({len(cube.fleets)} fleets, {int(cube.counts.sum())} sails)")
+        if cube.unknown_sailmakers:
+            print(f"⚠️  {len(cube.unknown_sailmakers)} unrecognized sailmaker names (add them to "
+                  f"SAILMAKER_ALIASES in utils/sailmakers.py):")
+            for entry in cube.unknown_sailmakers:
+                print(f"   {entry['Sailmaker']}: {entry['count']} tags")
+        print(f"📁 {args.output}")
+        print(f"📁 {args.json}")
+        return 0
+
+    except Exception as e:
+        logger.error(f"Error building sail cube: {e}")
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -22,8 +22,10 @@ from utils.path_utils import (
     MEMBERS_FILE,
     COMBINED_FILE,
     STATISTICS_FILE,
+    CERTIFICATE_INDEX_FILE,
     ensure_directories
 )
+from utils.certificates import decode_certificates, build_certificate_index
 
 # Setup logging
 logger = setup_logger('processor', PROJECT_ROOT / 'logs' / 'scraping.log')
@@ -64,11 +66,18 @@ def standardize_owner_name(owner_name):
     
     return owner_name
 
-def combine_boat_data():
-    """Combine boat data from multiple sources."""
-    sail_tags_data = load_json_data(SAILS_FILE)
-    membership_data = load_json_data(MEMBERS_FILE)
-    fleet_boats_data = load_json_data(BOATS_FILE)
+def combine_boat_data(sail_tags_data=None, membership_data=None, fleet_boats_data=None):
+    """Combine boat data from multiple sources.
+
+    Any dataset passed in is used as-is (e.g. already loaded by the watcher);
+    missing ones are loaded from their standard paths.
+    """
+    if sail_tags_data is None:
+        sail_tags_data = load_json_data(SAILS_FILE)
+    if membership_data is None:
+        membership_data = load_json_data(MEMBERS_FILE)
+    if fleet_boats_data is None:
+        fleet_boats_data = load_json_data(BOATS_FILE)
     
     # Log the first item of each data source to help debug
     if sail_tags_data:
@@ -81,8 +90,17 @@ def combine_boat_data():
     # Create a dictionary to track all unique hull numbers
     combined_data = {}
     
+    # Decode every certificate number in one vectorized pass
+    decoded = decode_certificates([item.get('Certificate No.', '') for item in sail_tags_data])
+    decoded_rows = zip(
+        decoded['issue_year'].astype(object).where(decoded['valid'], None),
+        decoded['issue_month'].astype(object).where(decoded['valid'], None),
+        decoded['sequence'].astype(object).where(decoded['valid'], None),
+        decoded['maker_code'].where(decoded['valid'], None),
+    )
+    
     # Process sail tags data - using the actual field names from the file
-    for item in sail_tags_data:
+    for item, (issue_year, issue_month, sequence, maker_code) in zip(sail_tags_data, decoded_rows):
         hull_num = standardize_hull_number(item.get('Hull', ''))
         if not hull_num:
             continue
@@ -102,7 +120,11 @@ def combine_boat_data():
             'certificate': item.get('Certificate No.', ''),
             'sailmaker': item.get('Sailmaker', ''),
             'delivery_date': item.get('Delivery Date', ''),
-            'type': item.get('Sail Type', '')
+            'type': item.get('Sail Type', ''),
+            'issue_year': issue_year,
+            'issue_month': issue_month,
+            'sequence': sequence,
+            'maker_code': maker_code
         })
     
     # Process membership data - using the actual field names from the file
@@ -165,13 +187,22 @@ def combine_boat_data():
     logger.info(f"Combined data has {len(combined_list)} entries")
     return combined_list
 
-def save_combined_data(data):
+def save_combined_data(data, create_backup=True):
     """Save combined data to a JSON file."""
-    save_json(data, COMBINED_FILE)
+    save_json(data, COMBINED_FILE, create_backup=create_backup)
     logger.info(f"Combined data saved to {COMBINED_FILE} with {len(data)} entries.")
     print(f"Combined data saved to {COMBINED_FILE} with {len(data)} entries.")
 
-def generate_fleet_statistics(combined_data):
+def save_certificate_index(combined_data, create_backup=True):
+    """Save issue-year and maker-code lookups over every sail tag in the combined data."""
+    pairs = [(boat['hull_number'], tag['certificate']) for boat in combined_data for tag in boat['sail_tags']]
+    index = build_certificate_index([cert for _, cert in pairs], [hull for hull, _ in pairs])
+    save_json(index, CERTIFICATE_INDEX_FILE, create_backup=create_backup)
+    logger.info(f"Certificate index saved to {CERTIFICATE_INDEX_FILE}.")
+    print(f"Certificate index saved to {CERTIFICATE_INDEX_FILE}.")
+    return index
+
+def generate_fleet_statistics(combined_data, create_backup=True):
     """Generate statistics about the fleet."""
     stats = {
         'total_boats': len(combined_data),
@@ -183,7 +214,7 @@ def generate_fleet_statistics(combined_data):
         'generation': datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')
     }
     
-    save_json(stats, STATISTICS_FILE)
+    save_json(stats, STATISTICS_FILE, create_backup=create_backup)
     logger.info(f"Fleet statistics saved to {STATISTICS_FILE}.")
     print(f"Fleet statistics saved to {STATISTICS_FILE}.")
     
@@ -213,6 +244,7 @@ def main():
         
         # Save the combined data
         save_combined_data(combined_data)
+        save_certificate_index(combined_data)
         
         # Generate statistics
         stats = generate_fleet_statistics(combined_data)
@@ -5,6 +5,8 @@ Manages boats_fleet22.json with payment tracking fields.
 Preserves payment data when updating boat information.
 """
 import sys
+import csv
+import json
 import argparse
 from pathlib import Path
 from datetime import datetime
@@ -15,6 +17,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from utils.logger import setup_logger
 from utils.data_loader import load_json, save_json
 from utils.path_utils import BOATS_FILE, PROJECT_ROOT
+from processors.payment_ledger import PaymentLedger, sync_outputs
 
 # Setup logging
 logger = setup_logger('boat_data_manager', PROJECT_ROOT / 'logs' / 'data_management.log')
@@ -67,35 +70,198 @@ def enhance_boat_data(boats_data):
     
     return boats_data, enhanced_count
 
-def update_boat_payment(boats_data, hull_number, dues_type, paid=True, payment_date=None, payment_method=None):
-    """Update payment status for a specific boat."""
-    boat_found = False
-    
+# Batch file column -> accepted header spellings (matched case-insensitively)
+BATCH_COLUMNS = {
+    'hull': ('hull', 'hull number', 'hull_number'),
+    'type': ('type', 'dues', 'dues type', 'dues_type'),
+    'status': ('status', 'paid'),
+    'date': ('date', 'payment date', 'payment_date'),
+    'method': ('method', 'payment method', 'payment_method'),
+}
+
+# Simplified dues fields written by batch updates (see .ai/CONVENTIONS.md)
+DUES_FIELDS = {'fleet': 'Fleet Dues', 'class': 'Class Dues'}
+PAID_VALUES = {'paid', 'yes', 'y', 'true', '1'}
+NOT_PAID_VALUES = {'not paid', 'unpaid', 'no', 'n', 'false', '0'}
+
+
+def build_hull_index(boats_data):
+    """Map hull number (string) -> boat record for O(1) lookups."""
+    index = {}
     for boat in boats_data:
-        if str(boat.get('Hull Number', '')) == str(hull_number):
-            boat_found = True
-            
-            if dues_type.lower() == 'fleet':
-                boat['Fleet Dues 2025'] = 'Paid' if paid else 'Unpaid'
-                if payment_date:
-                    boat['Fleet Dues Payment Date'] = payment_date
-                if payment_method:
-                    boat['Fleet Dues Payment Method'] = payment_method
-                logger.info(f"Updated Fleet Dues for hull {hull_number}: {boat['Fleet Dues 2025']}")
-                
-            elif dues_type.lower() == 'class':
-                boat['Class Dues 2025'] = 'Paid' if paid else 'Unpaid'
-                if payment_date:
-                    boat['Class Dues Payment Date'] = payment_date
-                logger.info(f"Updated Class Dues for hull {hull_number}: {boat['Class Dues 2025']}")
-            
-            break
-    
-    if not boat_found:
-        logger.warning(f"Boat with hull {hull_number} not found")
-        return False
-    
-    return True
+        hull = str(boat.get('Hull Number', '')).strip()
+        if hull:
+            index.setdefault(hull, boat)
+    return index
+
+
+def _normalize_batch_row(row):
+    """Map a raw CSV/JSONL row onto the BATCH_COLUMNS keys."""
+    lowered = {str(k).strip().lower(): v for k, v in row.items() if k is not None}
+    normalized = {}
+    for column, aliases in BATCH_COLUMNS.items():
+        value = next((lowered[a] for a in aliases if a in lowered), '')
+        normalized[column] = '' if value is None else str(value).strip()
+    return normalized
+
+
+def load_payment_batch(batch_path):
+    """
+    Read payments from a CSV or JSONL file.
+
+    Returns:
+        List of (line_number, raw_row) tuples; unparsable JSONL lines are
+        returned as {'_error': message}
+    """
+    batch_path = Path(batch_path)
+    rows = []
+
+    if batch_path.suffix.lower() in ('.jsonl', '.ndjson'):
+        with open(batch_path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                    if not isinstance(row, dict):
+                        raise ValueError("expected a JSON object")
+                except ValueError as e:
+                    row = {'_error': f"invalid JSON: {e}"}
+                rows.append((line_number, row))
+    else:
+        with open(batch_path, 'r', encoding='utf-8-sig', newline='') as f:
+            reader = csv.DictReader(f)
+            # Line 1 is the header
+            for line_number, row in enumerate(reader, start=2):
+                rows.append((line_number, row))
+
+    logger.info(f"Read {len(rows)} payment rows from {batch_path}")
+    return rows
+
+
+def validate_payment_row(row, hull_index):
+    """
+    Validate one normalized batch row.
+
+    Returns:
+        (update, None) on success, where update holds hull, type, status,
+        date and method; (None, reason) when the row is rejected
+    """
+    hull = row['hull']
+    if not hull:
+        return None, "missing hull"
+    if hull not in hull_index:
+        return None, f"hull {hull} not in {BOATS_FILE.name}"
+
+    dues_type = row['type'].lower()
+    if dues_type not in DUES_FIELDS:
+        return None, f"dues type must be fleet or class, got '{row['type']}'"
+
+    status = row['status'].lower() or 'paid'
+    if status in PAID_VALUES:
+        status = 'Paid'
+    elif status in NOT_PAID_VALUES:
+        status = 'Not Paid'
+    else:
+        return None, f"unrecognized status '{row['status']}'"
+
+    if row['date']:
+        try:
+            datetime.strptime(row['date'], '%Y-%m-%d')
+        except ValueError:
+            return None, f"date must be YYYY-MM-DD, got '{row['date']}'"
+
+    return {
+        'hull': hull,
+        'type': dues_type,
+        'status': status,
+        'date': row['date'],
+        'method': row['method'],
+    }, None
+
+
+def apply_payment_batch(boats_data, batch_rows):
+    """
+    Validate a batch of payment rows against boats_data.
+
+    The hull index is built once; each row is validated independently so one
+    bad row does not block the rest. A hull/dues type pair may appear only
+    once per batch. boats_data is not modified; the applied updates are
+    recorded in the payment ledger by record_payments().
+
+    Returns:
+        (applied, unchanged, rejected) where rejected is a list of
+        (line_number, raw_row, reason)
+    """
+    hull_index = build_hull_index(boats_data)
+    seen = {}
+    applied, unchanged, rejected = [], [], []
+
+    for line_number, raw in batch_rows:
+        if '_error' in raw:
+            rejected.append((line_number, raw, raw['_error']))
+            continue
+
+        update, reason = validate_payment_row(_normalize_batch_row(raw), hull_index)
+        if update:
+            key = (update['hull'], update['type'])
+            if key in seen:
+                update, reason = None, f"duplicate {key[1]} dues for hull {key[0]} (line {seen[key]})"
+            else:
+                seen[key] = line_number
+        if not update:
+            rejected.append((line_number, raw, reason))
+            logger.warning(f"Rejected batch line {line_number}: {reason}")
+            continue
+
+        boat = hull_index[update['hull']]
+        field = DUES_FIELDS[update['type']]
+        if boat.get(field) == update['status']:
+            unchanged.append(update)
+            continue
+
+        applied.append(update)
+        details = ', '.join(v for v in (update['date'], update['method']) if v)
+        logger.info(f"Batch {field} for hull {update['hull']}: {update['status']}"
+                    + (f" ({details})" if details else ""))
+
+    return applied, unchanged, rejected
+
+
+def record_payments(updates, note='', ledger=None):
+    """
+    Record dues updates in the payment ledger and refresh boats_fleet22.json
+    and the tracker from it, so a later ledger sync keeps them.
+
+    Returns:
+        Number of boats dues fields changed
+    """
+    ledger = ledger or PaymentLedger()
+    for update in updates:
+        ledger.record(update['hull'], update['type'], update['status'],
+                      method=update.get('method') or '', date=update.get('date') or None, note=note)
+    changed, _ = sync_outputs(ledger)
+    return changed
+
+
+def write_rejected_report(rejected, report_path):
+    """Write rejected batch rows with their line number and reason as CSV."""
+    fields = []
+    for _, raw, _ in rejected:
+        for key in raw:
+            if key not in fields and key != '_error':
+                fields.append(key)
+
+    report_path = Path(report_path)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['line', 'reason'] + fields)
+        for line_number, raw, reason in rejected:
+            writer.writerow([line_number, reason] + [raw.get(k, '') for k in fields])
+
+    logger.info(f"Rejected rows report saved to {report_path}")
+    return report_path
 
 def merge_with_tracker(boats_data, tracker_csv_path):
     """Merge payment data from payment tracker CSV."""
@@ -142,19 +308,19 @@ def merge_with_tracker(boats_data, tracker_csv_path):
 def generate_report(boats_data):
     """Generate payment status report."""
     total = len(boats_data)
-    fleet_paid = sum(1 for b in boats_data if b.get('Fleet Dues 2025') == 'Paid')
-    fleet_unpaid = sum(1 for b in boats_data if b.get('Fleet Dues 2025') == 'Unpaid')
-    class_paid = sum(1 for b in boats_data if b.get('Class Dues 2025') == 'Paid')
-    class_unpaid = sum(1 for b in boats_data if b.get('Class Dues 2025') == 'Unpaid')
+    fleet_paid = sum(1 for b in boats_data if b.get('Fleet Dues') == 'Paid')
+    fleet_unpaid = sum(1 for b in boats_data if b.get('Fleet Dues') == 'Not Paid')
+    class_paid = sum(1 for b in boats_data if b.get('Class Dues') == 'Paid')
+    class_unpaid = sum(1 for b in boats_data if b.get('Class Dues') == 'Not Paid')
     
     print("\n" + "=" * 80)
     print("BOATS DATA PAYMENT STATUS REPORT")
     print("=" * 80)
     print(f"Total Boats:           {total}")
-    print(f"\nFleet Dues 2025:")
+    print(f"\nFleet Dues:")
     print(f"  Paid:                {fleet_paid} ({fleet_paid/total*100:.1f}%)")
     print(f"  Unpaid:              {fleet_unpaid} ({fleet_unpaid/total*100:.1f}%)")
-    print(f"\nClass Dues 2025:")
+    print(f"\nClass Dues:")
     print(f"  Paid:                {class_paid} ({class_paid/total*100:.1f}%)")
     print(f"  Unpaid:              {class_unpaid} ({class_unpaid/total*100:.1f}%)")
     print(f"  Unknown:             {total - class_paid - class_unpaid}")
@@ -166,7 +332,7 @@ def main():
     )
     parser.add_argument(
         'action',
-        choices=['enhance', 'update', 'merge', 'report'],
+        choices=['enhance', 'update', 'batch', 'merge', 'report'],
         help="Action to perform"
     )
     parser.add_argument(
@@ -195,6 +361,21 @@ def main():
         type=str,
         help="Payment method"
     )
+    parser.add_argument(
+        '--file',
+        type=Path,
+        help="CSV or JSONL of payments with hull, type, status, date, method columns (for batch action)"
+    )
+    parser.add_argument(
+        '--rejected',
+        type=Path,
+        help="Rejected rows report path (default: <file>_rejected.csv next to the batch file)"
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help="Validate the batch and report results without saving (for batch action)"
+    )
     parser.add_argument(
         '--tracker',
         type=Path,
@@ -225,28 +406,45 @@ def main():
             if not args.hull or not args.type:
                 print("❌ Error: --hull and --type required for update")
                 return 1
-            
-            # Ensure boat has payment fields
-            boats_data, _ = enhance_boat_data(boats_data)
-            
-            # Update payment status
-            success = update_boat_payment(
-                boats_data,
-                args.hull,
-                args.type,
-                paid=args.paid,
-                payment_date=args.date,
-                payment_method=args.method
-            )
-            
-            if success:
-                save_json(boats_data, BOATS_FILE)
-                print(f"✅ Updated {args.type} dues for hull {args.hull}")
-                generate_report(boats_data)
-            else:
+
+            if args.hull not in build_hull_index(boats_data):
                 print(f"❌ Boat hull {args.hull} not found")
                 return 1
-                
+
+            # Recorded in the payment ledger, which then updates boats_fleet22.json
+            record_payments([{
+                'hull': args.hull,
+                'type': args.type,
+                'status': 'Paid' if args.paid else 'Not Paid',
+                'date': args.date,
+                'method': args.method,
+            }])
+            print(f"✅ Updated {args.type} dues for hull {args.hull}")
+            generate_report(load_boats_data())
+
+        elif args.action == 'batch':
+            if not args.file:
+                print("❌ Error: --file required for batch")
+                return 1
+
+            batch_rows = load_payment_batch(args.file)
+            applied, unchanged, rejected = apply_payment_batch(boats_data, batch_rows)
+
+            if applied and not args.dry_run:
+                record_payments(applied, note=f"Batch {args.file.name}")
+
+            prefix = "🔍 Dry run: would update" if args.dry_run else "✅ Updated"
+            print(f"{prefix} {len(applied)} dues entries from {len(batch_rows)} rows")
+            if unchanged:
+                print(f"📝 {len(unchanged)} rows already matched the current status")
+
+            if rejected:
+                report_path = args.rejected or args.file.with_name(f"{args.file.stem}_rejected.csv")
+                write_rejected_report(rejected, report_path)
+                print(f"⚠️  {len(rejected)} rows rejected")
+                print(f"📄 Rejected rows: {report_path}")
+                return 1
+
         elif args.action == 'merge':
             # Merge payment data from tracker CSV
             boats_data, _ = enhance_boat_data(boats_data)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Boats data migration for Fleet22_us repository
+Upgrades boats_fleet22.json to the current schema version and rolls the dues
+season over, applying every pending migration in a single pass with one
+write. Replaces running simplify_dues_format.py and reset_dues_season.py by
+hand, one full rewrite each.
+"""
+import sys
+import argparse
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.logger import setup_logger
+from utils.boats_migrations import migrate_boats_file, stamp_file_for
+from utils.path_utils import PROJECT_ROOT, BOATS_FILE
+
+# Setup logging
+logger = setup_logger('migrate_boats', PROJECT_ROOT / 'logs' / 'data_management.log')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Migrate boats_fleet22.json to the latest schema and/or a new dues season"
+    )
+    parser.add_argument('--season', type=int,
+                        help="Roll dues over to this season (resets dues to Not Paid)")
+    parser.add_argument('--from-season', type=int,
+                        help="Season the boats file currently holds, when it has no schema stamp yet")
+    parser.add_argument('--fleet-only', action='store_true',
+                        help="On season rollover, keep Class Dues (they come from the J/105 membership data)")
+    parser.add_argument('--dry-run', action='store_true', help="Show the plan and a diff without writing")
+    parser.add_argument('--boats', type=Path, default=BOATS_FILE, help="Path to boats data JSON file")
+    parser.add_argument('--stamp', type=Path, help="Schema stamp file (default: next to the boats file)")
+    parser.add_argument('--yes', action='store_true', help="Skip confirmation prompt for season rollover")
+    args = parser.parse_args()
+
+    stamp_file = args.stamp or stamp_file_for(args.boats)
+
+    try:
+        plan = migrate_boats_file(args.boats, stamp_file, season=args.season,
+                                  fleet_only=args.fleet_only, dry_run=True, from_season=args.from_season)
+
+        print(f"📄 {args.boats.name}: schema v{plan['from_version']} -> v{plan['to_version']}, "
+              f"season {plan['from_season'] or 'unknown'} -> {plan['to_season'] or 'unknown'}")
+        if plan['from_season'] is None:
+            print(f"⚠️  No season stamp in {stamp_file.name}: give --season to roll over, "
+                  f"or --from-season to record the season the file holds")
+        if not plan['steps']:
+            print("✅ Already up to date")
+        for step in plan['steps']:
+            print(f"   - {step} ({plan['changed'][step]} boats changed)")
+
+        if args.dry_run:
+            if plan['diff']:
+                print()
+                print(plan['diff'], end='')
+            print("\n💡 Dry run - no files written")
+            return 0
+
+        if plan['rollover'] and not args.yes:
+            scope = "Fleet Dues" if args.fleet_only else "Fleet Dues and Class Dues"
+            print(f"⚠️  This will reset {scope} to 'Not Paid' for every boat")
+            if input("Continue? (yes/no): ").strip().lower() not in ('yes', 'y'):
+                print("❌ Cancelled")
+                return 1
+
+        result = migrate_boats_file(args.boats, stamp_file, season=args.season,
+                                    fleet_only=args.fleet_only, from_season=args.from_season)
+        if result['written']:
+            print(f"✅ Migrated to schema v{result['to_version']}, season {result['to_season'] or 'unknown'}")
+            if any(result['changed'].values()):
+                print(f"📁 {args.boats} (backup created)")
+            print(f"📝 Stamp: {stamp_file}")
+        return 0
+
+    except Exception as e:
+        logger.error(f"Error migrating boats data: {e}")
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+Payment ledger for Fleet22_us repository
+Records dues payments as append-only events in payment_ledger.jsonl. The
+Fleet Dues / Class Dues fields in boats_fleet22.json, for the season stamped
+in boats_fleet22.schema.json, are derived from it, and its entries are merged into each season's payment
+tracker CSV. A checkpoint file keeps the folded state and
+the ledger byte offset it covers, so each sync only reads new events.
+"""
+import sys
+import csv
+import json
+import os
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.logger import setup_logger
+from utils.data_loader import load_json, save_json
+from utils.boats_migrations import stamped_season
+from utils.path_utils import (
+    PROJECT_ROOT,
+    BOATS_FILE,
+    BOATS_SCHEMA_FILE,
+    PAYMENTS_DATA,
+    PAYMENT_LEDGER_FILE,
+    PAYMENT_LEDGER_CHECKPOINT,
+    ensure_directories
+)
+
+# Setup logging
+logger = setup_logger('payment_ledger', PROJECT_ROOT / 'logs' / 'data_management.log')
+
+CHECKPOINT_VERSION = 1
+DUES_FIELDS = {'fleet': 'Fleet Dues', 'class': 'Class Dues'}
+STATUSES = ('Paid', 'Not Paid')
+
+
+def _key(season, hull, dues_type):
+    return f"{season}|{hull}|{dues_type}"
+
+
+def _season(season, stamp_file=BOATS_SCHEMA_FILE):
+    """The given season, else the one stamped for boats_fleet22.json."""
+    if season is None:
+        season = stamped_season(stamp_file)
+    if season is None:
+        raise ValueError(f"No season given and {Path(stamp_file).name} has no stamped season; "
+                         f"pass a season or run migrate_boats.py --season")
+    return int(season)
+
+
+class PaymentLedger:
+    """Append-only payment events plus the folded state they produce.
+
+    State maps "season|hull|type" to the list of that key's active (not
+    voided) payment events in ledger order; the last one is current. Keeping
+    the list makes undo and as-of queries a walk over a handful of events
+    instead of a replay of the whole ledger.
+    """
+
+    def __init__(self, ledger_file=PAYMENT_LEDGER_FILE, checkpoint_file=PAYMENT_LEDGER_CHECKPOINT):
+        self.ledger_file = Path(ledger_file)
+        self.checkpoint_file = Path(checkpoint_file)
+        self.state = {}
+        self.events = 0
+        self.offset = 0
+        self._load_checkpoint()
+        self.catch_up()
+
+    def _load_checkpoint(self):
+        """Start from the checkpoint when it still matches the ledger file."""
+        if not self.checkpoint_file.exists():
+            return
+        try:
+            checkpoint = json.loads(self.checkpoint_file.read_text(encoding='utf-8'))
+            if checkpoint.get('version') != CHECKPOINT_VERSION:
+                raise ValueError("unsupported checkpoint version")
+            offset = checkpoint['offset']
+            size = self.ledger_file.stat().st_size if self.ledger_file.exists() else 0
+            if offset > size or self._line_before(offset) != checkpoint.get('last_line'):
+                raise ValueError("ledger no longer matches checkpoint")
+        except (ValueError, KeyError, OSError) as e:
+            logger.warning(f"Ignoring ledger checkpoint ({e}); replaying from the start")
+            return
+
+        self.state = checkpoint['state']
+        self.events = checkpoint['events']
+        self.offset = offset
+
+    def _line_before(self, offset):
+        """Return the ledger line that ends at byte `offset` (or '' at 0)."""
+        if offset == 0:
+            return ''
+        with open(self.ledger_file, 'rb') as f:
+            start = max(0, offset - 4096)
+            f.seek(start)
+            chunk = f.read(offset - start)
+        return chunk.rstrip(b'\n').rsplit(b'\n', 1)[-1].decode('utf-8')
+
+    def catch_up(self):
+        """Fold events appended since the last checkpoint. Returns how many."""
+        if not self.ledger_file.exists():
+            return 0
+
+        applied = 0
+        with open(self.ledger_file, 'rb') as f:
+            f.seek(self.offset)
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    # Partial trailing write; pick it up next time
+                    break
+                self.offset += len(raw)
+                if raw.strip():
+                    self._apply(json.loads(raw))
+                    applied += 1
+
+        if applied:
+            logger.info(f"Folded {applied} new ledger events (total {self.events})")
+        return applied
+
+    def _apply(self, event):
+        self.events = max(self.events, event['seq'])
+        if event['action'] == 'void':
+            target = event['target']
+            for key, active in self.state.items():
+                kept = [e for e in active if e['seq'] != target]
+                if len(kept) != len(active):
+                    self.state[key] = kept
+                    break
+            return
+
+        key = _key(event['season'], event['hull'], event['type'])
+        self.state.setdefault(key, []).append(event)
+
+    def save_checkpoint(self):
+        """Persist the folded state and the ledger offset it covers."""
+        checkpoint = {
+            'version': CHECKPOINT_VERSION,
+            'events': self.events,
+            'offset': self.offset,
+            'last_line': self._line_before(self.offset) if self.offset else '',
+            'state': self.state,
+        }
+        save_json(checkpoint, self.checkpoint_file, indent=None, create_backup=False)
+
+    def _append(self, event):
+        event = {'seq': self.events + 1,
+                 'recorded': datetime.now().isoformat(timespec='seconds'), **event}
+        self.ledger_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.ledger_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(event, ensure_ascii=False, sort_keys=True) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.catch_up()
+        return event
+
+    def record(self, hull, dues_type, status='Paid', season=None,
+               amount=None, method='', date=None, note='', undated=False):
+        """
+        Append a payment event. Returns the stored event.
+
+        `season` defaults to the stamped boats season. `date` defaults to
+        today; with undated=True (and no date) the event is stored without one
+        and counts from the start of its season.
+        """
+        season = _season(season)
+        dues_type = dues_type.lower()
+        if dues_type not in DUES_FIELDS:
+            raise ValueError(f"Dues type must be fleet or class, got '{dues_type}'")
+        if status not in STATUSES:
+            raise ValueError(f"Status must be one of {', '.join(STATUSES)}, got '{status}'")
+        if date or not undated:
+            date = date or datetime.now().strftime('%Y-%m-%d')
+            datetime.strptime(date, '%Y-%m-%d')
+        else:
+            date = None
+
+        event = self._append({
+            'action': 'payment',
+            'hull': str(hull).strip(),
+            'season': int(season),
+            'type': dues_type,
+            'status': status,
+            'amount': amount,
+            'method': method or '',
+            'date': date,
+            'note': note or '',
+        })
+        logger.info(f"Ledger #{event['seq']}: {dues_type} dues {status} for hull {hull} ({season})")
+        return event
+
+    def undo(self, seq=None, note=''):
+        """Void an active payment event (default: the most recent one)."""
+        active = {e['seq']: e for events in self.state.values() for e in events}
+        if not active:
+            raise ValueError("No payment events to undo")
+        seq = max(active) if seq is None else int(seq)
+        if seq not in active:
+            raise ValueError(f"Event #{seq} is not an active payment")
+
+        self._append({'action': 'void', 'target': seq, 'note': note or ''})
+        logger.info(f"Voided ledger event #{seq}")
+        return active[seq]
+
+    def state_as_of(self, season=None, as_of=None):
+        """
+        Current entry per (hull, dues type) for a season.
+
+        Args:
+            season: Dues season (default: the stamped boats season)
+            as_of: Optional YYYY-MM-DD; only payments dated on or before it
+                count (undated ones from January 1 of the season)
+
+        Returns:
+            Dict of (hull, type) -> event
+        """
+        season = _season(season)
+        prefix = f"{season}|"
+        season_start = f"{int(season):04d}-01-01"
+        result = {}
+        for key, events in self.state.items():
+            if not key.startswith(prefix):
+                continue
+            for event in reversed(events):
+                if as_of is None or (event['date'] or season_start) <= as_of:
+                    result[(event['hull'], event['type'])] = event
+                    break
+        return result
+
+    def touched(self, season=None):
+        """(hull, type) pairs the ledger has ever recorded for a season."""
+        prefix = f"{_season(season)}|"
+        return {tuple(key.split('|')[1:]) for key in self.state if key.startswith(prefix)}
+
+    def history(self, hull):
+        """All ledger events (including voided ones and voids) for a hull."""
+        if not self.ledger_file.exists():
+            return []
+        hull = str(hull)
+        events = []
+        with open(self.ledger_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    events.append(json.loads(line))
+        seqs = {e['seq'] for e in events if e.get('hull') == hull}
+        return [e for e in events if e['seq'] in seqs or e.get('target') in seqs]
+
+
+def import_from_boats(ledger, boats_data, season=None, date=None):
+    """
+    Seed an empty ledger with the Paid dues currently in boats_fleet22.json.
+
+    The boats file does not say when dues were paid, so imported events are
+    undated unless the caller supplies a date.
+    """
+    if ledger.events:
+        raise ValueError("Ledger already has events; import only seeds an empty ledger")
+
+    imported = 0
+    for boat in boats_data:
+        for dues_type, field in DUES_FIELDS.items():
+            if boat.get(field) == 'Paid':
+                ledger.record(boat.get('Hull Number', ''), dues_type, 'Paid', season,
+                              date=date, undated=True, note=f"Imported from {BOATS_FILE.name}")
+                imported += 1
+    return imported
+
+
+def apply_to_boats(boats_data, entries, touched):
+    """
+    Set dues fields from ledger entries.
+
+    Fields the ledger has never recorded are left as-is; fields whose events
+    were all voided fall back to Not Paid.
+    """
+    changed = 0
+    for boat in boats_data:
+        hull = str(boat.get('Hull Number', ''))
+        for dues_type, field in DUES_FIELDS.items():
+            if (hull, dues_type) not in touched:
+                continue
+            event = entries.get((hull, dues_type))
+            status = event['status'] if event else 'Not Paid'
+            if boat.get(field) != status:
+                boat[field] = status
+                changed += 1
+    return changed
+
+
+def _hull_order(hull):
+    return int(hull) if str(hull).isdigit() else 0
+
+
+def write_tracker(boats_data, entries, touched, season, output_file):
+    """
+    Merge ledger entries into the season's payment tracker CSV (fleet dues).
+
+    Existing rows are kept: only hulls the ledger has recorded fleet dues for
+    get their paid/date/method/amount columns replaced, so payments entered
+    with payment_tracker.py and columns such as Contact Email survive. Boats
+    missing from the tracker are added as unpaid.
+    """
+    output_path = Path(output_file)
+    paid_column = f"Paid {season}"
+    fieldnames = ['Hull', 'Boat Name', 'Yacht Club', paid_column, 'Payment Date',
+                  'Payment Method', 'Amount', 'Contact Email', 'Notes']
+    rows = {}
+    if output_path.exists():
+        with open(output_path, 'r', newline='') as csvfile:
+            reader = csv.DictReader(csvfile)
+            existing = list(reader.fieldnames or [])
+            rows = {row['Hull']: row for row in reader}
+        if existing:
+            paid_column = next((f for f in existing if f.startswith('Paid ')), paid_column)
+            fieldnames = existing + [f for f in fieldnames
+                                     if f not in existing and not f.startswith('Paid ')]
+            if paid_column not in fieldnames:
+                fieldnames.insert(min(3, len(fieldnames)), paid_column)
+
+    for boat in boats_data:
+        hull = str(boat.get('Hull Number', ''))
+        row = rows.setdefault(hull, {field: '' for field in fieldnames})
+        row.update({'Hull': hull, paid_column: row.get(paid_column) or 'NO'})
+        for column in ('Boat Name', 'Yacht Club'):
+            row[column] = row.get(column) or boat.get(column, '')
+
+    for hull, row in rows.items():
+        if (hull, 'fleet') not in touched:
+            continue
+        event = entries.get((hull, 'fleet'))
+        if event is not None and event['status'] == 'Paid':
+            row[paid_column] = 'YES'
+            row['Payment Date'] = event['date'] or row.get('Payment Date', '')
+            row['Payment Method'] = event['method'] or row.get('Payment Method', '')
+            if event.get('amount'):
+                row['Amount'] = f"${event['amount']:g}"
+        else:
+            # Recorded as Not Paid, or every payment voided
+            row.update({paid_column: 'NO', 'Payment Date': '', 'Payment Method': '', 'Amount': ''})
+        if event is not None and event.get('note'):
+            row['Notes'] = event['note']
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(f".{output_path.name}.tmp")
+    with open(tmp_path, 'w', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
+        writer.writeheader()
+        for hull in sorted(rows, key=_hull_order):
+            writer.writerow({field: rows[hull].get(field, '') for field in fieldnames})
+    os.replace(tmp_path, output_path)
+    logger.info(f"Payment tracker written to {output_path}")
+    return output_path
+
+
+def sync_outputs(ledger, season=None, boats_file=BOATS_FILE, tracker_file=None,
+                 stamp_file=BOATS_SCHEMA_FILE):
+    """
+    Checkpoint the ledger and refresh the season's tracker CSV.
+
+    The Fleet Dues / Class Dues fields in boats_fleet22.json hold one season,
+    the one stamped in `stamp_file`, so they are updated only when `season`
+    (default: that season) matches it; an unstamped boats file is never
+    updated.
+
+    Returns:
+        (number of boats fields changed, tracker path)
+    """
+    boats_season = stamped_season(stamp_file)
+    season = _season(season, stamp_file)
+    ledger.save_checkpoint()
+    entries = ledger.state_as_of(season)
+    touched = ledger.touched(season)
+
+    boats_data = load_json(Path(boats_file))
+    changed = 0
+    if season == boats_season:
+        changed = apply_to_boats(boats_data, entries, touched)
+        if changed:
+            save_json(boats_data, boats_file)
+    elif boats_season is None:
+        logger.warning(f"{Path(stamp_file).name} has no stamped season; "
+                       f"{Path(boats_file).name} left unchanged")
+    else:
+        logger.info(f"{Path(boats_file).name} holds season {boats_season}, not {season}; left unchanged")
+
+    tracker_file = tracker_file or PAYMENTS_DATA / f"payment_tracker_{season}.csv"
+    write_tracker(boats_data, entries, touched, season, tracker_file)
+    return changed, tracker_file
+
+
+def print_state(entries, season, as_of=None):
+    label = f" as of {as_of}" if as_of else ""
+    print(f"\nPAYMENT LEDGER STATE - {season}{label}")
+    print("=" * 80)
+    if not entries:
+        print("  No payments recorded")
+        return
+    for (hull, dues_type), event in sorted(entries.items(),
+                                           key=lambda x: (int(x[0][0]) if x[0][0].isdigit() else 0, x[0][1])):
+        amount = f"${event['amount']:g}" if event.get('amount') else ''
+        print(f"  Hull {hull:>4} | {dues_type:<5} | {event['status']:<8} | {event['date'] or 'undated':<10} | "
+              f"{event['method']:<8} | {amount:>6} | #{event['seq']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Append-only dues payment ledger"
+    )
+    parser.add_argument(
+        'action',
+        choices=['record', 'undo', 'state', 'history', 'sync', 'import'],
+        help="Action to perform"
+    )
+    parser.add_argument('--hull', type=str, help="Hull number (record, history)")
+    parser.add_argument('--type', choices=['fleet', 'class'], default='fleet',
+                        help="Dues type (default: fleet)")
+    parser.add_argument('--status', choices=STATUSES, default='Paid',
+                        help="Dues status to record (default: Paid)")
+    parser.add_argument('--season', type=int,
+                        help=f"Dues season (default: the season stamped in {BOATS_SCHEMA_FILE.name})")
+    parser.add_argument('--amount', type=float, help="Amount paid")
+    parser.add_argument('--method', type=str, default='', help="Payment method")
+    parser.add_argument('--date', type=str,
+                        help="Payment date YYYY-MM-DD (record default: today; import default: undated)")
+    parser.add_argument('--note', type=str, default='', help="Free-text note")
+    parser.add_argument('--seq', type=int, help="Event number to void (undo; default: latest)")
+    parser.add_argument('--as-of', type=str, help="Show state as of YYYY-MM-DD (state)")
+    parser.add_argument('--no-sync', action='store_true',
+                        help="Do not refresh boats_fleet22.json and the tracker CSV")
+    args = parser.parse_args()
+
+    try:
+        ensure_directories()
+        ledger = PaymentLedger()
+        args.season = _season(args.season)
+
+        if args.action == 'record':
+            if not args.hull:
+                print("❌ Error: --hull required for record")
+                return 1
+            event = ledger.record(args.hull, args.type, args.status, args.season,
+                                  amount=args.amount, method=args.method,
+                                  date=args.date, note=args.note)
+            print(f"✅ Recorded #{event['seq']}: hull {event['hull']} {event['type']} dues "
+                  f"{event['status']} ({event['season']})")
+
+        elif args.action == 'undo':
+            event = ledger.undo(args.seq, note=args.note)
+            print(f"↩️  Voided #{event['seq']}: hull {event['hull']} {event['type']} dues "
+                  f"{event['status']} ({event['season']})")
+
+        elif args.action == 'import':
+            count = import_from_boats(ledger, load_json(BOATS_FILE), args.season, date=args.date)
+            print(f"✅ Imported {count} paid dues entries from {BOATS_FILE.name}")
+
+        elif args.action == 'state':
+            print_state(ledger.state_as_of(args.season, args.as_of), args.season, args.as_of)
+            return 0
+
+        elif args.action == 'history':
+            if not args.hull:
+                print("❌ Error: --hull required for history")
+                return 1
+            for event in ledger.history(args.hull):
+                print(json.dumps(event, ensure_ascii=False))
+            return 0
+
+        if args.action == 'sync' or not args.no_sync:
+            changed, tracker_path = sync_outputs(ledger, args.season)
+            print(f"📝 Updated {changed} dues fields in {BOATS_FILE.name}")
+            print(f"📄 Tracker: {tracker_path}")
+        else:
+            ledger.save_checkpoint()
+
+        return 0
+
+    except Exception as e:
+        logger.error(f"Error in payment ledger: {e}")
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
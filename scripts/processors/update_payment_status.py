@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 """
 Payment status update script for Fleet22_us repository
-Updates boats_fleet22.json with Class Dues payment status from membership data.
-Fleet Dues are manually maintained in boats_fleet22.json.
+Records Class Dues payment status from membership data in the payment ledger,
+which then updates boats_fleet22.json. The ledger is the only writer of the
+boats dues fields; Fleet Dues are recorded there by the treasurer's tools.
 """
 import sys
 from datetime import datetime
@@ -13,6 +14,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from utils.logger import setup_logger
 from utils.data_loader import load_json, save_json
+from utils.membership_index import MembershipIndex
+from utils.boats_migrations import stamped_season
+from utils.report_renderer import Column, Report, Table, render_report
 from utils.path_utils import (
     PROJECT_ROOT,
     BOATS_FILE,
@@ -20,6 +24,7 @@ from utils.path_utils import (
     PAYMENTS_DATA,
     ensure_directories
 )
+from processors.payment_ledger import PaymentLedger, sync_outputs
 
 # Setup logging
 logger = setup_logger('payment_sync', PROJECT_ROOT / 'logs' / 'data_management.log')
@@ -28,44 +33,34 @@ logger = setup_logger('payment_sync', PROJECT_ROOT / 'logs' / 'data_management.l
 CURRENT_YEAR = datetime.now().year
 
 
-def sync_class_dues_from_members(boats_data, members_data):
-    """Sync Class Dues payment status from J/105 members data (simplified format)."""
+def sync_class_dues_from_members(boats_data, members_data, season=CURRENT_YEAR):
+    """Sync Class Dues payment status from J/105 members data (simplified format).
+
+    Sets the fields on boats_data in memory only (watch mode reports use a
+    copy); record_class_dues() records them in the payment ledger.
+    members_data may be the raw member records or a prebuilt MembershipIndex.
+    """
     updated_count = 0
     
     try:
-        # Extract hull numbers from boats for quick lookup
-        boats_hull_numbers = {str(boat["Hull Number"]) for boat in boats_data}
-        
-        # Track latest membership status per hull
-        latest_membership_status = {}
-        
-        for member in members_data:
-            hull_number = str(member.get("Hull", ""))
-            if hull_number in boats_hull_numbers:
-                membership = member.get("Class Membership", "")
-                membership_parts = membership.split()
-                
-                if membership_parts and membership_parts[-1].isdigit():
-                    year = int(membership_parts[-1])
-                    if hull_number not in latest_membership_status or year > latest_membership_status[hull_number]["year"]:
-                        latest_membership_status[hull_number] = {
-                            "year": year,
-                            "status": membership
-                        }
+        if isinstance(members_data, MembershipIndex):
+            membership = members_data
+        else:
+            membership = MembershipIndex.from_records(members_data)
         
         # Update boats with Class Dues status (simplified format)
         for boat in boats_data:
             hull_number = str(boat.get("Hull Number", ""))
-            member_info = latest_membership_status.get(hull_number)
             
-            if member_info and member_info["year"] == CURRENT_YEAR:
+            if membership.paid_in(hull_number, season):
                 boat['Class Dues'] = 'Paid'
                 updated_count += 1
-                logger.info(f"Hull {hull_number} ({boat.get('Boat Name', 'Unknown')}): Class Dues Paid for {CURRENT_YEAR}")
+                logger.info(f"Hull {hull_number} ({boat.get('Boat Name', 'Unknown')}): Class Dues Paid for {season}")
             else:
                 boat['Class Dues'] = 'Not Paid'
-                if member_info:
-                    logger.info(f"Hull {hull_number}: Class Dues not paid for {CURRENT_YEAR} (last paid: {member_info['year']})")
+                last_paid = membership.latest_year(hull_number)
+                if last_paid:
+                    logger.info(f"Hull {hull_number}: Class Dues not paid for {season} (last paid: {last_paid})")
         
         logger.info(f"Synced Class Dues for {updated_count} boats from members data")
         return boats_data, updated_count
@@ -75,7 +70,30 @@ def sync_class_dues_from_members(boats_data, members_data):
         return boats_data, 0
 
 
-def generate_summary_report(boats_data):
+def record_class_dues(ledger, boats_data, members_data, season):
+    """
+    Record Class Dues from members data in the payment ledger.
+
+    Only hulls whose members-derived status differs from the ledger's current
+    class dues entry get a new event, so re-running is a no-op.
+
+    Returns:
+        Number of events recorded
+    """
+    synced, _ = sync_class_dues_from_members([dict(b) for b in boats_data], members_data, season)
+    current = ledger.state_as_of(season)
+    recorded = 0
+    for boat in synced:
+        hull = str(boat.get('Hull Number', ''))
+        event = current.get((hull, 'class'))
+        if event is None or event['status'] != boat['Class Dues']:
+            ledger.record(hull, 'class', boat['Class Dues'], season, undated=True,
+                          note=f"Synced from {MEMBERS_FILE.name}")
+            recorded += 1
+    return recorded
+
+
+def generate_summary_report(boats_data, season=CURRENT_YEAR):
     """Generate summary statistics for both Fleet and Class Dues (simplified format)."""
     total = len(boats_data)
     
@@ -92,7 +110,7 @@ def generate_summary_report(boats_data):
     
     summary = f"""
 {'='*80}
-PAYMENT STATUS SYNC REPORT - {CURRENT_YEAR}
+PAYMENT STATUS SYNC REPORT - {season}
 Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 {'='*80}
 
@@ -112,12 +130,12 @@ Unknown:           {class_unknown}
 
 DATA SOURCES
 ------------
-✓ Fleet Dues: Manually maintained in boats_fleet22.json
-✓ Class Dues: Synced from j105_members_status.json
+✓ Fleet Dues: Recorded in the payment ledger (payment_ledger.py)
+✓ Class Dues: Synced from j105_members_status.json into the payment ledger
 
 NEXT STEPS
 ----------
-1. Manually update Fleet Dues status in boats_fleet22.json as payments received
+1. Record Fleet Dues payments with payment_ledger.py or payment_tracker.py as they arrive
 2. Re-run this script to sync Class Dues from membership data
 3. Web pages will automatically show updated status
 """
@@ -153,46 +171,48 @@ def main():
         logger.info(f"✓ Loaded {len(boats_data)} boats")
         print(f"Loaded {len(boats_data)} boats from boats_fleet22.json")
         
-        # Fleet Dues are manually maintained in boats_fleet22.json
-        print("\n� Fleet Dues: Manually maintained in boats_fleet22.json")
-        logger.info("Fleet Dues status preserved from boats_fleet22.json (manual updates)")
+        season = stamped_season()
+        if season is None:
+            print("❌ Error: boats_fleet22.json has no stamped season; run migrate_boats.py --season first")
+            return False
+
+        # Fleet Dues come from the payment ledger and are left as they are
+        print(f"\n💰 Fleet Dues: recorded in the payment ledger")
+        logger.info("Fleet Dues status preserved from the payment ledger")
         
         # Load members data for Class Dues
         logger.info(f"\nLoading members data from {MEMBERS_FILE}")
         members_data = load_json(MEMBERS_FILE)
         if members_data:
             logger.info(f"✓ Loaded {len(members_data)} member records")
-            print(f"\n📊 Syncing Class Dues from J/105 members data...")
-            boats_data, class_count = sync_class_dues_from_members(boats_data, members_data)
-            print(f"✓ Updated Class Dues for {class_count} boats")
+            print(f"\n📊 Syncing {season} Class Dues from J/105 members data...")
+            ledger = PaymentLedger()
+            recorded = record_class_dues(ledger, boats_data, members_data, season)
+            changed, _ = sync_outputs(ledger, season)
+            boats_data = load_json(BOATS_FILE)
+            print(f"✓ Recorded {recorded} Class Dues changes in the ledger, {changed} boats fields updated")
         else:
             logger.warning(f"Failed to load members data from {MEMBERS_FILE}")
             print("⚠️  Warning: Could not sync Class Dues (members data unavailable)")
         
-        # Save updated boats data
-        logger.info(f"\nSaving updated boats data to {BOATS_FILE}")
-        save_json(boats_data, BOATS_FILE)
-        logger.info("✓ Boats data saved with automatic backup")
-        print(f"\n💾 Saved updated data to boats_fleet22.json (backup created)")
-        
         # Generate and display summary
-        summary, stats = generate_summary_report(boats_data)
+        summary, stats = generate_summary_report(boats_data, season)
         print(summary)
         logger.info(summary)
         
         # Save summary to file
-        summary_path = PAYMENTS_DATA / f"payment_sync_summary_{CURRENT_YEAR}.txt"
+        summary_path = PAYMENTS_DATA / f"payment_sync_summary_{season}.txt"
         summary_path.write_text(summary)
         logger.info(f"Summary saved to {summary_path}")
         
         # Generate detailed report
-        report_path = generate_detailed_report(boats_data, CURRENT_YEAR)
+        report_path = generate_detailed_report(boats_data, season)
         logger.info(f"Detailed report saved to {report_path}")
         
         print(f"\n✅ Payment synchronization completed successfully!")
         print(f"📄 Summary: {summary_path}")
         print(f"📄 Report: {report_path}")
-        print(f"\n💡 Tip: Manually update Fleet Dues in boats_fleet22.json as payments arrive")
+        print(f"\n💡 Tip: Record Fleet Dues with payment_ledger.py record as payments arrive")
         print(f"💡 Tip: Re-run this script weekly to sync Class Dues from membership data")
         
         return True
@@ -203,73 +223,47 @@ def main():
         return False
 
 
-def generate_detailed_report(boats_data, year):
-    """Generate a detailed payment status report for both Fleet and Class Dues (simplified format)."""
-    
-    # Sort boats
-    def get_hull_sort_key(boat):
-        hull = boat.get('Hull Number', '')
-        try:
-            return int(hull)
-        except (ValueError, TypeError):
-            return 99999
-    
-    # Categorize by payment status (simplified format)
-    fleet_paid = sorted([b for b in boats_data if b.get('Fleet Dues') == 'Paid'], 
-                        key=get_hull_sort_key)
-    fleet_unpaid = sorted([b for b in boats_data if b.get('Fleet Dues') != 'Paid'], 
-                          key=get_hull_sort_key)
-    
-    class_paid = sorted([b for b in boats_data if b.get('Class Dues') == 'Paid'], 
-                        key=get_hull_sort_key)
-    class_unpaid = sorted([b for b in boats_data if b.get('Class Dues') == 'Not Paid'], 
-                          key=get_hull_sort_key)
-    
-    # Build report
-    report = f"{'='*80}\n"
-    report += f"DETAILED PAYMENT STATUS REPORT - {year}\n"
-    report += f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-    report += f"{'='*80}\n\n"
-    
-    # Fleet Dues Section (simplified format)
-    report += f"FLEET DUES - PAID BOATS ({len(fleet_paid)})\n"
-    report += "-" * 80 + "\n"
-    for boat in fleet_paid:
-        report += f"Hull {boat.get('Hull Number', ''):>4} | "
-        report += f"{boat.get('Boat Name', 'Unknown'):<30} | "
-        report += f"{boat.get('Yacht Club', ''):<10} | "
-        report += f"PAID\n"
-    
-    report += f"\nFLEET DUES - UNPAID BOATS ({len(fleet_unpaid)})\n"
-    report += "-" * 80 + "\n"
-    for boat in fleet_unpaid:
-        report += f"Hull {boat.get('Hull Number', ''):>4} | "
-        report += f"{boat.get('Boat Name', 'Unknown'):<30} | "
-        report += f"{boat.get('Yacht Club', ''):<10} | "
-        report += f"NOT PAID\n"
-    
-    # Class Dues Section (simplified format)
-    report += f"\n\nCLASS DUES - PAID BOATS ({len(class_paid)})\n"
-    report += "-" * 80 + "\n"
-    for boat in class_paid:
-        report += f"Hull {boat.get('Hull Number', ''):>4} | "
-        report += f"{boat.get('Boat Name', 'Unknown'):<30} | "
-        report += f"{boat.get('Yacht Club', ''):<10} | "
-        report += f"PAID\n"
-    
-    report += f"\nCLASS DUES - UNPAID BOATS ({len(class_unpaid)})\n"
-    report += "-" * 80 + "\n"
-    for boat in class_unpaid:
-        report += f"Hull {boat.get('Hull Number', ''):>4} | "
-        report += f"{boat.get('Boat Name', 'Unknown'):<30} | "
-        report += f"{boat.get('Yacht Club', ''):<10} | "
-        report += f"NOT PAID\n"
-    
-    # Save the report
+def detailed_report_definition(year):
+    """Tables for the detailed Fleet/Class Dues report (simplified format)."""
+    def status_column(label):
+        return Column('Status', lambda boat: label)
+
+    columns = [
+        Column('Hull', 'Hull Number', width=4, align='>', prefix='Hull '),
+        Column('Boat Name', lambda boat: boat.get('Boat Name') or 'Unknown', width=30),
+        Column('Yacht Club', 'Yacht Club', width=10),
+    ]
+    return Report(f"DETAILED PAYMENT STATUS REPORT - {year}", [
+        Table('fleet_paid', 'FLEET DUES - PAID BOATS', columns + [status_column('PAID')],
+              where=lambda b: b.get('Fleet Dues') == 'Paid'),
+        Table('fleet_unpaid', 'FLEET DUES - UNPAID BOATS', columns + [status_column('NOT PAID')],
+              where=lambda b: b.get('Fleet Dues') != 'Paid'),
+        Table('class_paid', 'CLASS DUES - PAID BOATS', columns + [status_column('PAID')],
+              where=lambda b: b.get('Class Dues') == 'Paid'),
+        Table('class_unpaid', 'CLASS DUES - UNPAID BOATS', columns + [status_column('NOT PAID')],
+              where=lambda b: b.get('Class Dues') == 'Not Paid'),
+    ])
+
+
+def generate_detailed_report(boats_data, year, formats=('txt',), split_by_club=False):
+    """
+    Generate the detailed payment status report for both Fleet and Class Dues.
+
+    All formats (txt, csv, md, html) and optional per-yacht-club reports are
+    rendered from one pass over boats_data.
+
+    Returns:
+        Path of the full text report (or the first requested format)
+    """
     report_path = PAYMENTS_DATA / f"payment_sync_report_{year}.txt"
-    report_path.write_text(report)
-    
-    return report_path
+    written = render_report(
+        detailed_report_definition(year),
+        boats_data,
+        output=report_path,
+        formats=formats,
+        split_field='Yacht Club' if split_by_club else None
+    )
+    return written.get((None, 'txt'), written[(None, formats[0])])
 
 
 if __name__ == "__main__":
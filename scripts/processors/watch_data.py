@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Data watcher for Fleet22_us repository
+Keeps the source datasets loaded in memory and regenerates only the derived
+outputs affected by a change (payment summary, detailed report, combined data,
+statistics). Uses inotify on Linux and falls back to mtime polling elsewhere.
+"""
+import sys
+import os
+import copy
+import time
+import select
+import struct
+import hashlib
+import argparse
+import ctypes
+import ctypes.util
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.logger import setup_logger
+from utils.data_loader import load_json
+from utils.path_utils import (
+    PROJECT_ROOT,
+    BOATS_FILE,
+    SAILS_FILE,
+    MEMBERS_FILE,
+    PAYMENTS_DATA,
+    ensure_directories
+)
+from utils.boats_migrations import stamped_season
+from processors.update_payment_status import (
+    CURRENT_YEAR,
+    sync_class_dues_from_members,
+    generate_summary_report,
+    generate_detailed_report
+)
+from processors.combine_data_sources import (
+    combine_boat_data,
+    save_combined_data,
+    save_certificate_index,
+    generate_fleet_statistics
+)
+
+# Setup logging
+logger = setup_logger('data_watcher', PROJECT_ROOT / 'logs' / 'data_management.log')
+
+# Derived outputs and the source files they depend on, in regeneration order
+OUTPUT_DEPENDENCIES = {
+    'payment_summary': {BOATS_FILE, MEMBERS_FILE},
+    'detailed_report': {BOATS_FILE, MEMBERS_FILE},
+    'combined_data': {BOATS_FILE, MEMBERS_FILE, SAILS_FILE},
+    'certificate_index': {BOATS_FILE, MEMBERS_FILE, SAILS_FILE},
+    'statistics': {BOATS_FILE, MEMBERS_FILE, SAILS_FILE},
+}
+
+# inotify constants (see <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_EVENT_HEADER = struct.Struct('iIII')
+
+
+class DatasetCache:
+    """
+    Parsed source datasets, reloaded only when their content changes.
+
+    Entries are keyed by resolved path, so a change reported for the real file
+    and a lookup through a symlinked checkout hit the same entry.
+    """
+
+    def __init__(self, paths):
+        self._entries = {Path(p).resolve(): (None, None) for p in paths}
+
+    def refresh(self, path):
+        """Reload a file if its bytes changed. Returns True when the data changed."""
+        path = Path(path).resolve()
+        try:
+            raw = path.read_bytes()
+        except FileNotFoundError:
+            logger.warning(f"Watched file missing: {path}")
+            return False
+
+        digest = hashlib.sha256(raw).hexdigest()
+        if self._entries.get(path, (None, None))[0] == digest:
+            return False
+
+        try:
+            data = load_json(path)
+        except ValueError as e:
+            # Half-written file from an editor; keep the last good copy
+            logger.warning(f"Skipping unparsable update to {path.name}: {e}")
+            return False
+
+        self._entries[path] = (digest, data)
+        return True
+
+    def get(self, path):
+        """Return the cached data for a file, loading it on first use."""
+        path = Path(path).resolve()
+        if self._entries.get(path, (None, None))[1] is None:
+            self.refresh(path)
+        return self._entries.get(path, (None, None))[1]
+
+
+class PollingSource:
+    """Change source that compares file mtimes at a fixed interval."""
+
+    def __init__(self, paths, interval=1.0):
+        self.paths = [Path(p) for p in paths]
+        self.interval = interval
+        self._mtimes = {p: self._mtime(p) for p in self.paths}
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def wait(self, timeout=None):
+        """Block up to timeout seconds and return the set of changed paths."""
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        changed = set()
+        for path in self.paths:
+            mtime = self._mtime(path)
+            if mtime != self._mtimes[path]:
+                self._mtimes[path] = mtime
+                changed.add(path)
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifySource:
+    """Change source backed by Linux inotify on the parent directories.
+
+    Directories are watched (not the files) so editors that save via
+    write-and-rename are still picked up.
+    """
+
+    def __init__(self, paths):
+        libc_name = ctypes.util.find_library('c')
+        if not sys.platform.startswith('linux') or not libc_name:
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError("libc does not provide inotify")
+
+        self.paths = {Path(p).resolve() for p in paths}
+        self._fd = libc.inotify_init1(os.O_NONBLOCK)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._dirs = {}
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        for directory in {p.parent for p in self.paths}:
+            wd = libc.inotify_add_watch(self._fd, str(directory).encode(), mask)
+            if wd < 0:
+                os.close(self._fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+            self._dirs[wd] = directory
+
+    def wait(self, timeout=None):
+        """Block up to timeout seconds and return the set of changed paths."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        buffer = os.read(self._fd, 64 * 1024)
+        changed = set()
+        offset = 0
+        while offset < len(buffer):
+            wd, _mask, _cookie, length = IN_EVENT_HEADER.unpack_from(buffer, offset)
+            offset += IN_EVENT_HEADER.size
+            name = buffer[offset:offset + length].rstrip(b'\0').decode()
+            offset += length
+            path = self._dirs.get(wd, Path()) / name
+            if path in self.paths:
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+def create_change_source(paths, force_polling=False, interval=1.0):
+    """Return an inotify source when available, otherwise a polling source."""
+    if not force_polling:
+        try:
+            source = InotifySource(paths)
+            logger.info("Watching with inotify")
+            return source
+        except OSError as e:
+            logger.info(f"inotify unavailable ({e}); falling back to polling")
+    logger.info(f"Watching with {interval:.1f}s polling")
+    return PollingSource(paths, interval)
+
+
+def affected_outputs(changed_paths):
+    """Return the derived outputs that depend on any of the changed files."""
+    changed = {Path(p).resolve() for p in changed_paths}
+    return [
+        output for output, sources in OUTPUT_DEPENDENCIES.items()
+        if changed & {s.resolve() for s in sources}
+    ]
+
+
+def regenerate(outputs, cache):
+    """Rebuild the requested outputs from the in-memory datasets."""
+    started = time.perf_counter()
+    boats_data = cache.get(BOATS_FILE) or []
+    members_data = cache.get(MEMBERS_FILE) or []
+
+    if {'payment_summary', 'detailed_report'} & set(outputs):
+        # Class Dues are synced on a copy; the treasurer's file is never rewritten here
+        season = stamped_season() or CURRENT_YEAR
+        synced_boats, _ = sync_class_dues_from_members(copy.deepcopy(boats_data), members_data, season)
+
+        if 'payment_summary' in outputs:
+            summary, _ = generate_summary_report(synced_boats, season)
+            summary_path = PAYMENTS_DATA / f"payment_sync_summary_{season}.txt"
+            summary_path.write_text(summary)
+            logger.info(f"Summary saved to {summary_path}")
+
+        if 'detailed_report' in outputs:
+            report_path = generate_detailed_report(synced_boats, season)
+            logger.info(f"Detailed report saved to {report_path}")
+
+    if {'combined_data', 'certificate_index', 'statistics'} & set(outputs):
+        combined_data = combine_boat_data(
+            cache.get(SAILS_FILE) or [],
+            members_data,
+            boats_data
+        )
+        if 'combined_data' in outputs:
+            save_combined_data(combined_data, create_backup=False)
+        if 'certificate_index' in outputs:
+            save_certificate_index(combined_data, create_backup=False)
+        if 'statistics' in outputs:
+            generate_fleet_statistics(combined_data, create_backup=False)
+
+    elapsed = (time.perf_counter() - started) * 1000
+    logger.info(f"Regenerated {', '.join(outputs)} in {elapsed:.0f} ms")
+    print(f"🔄 Regenerated {', '.join(outputs)} ({elapsed:.0f} ms)")
+
+
+def safe_regenerate(outputs, cache):
+    """Regenerate, logging a failure instead of ending the watch loop."""
+    try:
+        regenerate(outputs, cache)
+        return True
+    except Exception as e:
+        logger.error(f"Error regenerating {', '.join(outputs)}: {e}")
+        print(f"❌ Error regenerating {', '.join(outputs)}: {e} (still watching)")
+        return False
+
+
+def watch(source, cache, debounce=2.0):
+    """Main loop: collect changes until quiet for `debounce` seconds, then rebuild."""
+    pending = set()
+    deadline = None
+
+    while True:
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        changed = source.wait(timeout)
+
+        if changed:
+            pending |= changed
+            deadline = time.monotonic() + debounce
+            continue
+
+        if pending and time.monotonic() >= deadline:
+            refreshed = [p for p in pending if cache.refresh(p)]
+            pending.clear()
+            deadline = None
+
+            outputs = affected_outputs(refreshed)
+            if outputs:
+                logger.info(f"Changed: {', '.join(Path(p).name for p in refreshed)}")
+                safe_regenerate(outputs, cache)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Watch source data files and regenerate derived outputs on change"
+    )
+    parser.add_argument(
+        '--debounce',
+        type=float,
+        default=2.0,
+        help="Seconds of quiet after the last change before regenerating (default: 2.0)"
+    )
+    parser.add_argument(
+        '--poll',
+        action='store_true',
+        help="Force mtime polling instead of inotify"
+    )
+    parser.add_argument(
+        '--interval',
+        type=float,
+        default=1.0,
+        help="Polling interval in seconds (default: 1.0)"
+    )
+    parser.add_argument(
+        '--no-initial',
+        action='store_true',
+        help="Skip the full regeneration at startup"
+    )
+    args = parser.parse_args()
+
+    ensure_directories()
+    watched = [BOATS_FILE, MEMBERS_FILE, SAILS_FILE]
+    cache = DatasetCache(watched)
+    for path in watched:
+        cache.refresh(path)
+
+    if not args.no_initial:
+        safe_regenerate(list(OUTPUT_DEPENDENCIES), cache)
+
+    source = create_change_source(watched, force_polling=args.poll, interval=args.interval)
+    print(f"👀 Watching {', '.join(p.name for p in watched)} (Ctrl+C to stop)")
+
+    try:
+        watch(source, cache, debounce=args.debounce)
+    except KeyboardInterrupt:
+        print("\n🛑 Watcher stopped")
+    finally:
+        source.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Event roster builder for Fleet22_us repository
+Lists the latest sail certificate of each type for every hull on an entry
+list, as in data/sails/NA_2024_RacersSailTags.csv. Entries come from hull
+numbers, a CSV with a Hull column, or a results file with a Sail Number
+column ("CAN 83", "USA 003"). The latest tag per hull and sail type is
+found with one grouped max-reduce over the sail tags.
+"""
+import sys
+import csv
+import re
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.logger import setup_logger
+from utils.data_loader import load_json, save_json
+from utils.path_utils import PROJECT_ROOT, SAILS_FILE
+from utils.sailmakers import get_canonicalizer
+
+# Setup logging
+logger = setup_logger('event_roster', PROJECT_ROOT / 'logs' / 'scraping.log')
+
+ROSTER_SAIL_TYPES = ('J', 'M', 'S89')
+
+
+def sail_number_to_hull(sail_number):
+    """'CAN 83' -> '83', 'USA 003' -> '3'; None when there is no number."""
+    match = re.search(r'(\d+)\s*$', str(sail_number or ''))
+    return str(int(match.group(1))) if match else None
+
+
+def read_entry_hulls(path):
+    """
+    Hull numbers from an entry list CSV.
+
+    Uses a 'Hull' column when present, otherwise the 'Sail Number' column of a
+    results file (whose header may be preceded or followed by extra rows).
+    """
+    with open(path, 'r', encoding='utf-8-sig', newline='') as csvfile:
+        rows = list(csv.reader(csvfile))
+
+    for i, row in enumerate(rows):
+        header = [cell.strip() for cell in row]
+        for column, convert in (('Hull', lambda v: str(v).strip() or None), ('Sail Number', sail_number_to_hull)):
+            if column in header:
+                position = header.index(column)
+                hulls = [convert(r[position]) for r in rows[i + 1:] if len(r) > position]
+                return list(dict.fromkeys(h for h in hulls if h))
+    raise ValueError(f"{path} has no 'Hull' or 'Sail Number' column")
+
+
+def latest_tags(sail_tags, hulls, sail_types=ROSTER_SAIL_TYPES, as_of=None):
+    """
+    Latest tag per hull and sail type.
+
+    Ties on delivery date go to the higher certificate number.
+
+    Returns:
+        DataFrame indexed by (Hull, Sail Type) with Certificate No., Sailmaker,
+        Delivery Date and Purchaser
+    """
+    df = pd.DataFrame.from_records(
+        sail_tags, columns=['Hull', 'Purchaser', 'Certificate No.', 'Sailmaker', 'Delivery Date', 'Sail Type'])
+    df = df.fillna('').astype(str)
+    wanted = df['Hull'].isin(set(hulls)) & df['Sail Type'].isin(sail_types)
+    wanted &= pd.to_datetime(df['Delivery Date'], format='%Y-%m-%d', errors='coerce').notna()
+    if as_of:
+        wanted &= df['Delivery Date'] <= str(as_of)
+    df = df[wanted]
+
+    # ISO dates sort as strings, so one key orders by date then certificate
+    order_key = df['Delivery Date'] + ' ' + df['Certificate No.']
+    latest = order_key.groupby([df['Hull'], df['Sail Type']]).idxmax()
+    result = df.loc[latest.values].set_index(['Hull', 'Sail Type'])
+    result['Sailmaker'] = result['Sailmaker'].map(get_canonicalizer().canonical)
+    return result
+
+
+def build_roster(sail_tags, hulls, sail_types=ROSTER_SAIL_TYPES, as_of=None):
+    """
+    One roster row per entered hull.
+
+    Returns:
+        List of dicts with Hull, Purchaser (of the hull's most recent tag among
+        the roster types) and a {sail type: tag} mapping
+    """
+    latest = latest_tags(sail_tags, hulls, sail_types, as_of)
+    by_hull = {hull: group.droplevel('Hull') for hull, group in latest.groupby(level='Hull')}
+    roster = []
+    for hull in sorted(dict.fromkeys(hulls)):
+        tags = by_hull.get(hull)
+        entry = {'Hull': hull, 'Purchaser': '', 'sails': {}}
+        if tags is not None:
+            newest = tags.sort_values(['Delivery Date', 'Certificate No.']).iloc[-1]
+            entry['Purchaser'] = newest['Purchaser']
+            entry['sails'] = {
+                sail_type: {'certificate': row['Certificate No.'], 'sailmaker': row['Sailmaker'],
+                            'delivery_date': row['Delivery Date']}
+                for sail_type, row in tags.iterrows()
+            }
+        roster.append(entry)
+    return roster
+
+
+def format_tag(tag):
+    """'2203171N - North (2023-04-27)', or '' for no tag."""
+    return f"{tag['certificate']} - {tag['sailmaker']} ({tag['delivery_date']})" if tag else ''
+
+
+def write_roster_csv(roster, path, sail_types=ROSTER_SAIL_TYPES):
+    """Write the roster in the NA_2024_RacersSailTags.csv layout."""
+    with open(path, 'w', encoding='utf-8', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['Hull', 'Purchaser'] + [f"Latest {t}" for t in sail_types])
+        for entry in roster:
+            writer.writerow([entry['Hull'], entry['Purchaser']]
+                            + [format_tag(entry['sails'].get(t)) for t in sail_types])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build a latest-sail-per-type roster for a regatta entry list"
+    )
+    parser.add_argument('--hulls', nargs='+', help="Hull numbers on the entry list")
+    parser.add_argument('--entries', type=Path,
+                        help="Entry list or results CSV (Hull or Sail Number column)")
+    parser.add_argument('--types', nargs='+', default=list(ROSTER_SAIL_TYPES),
+                        help=f"Sail types to list (default: {' '.join(ROSTER_SAIL_TYPES)})")
+    parser.add_argument('--as-of', help="Only tags delivered on or before this date (YYYY-MM-DD)")
+    parser.add_argument('--input', type=Path, default=SAILS_FILE,
+                        help=f"Path to sail_tags.json file (default: {SAILS_FILE})")
+    parser.add_argument('--output', type=Path, help="Roster CSV to write")
+    parser.add_argument('--json', type=Path, help="Roster JSON to write")
+    args = parser.parse_args()
+
+    try:
+        hulls = list(args.hulls or [])
+        if args.entries:
+            hulls += read_entry_hulls(args.entries)
+        if not hulls:
+            parser.error("give --hulls and/or --entries")
+
+        roster = build_roster(load_json(args.input), hulls, args.types, args.as_of)
+        missing = [entry['Hull'] for entry in roster if not entry['sails']]
+        print(f"📄 Roster: {len(roster)} hulls, latest {', '.join(args.types)}"
+              f"{f' as of {args.as_of}' if args.as_of else ''}")
+        if missing:
+            print(f"⚠️  No sail tags for hulls: {', '.join(missing)}")
+
+        if args.output:
+            write_roster_csv(roster, args.output, args.types)
+            print(f"📁 Roster CSV written to: {args.output}")
+        if args.json:
+            save_json({
+                'generated': datetime.now().isoformat(timespec='seconds'),
+                'as_of': args.as_of,
+                'sail_types': args.types,
+                'roster': roster,
+            }, args.json, create_backup=False)
+            print(f"📁 Roster JSON written to: {args.json}")
+        if not args.output and not args.json:
+            for entry in roster:
+                sails = '; '.join(f"{t}: {format_tag(entry['sails'].get(t)) or '-'}" for t in args.types)
+                print(f"   {entry['Hull']:>4} {entry['Purchaser']:<24} {sails}")
+        logger.info(f"Built roster for {len(roster)} hulls")
+        return 0
+
+    except Exception as e:
+        logger.error(f"Error building event roster: {e}")
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Dues invoice and receipt generator for Fleet22_us repository
+Renders one PDF per boat - an invoice when Fleet Dues are outstanding, a
+receipt once paid - from boats_fleet22.json and the season's payment tracker.
+Documents are rendered across a process pool and skipped when the payment
+record they were built from is unchanged (content hash kept in a manifest).
+"""
+import sys
+import csv
+import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from datetime import datetime
+from string import Template
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.logger import setup_logger
+from utils.data_loader import load_json, save_json
+from utils.path_utils import PROJECT_ROOT, BOATS_FILE, PAYMENTS_DATA
+from reports.payment_tracker import parse_amount
+
+# Setup logging
+logger = setup_logger('dues_documents', PROJECT_ROOT / 'logs' / 'reports.log')
+
+CURRENT_YEAR = datetime.now().year
+FLEET_DUES_AMOUNT = 150
+
+TEMPLATES = {
+    'invoice': {
+        'title': 'INVOICE',
+        'body': Template("""Invoice No.:   $number
+Issued:        $issued
+Season:        $season
+
+Bill To:       $boat_name (Hull $hull)
+Yacht Club:    $club
+
+Description                                   Amount
+----------------------------------------------------
+Fleet 22 annual dues, $season season        $$$amount
+----------------------------------------------------
+Amount Due                                  $$$amount
+
+Payment options:
+  Venmo:  @fleet22 (note "Hull $hull")
+  Check:  Fleet 22, c/o Treasurer
+  Online: https://fleet22.us/fleetdues.html
+"""),
+    },
+    'receipt': {
+        'title': 'RECEIPT',
+        'body': Template("""Receipt No.:   $number
+Season:        $season
+
+Received From: $boat_name (Hull $hull)
+Yacht Club:    $club
+
+Description                                   Amount
+----------------------------------------------------
+Fleet 22 annual dues, $season season        $$$amount
+----------------------------------------------------
+Paid                                        $$$amount
+
+Payment Date:  $payment_date
+Method:        $payment_method
+
+Thank you for supporting Fleet 22!
+"""),
+    },
+}
+
+# Bump when the page layout changes so every document is re-rendered
+LAYOUT_VERSION = 1
+
+
+def _template_digest():
+    text = json.dumps({k: [v['title'], v['body'].template] for k, v in TEMPLATES.items()}, sort_keys=True)
+    return hashlib.sha256(f"{LAYOUT_VERSION}:{text}".encode()).hexdigest()[:12]
+
+
+def load_tracker_rows(tracker_file):
+    """Tracker CSV rows keyed by hull, plus the 'Paid <year>' column name."""
+    if not tracker_file or not Path(tracker_file).exists():
+        return {}, None
+    with open(tracker_file, 'r', newline='') as csvfile:
+        reader = csv.DictReader(csvfile)
+        paid_column = next((f for f in reader.fieldnames if f.startswith('Paid ')), None)
+        return {row['Hull']: row for row in reader}, paid_column
+
+
+def build_payment_records(boats_data, tracker_rows, paid_column, season, amount=FLEET_DUES_AMOUNT):
+    """
+    One payment record per boat: everything that appears on its document.
+
+    A boat is paid when boats_fleet22.json says so or the tracker marks it YES;
+    the tracker supplies date, method and amount when present. An Amount
+    cell that is not a number (e.g. "150 cash") falls back to `amount`.
+    """
+    records = []
+    for boat in boats_data:
+        hull = str(boat.get('Hull Number', ''))
+        row = tracker_rows.get(hull, {})
+        paid = boat.get('Fleet Dues') == 'Paid' or (
+            paid_column is not None and row.get(paid_column, '').upper() == 'YES')
+        paid_amount = None
+        if paid:
+            try:
+                paid_amount = parse_amount(row.get('Amount', ''))
+            except ValueError:
+                logger.warning(f"Hull {hull}: unreadable tracker amount {row.get('Amount')!r}, "
+                               f"using {amount:,.2f}")
+        records.append({
+            'kind': 'receipt' if paid else 'invoice',
+            'hull': hull,
+            'boat_name': boat.get('Boat Name') or 'Unknown',
+            'club': boat.get('Yacht Club') or '',
+            'season': season,
+            'number': f"F22-{season}-{hull:0>4}",
+            'amount': f"{paid_amount if paid_amount else amount:,.2f}",
+            'payment_date': row.get('Payment Date', '') if paid else '',
+            'payment_method': row.get('Payment Method', '') if paid else '',
+        })
+    return records
+
+
+def record_hash(record, template_digest):
+    """Content hash of the fields a document is rendered from."""
+    payload = json.dumps(record, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(f"{template_digest}:{payload}".encode()).hexdigest()
+
+
+def render_document(job):
+    """
+    Render one PDF (runs in a worker process).
+
+    Args:
+        job: (record, output_path, issued)
+
+    Returns:
+        (hull, output_path)
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    record, output_path, issued = job
+    template = TEMPLATES[record['kind']]
+    fields = {**record, 'issued': issued,
+              'payment_date': record['payment_date'] or '-',
+              'payment_method': record['payment_method'] or '-'}
+    body = template['body'].substitute(fields)
+
+    fig = plt.figure(figsize=(8.5, 11))
+    fig.text(0.08, 0.94, "Fleet 22 Lake Erie", fontsize=18, weight='bold')
+    fig.text(0.08, 0.915, "J/105 Class Association - fleet22@fleet22.us", fontsize=9, color='#555')
+    fig.text(0.92, 0.94, template['title'], fontsize=22, weight='bold', ha='right',
+             color='#1f4e79' if record['kind'] == 'invoice' else '#2e7d32')
+    fig.add_artist(plt.Line2D([0.08, 0.92], [0.9, 0.9], color='#1f4e79', linewidth=1.5))
+    fig.text(0.08, 0.86, body, fontsize=10.5, family='monospace', va='top', linespacing=1.6)
+    fig.savefig(output_path, format='pdf',
+                metadata={'Title': f"Fleet 22 {template['title'].title()} {record['number']}"})
+    plt.close(fig)
+    return record['hull'], str(output_path)
+
+
+def generate_documents(records, output_dir, workers=None, force=False, issued=None, partial=False):
+    """
+    Render changed documents in parallel and update the manifest.
+
+    With partial=True (a subset of hulls) manifest entries for other hulls are
+    kept; otherwise documents for boats no longer in `records` are removed.
+
+    Returns:
+        (rendered, skipped, removed) lists of hulls
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / 'manifest.json'
+    manifest = load_json(manifest_path) if manifest_path.exists() else {}
+    entries = manifest.get('documents', {})
+    digest = _template_digest()
+    issued = issued or datetime.now().strftime('%Y-%m-%d')
+
+    jobs, skipped, new_entries = [], [], {}
+    for record in records:
+        content_hash = record_hash(record, digest)
+        filename = f"{record['kind']}_{record['hull']}.pdf"
+        previous = entries.get(record['hull'])
+        if (not force and previous and previous['sha256'] == content_hash
+                and (output_dir / previous['file']).exists()):
+            new_entries[record['hull']] = previous
+            skipped.append(record['hull'])
+            continue
+        jobs.append((record, output_dir / filename, issued))
+        new_entries[record['hull']] = {
+            'kind': record['kind'],
+            'file': filename,
+            'number': record['number'],
+            'sha256': content_hash,
+            'generated': datetime.now().isoformat(timespec='seconds'),
+        }
+
+    rendered = []
+    if jobs:
+        if workers == 1 or len(jobs) == 1:
+            results = map(render_document, jobs)
+            rendered = [hull for hull, _ in results]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunk = max(1, len(jobs) // ((workers or 4) * 4))
+                rendered = [hull for hull, _ in pool.map(render_document, jobs, chunksize=chunk)]
+
+    if partial:
+        for hull, entry in entries.items():
+            new_entries.setdefault(hull, entry)
+
+    # A boat that switched from invoice to receipt leaves a stale file behind
+    removed = []
+    for hull, entry in entries.items():
+        current = new_entries.get(hull)
+        if current is None or current['file'] != entry['file']:
+            stale = output_dir / entry['file']
+            if stale.exists():
+                stale.unlink()
+            removed.append(hull)
+
+    save_json({
+        'season': records[0]['season'] if records else None,
+        'template': digest,
+        'updated': datetime.now().isoformat(timespec='seconds'),
+        'documents': new_entries,
+    }, manifest_path, create_backup=False)
+
+    logger.info(f"Rendered {len(rendered)} documents, {len(skipped)} unchanged, "
+                f"{len(removed)} replaced/removed in {output_dir}")
+    return rendered, skipped, removed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate per-boat dues invoices and receipts (PDF)"
+    )
+    parser.add_argument('--season', type=int, default=CURRENT_YEAR,
+                        help=f"Dues season (default: {CURRENT_YEAR})")
+    parser.add_argument('--boats', type=Path, default=BOATS_FILE, help="Path to boats data JSON file")
+    parser.add_argument('--tracker', type=Path,
+                        help="Payment tracker CSV (default: data/payments/payment_tracker_<season>.csv)")
+    parser.add_argument('--output-dir', type=Path,
+                        help="Output directory (default: data/payments/documents/<season>)")
+    parser.add_argument('--amount', type=float, default=FLEET_DUES_AMOUNT,
+                        help=f"Fleet dues amount (default: {FLEET_DUES_AMOUNT})")
+    parser.add_argument('--hull', nargs='+', help="Only these hulls")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="Re-render every document")
+    args = parser.parse_args()
+
+    try:
+        tracker_file = args.tracker or PAYMENTS_DATA / f"payment_tracker_{args.season}.csv"
+        output_dir = args.output_dir or PAYMENTS_DATA / 'documents' / str(args.season)
+
+        boats_data = load_json(args.boats)
+        tracker_rows, paid_column = load_tracker_rows(tracker_file)
+        if not tracker_rows:
+            print(f"💡 No tracker at {tracker_file}; using Fleet Dues from {args.boats.name} only")
+
+        records = build_payment_records(boats_data, tracker_rows, paid_column, args.season, args.amount)
+        if args.hull:
+            records = [r for r in records if r['hull'] in set(args.hull)]
+
+        rendered, skipped, removed = generate_documents(
+            records, output_dir, workers=args.workers, force=args.force, partial=bool(args.hull)
+        )
+
+        invoices = sum(1 for r in records if r['kind'] == 'invoice')
+        print(f"✅ {len(records)} boats: {invoices} invoices, {len(records) - invoices} receipts")
+        print(f"📝 Rendered {len(rendered)}, unchanged {len(skipped)}, replaced {len(removed)}")
+        print(f"📁 {output_dir}")
+        return 0
+
+    except Exception as e:
+        logger.error(f"Error generating dues documents: {e}")
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
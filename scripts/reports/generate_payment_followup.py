@@ -7,18 +7,21 @@ import sys
 import argparse
 from pathlib import Path
 from datetime import datetime
-from collections import defaultdict
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from utils.logger import setup_logger
 from utils.data_loader import load_json
+from utils.membership_index import MembershipIndex
+from utils.report_renderer import FORMATS, Column, Report, Table, partition, write_report
 from utils.path_utils import PROJECT_ROOT
 
 # Setup logging
 logger = setup_logger('payment_followup', PROJECT_ROOT / 'logs' / 'reports.log')
 
+CURRENT_YEAR = datetime.now().year
+
 def load_boats_data(file_path):
     """Load boats data from JSON file."""
     try:
@@ -41,120 +44,12 @@ def load_members_data(file_path):
         logger.error(f"Error loading members data: {e}")
         raise
 
-def get_payment_status(members_data):
-    """Extract payment status from members data."""
-    paid_members = set()
-    for member in members_data:
-        # Check if member has paid (status == 'Active' or similar)
-        if member.get('status') == 'Active' or member.get('paid', False):
-            # Extract hull number or boat name
-            if 'hull' in member:
-                paid_members.add(str(member['hull']))
-            elif 'boat' in member:
-                paid_members.add(member['boat'])
-    return paid_members
-
-def categorize_boats(boats_data, paid_members):
-    """Categorize boats into paid and unpaid."""
-    paid_boats = []
-    unpaid_boats = []
-    
-    for boat in boats_data:
-        hull = str(boat.get('Hull Number', ''))
-        boat_name = boat.get('Boat Name', 'Unknown')
-        yacht_club = boat.get('Yacht Club', 'Unknown')
-        
-        boat_info = {
-            'hull': hull,
-            'name': boat_name,
-            'club': yacht_club
-        }
-        
-        # Check if boat is in paid members (by hull or name)
-        if hull in paid_members or boat_name in paid_members:
-            paid_boats.append(boat_info)
-        else:
-            unpaid_boats.append(boat_info)
-    
-    return paid_boats, unpaid_boats
-
-def generate_club_breakdown(unpaid_boats):
-    """Generate breakdown by yacht club."""
-    club_breakdown = defaultdict(list)
-    for boat in unpaid_boats:
-        club_breakdown[boat['club']].append(boat)
-    return dict(club_breakdown)
+def get_payment_status(members_data, year=CURRENT_YEAR):
+    """Return the hull numbers with class membership paid for `year`."""
+    membership = MembershipIndex.from_records(members_data)
+    return {hull for hull in membership.hulls() if membership.paid_in(hull, year)}
 
-def generate_report(boats_data, members_data, output_file=None):
-    """Generate comprehensive payment follow-up report."""
-    try:
-        logger.info("Generating payment follow-up report...")
-        
-        # Get payment status
-        paid_members = get_payment_status(members_data)
-        
-        # Categorize boats
-        paid_boats, unpaid_boats = categorize_boats(boats_data, paid_members)
-        
-        # Calculate statistics
-        total_boats = len(boats_data)
-        paid_count = len(paid_boats)
-        unpaid_count = len(unpaid_boats)
-        payment_rate = (paid_count / total_boats * 100) if total_boats > 0 else 0
-        
-        # Generate club breakdown
-        club_breakdown = generate_club_breakdown(unpaid_boats)
-        
-        # Build report
-        report_lines = []
-        report_lines.append("=" * 80)
-        report_lines.append("FLEET 22 PAYMENT FOLLOW-UP REPORT")
-        report_lines.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        report_lines.append("=" * 80)
-        report_lines.append("")
-        
-        # Executive Summary
-        report_lines.append("EXECUTIVE SUMMARY")
-        report_lines.append("-" * 80)
-        report_lines.append(f"Total Fleet Boats:     {total_boats}")
-        report_lines.append(f"Paid Boats:            {paid_count} ({payment_rate:.1f}%)")
-        report_lines.append(f"Unpaid Boats:          {unpaid_count} ({100-payment_rate:.1f}%)")
-        report_lines.append(f"Outstanding Revenue:   ${unpaid_count * 150:,} (est. $150/boat)")
-        report_lines.append("")
-        
-        # Unpaid Boats by Yacht Club
-        report_lines.append("UNPAID BOATS BY YACHT CLUB")
-        report_lines.append("-" * 80)
-        for club, boats in sorted(club_breakdown.items()):
-            report_lines.append(f"\n{club} ({len(boats)} boat{'s' if len(boats) != 1 else ''})")
-            report_lines.append("  " + "-" * 76)
-            for boat in sorted(boats, key=lambda x: x['hull']):
-                report_lines.append(f"  Hull {boat['hull']:>4} | {boat['name']:<30}")
-        report_lines.append("")
-        
-        # Complete Unpaid List (for easy copy/paste)
-        report_lines.append("\nUNPAID BOATS - COMPLETE LIST")
-        report_lines.append("-" * 80)
-        report_lines.append(f"{'Hull':<6} | {'Boat Name':<30} | {'Yacht Club':<10}")
-        report_lines.append("-" * 80)
-        for boat in sorted(unpaid_boats, key=lambda x: int(x['hull']) if x['hull'].isdigit() else 0):
-            report_lines.append(f"{boat['hull']:<6} | {boat['name']:<30} | {boat['club']:<10}")
-        report_lines.append("")
-        
-        # Action Items
-        report_lines.append("\nRECOMMENDED ACTION ITEMS")
-        report_lines.append("-" * 80)
-        report_lines.append("1. Send reminder emails to yacht club contacts for unpaid boats")
-        report_lines.append("2. Follow up with clubs having multiple unpaid boats")
-        report_lines.append(f"3. Set deadline for payment: {datetime.now().strftime('%B %d, %Y')} + 30 days")
-        report_lines.append("4. Consider late fee policy for boats unpaid after deadline")
-        report_lines.append("5. Verify membership status with yacht club secretaries")
-        report_lines.append("")
-        
-        # Contact Information Template
-        report_lines.append("\nEMAIL TEMPLATE FOR FOLLOW-UP")
-        report_lines.append("-" * 80)
-        report_lines.append("""
+EMAIL_TEMPLATE = """
 Subject: Fleet 22 Dues Payment Reminder - [Yacht Club Name]
 
 Dear [Yacht Club Fleet Captain/Secretary],
@@ -183,28 +78,114 @@ Thank you for your support of Fleet 22!
 Best regards,
 Fleet 22 Lake Erie
 fleet22@fleet22.us
-""")
-        
-        # Generate report text
-        report_text = "\n".join(report_lines)
-        
-        # Output to file or console
-        if output_file:
-            output_path = Path(output_file)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            output_path.write_text(report_text)
-            logger.info(f"Report saved to {output_path}")
-            print(f"✅ Report saved to {output_path}")
-        else:
-            print(report_text)
-        
+"""
+
+
+def followup_report_definition(class_paid, dues='fleet'):
+    """
+    Report definition: summary, unpaid boats by club, full unpaid list, notes.
+
+    Args:
+        class_paid: Hull numbers with class membership paid (get_payment_status)
+        dues: 'fleet' decides paid/unpaid from each boat's Fleet Dues field and
+            shows class membership as its own column; 'class' follows up on
+            class membership instead
+    """
+    def class_status(boat):
+        return 'Paid' if str(boat.get('Hull Number', '')) in class_paid else 'Unpaid'
+
+    def is_unpaid(boat):
+        if dues == 'class':
+            return class_status(boat) != 'Paid'
+        return boat.get('Fleet Dues') != 'Paid'
+
+    def stats(rows, scope):
+        total = len(rows['all'])
+        unpaid_count = len(rows['unpaid'])
+        paid_count = total - unpaid_count
+        payment_rate = (paid_count / total * 100) if total > 0 else 0
+        summary = [
+            ('Total Fleet Boats', total),
+            ('Paid Boats', f"{paid_count} ({payment_rate:.1f}%)"),
+            ('Unpaid Boats', f"{unpaid_count} ({100-payment_rate:.1f}%)"),
+        ]
+        if dues == 'fleet':
+            summary.append(('Outstanding Revenue', f"${unpaid_count * 150:,} (est. $150/boat)"))
+        return [('EXECUTIVE SUMMARY', summary)]
+
+    hull = Column('Hull', 'Hull Number', width=4, align='>', prefix='Hull ')
+    name = Column('Boat Name', lambda boat: boat.get('Boat Name') or 'Unknown', width=30)
+    club = Column('Yacht Club', 'Yacht Club', width=10)
+    # Class membership is tracked separately from fleet dues; show it alongside
+    extra = [Column('Class Dues', class_status, width=6)] if dues == 'fleet' else []
+    grouped_extra = [Column('Class Dues', class_status, prefix='Class ')] if dues == 'fleet' else []
+    title = 'FLEET 22 PAYMENT FOLLOW-UP REPORT' if dues == 'fleet' else 'FLEET 22 CLASS MEMBERSHIP FOLLOW-UP REPORT'
+    notes = [
+        ('RECOMMENDED ACTION ITEMS', "\n".join([
+            "1. Send reminder emails to yacht club contacts for unpaid boats",
+            "2. Follow up with clubs having multiple unpaid boats",
+            f"3. Set deadline for payment: {datetime.now().strftime('%B %d, %Y')} + 30 days",
+            "4. Consider late fee policy for boats unpaid after deadline",
+            "5. Verify membership status with yacht club secretaries",
+        ])),
+    ]
+    if dues == 'fleet':
+        notes.append(('EMAIL TEMPLATE FOR FOLLOW-UP', EMAIL_TEMPLATE))
+
+    return Report(title, [
+        # Not rendered; gives the summary its boat count from the same pass
+        Table('all', 'ALL BOATS', [], visible=False),
+        Table('unpaid_by_club', 'UNPAID BOATS BY YACHT CLUB', [hull, name] + grouped_extra,
+              where=is_unpaid, group_by='Yacht Club', show_count=False),
+        Table('unpaid', 'UNPAID BOATS - COMPLETE LIST',
+              [Column('Hull', 'Hull Number', width=6), name, club] + extra,
+              where=is_unpaid, text_header=True, show_count=False),
+    ], stats=stats, notes=notes)
+
+
+def generate_report(boats_data, members_data, output_file=None, formats=('txt',), split_by_club=False,
+                    dues='fleet'):
+    """
+    Generate comprehensive payment follow-up report.
+
+    Every format and the optional per-yacht-club reports are rendered from
+    one pass over boats_data.
+
+    Returns:
+        (unpaid_boats, club_breakdown) with boats as {'hull', 'name', 'club'}
+    """
+    try:
+        logger.info("Generating payment follow-up report...")
+
+        report = followup_report_definition(get_payment_status(members_data), dues=dues)
+        scopes = partition(boats_data, report.tables,
+                           split_field='Yacht Club' if split_by_club else None)
+
+        written = write_report(report, scopes, output=output_file, formats=formats)
+        for (scope, fmt), path in written.items():
+            if scope is None:
+                print(f"✅ Report saved to {path}")
+        if split_by_club:
+            print(f"📁 Per-club reports written for {len(scopes) - 1} yacht clubs")
+
+        unpaid_boats = [
+            {'hull': str(b.get('Hull Number', '')), 'name': b.get('Boat Name', 'Unknown'),
+             'club': b.get('Yacht Club', 'Unknown')}
+            for b in scopes[None]['unpaid']
+        ]
+        club_breakdown = {}
+        for boat in unpaid_boats:
+            club_breakdown.setdefault(boat['club'], []).append(boat)
+        unpaid_count = len(unpaid_boats)
+
         # Summary
         print(f"\n📊 Summary: {unpaid_count} unpaid boats across {len(club_breakdown)} yacht clubs")
-        print(f"💰 Outstanding: ${unpaid_count * 150:,} (estimated)")
-        
+        if dues == 'fleet':
+            print(f"💰 Outstanding: ${unpaid_count * 150:,} (estimated)")
+
         logger.info(f"Report generation completed. {unpaid_count} unpaid boats identified.")
         return unpaid_boats, club_breakdown
-        
+
     except Exception as e:
         logger.error(f"Error generating report: {e}")
         raise
@@ -231,6 +212,24 @@ def main():
         default=PROJECT_ROOT / 'data' / 'payments' / 'payment_followup_report.txt',
         help="Output file path for the report"
     )
+    parser.add_argument(
+        '--format',
+        nargs='+',
+        choices=FORMATS,
+        default=['txt'],
+        help="Output formats written next to --output (default: txt)"
+    )
+    parser.add_argument(
+        '--split-by-club',
+        action='store_true',
+        help="Also write one report per yacht club"
+    )
+    parser.add_argument(
+        '--dues',
+        choices=['fleet', 'class'],
+        default='fleet',
+        help="Follow up on fleet dues (Fleet Dues field) or class membership (default: fleet)"
+    )
     parser.add_argument(
         '--club',
         type=str,
@@ -251,7 +250,10 @@ def main():
             logger.info(f"Filtered to {len(boats_data)} boats from {args.club}")
         
         # Generate report
-        unpaid_boats, club_breakdown = generate_report(boats_data, members_data, args.output)
+        unpaid_boats, club_breakdown = generate_report(
+            boats_data, members_data, args.output,
+            formats=args.format, split_by_club=args.split_by_club, dues=args.dues
+        )
         
         return 0
         
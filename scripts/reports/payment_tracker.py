@@ -6,6 +6,8 @@ Allows easy updating of payment status for Fleet 22 boats.
 import sys
 import argparse
 import csv
+import re
+from collections import defaultdict
 from pathlib import Path
 from datetime import datetime
 
@@ -14,7 +16,11 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from utils.logger import setup_logger
 from utils.data_loader import load_json
-from utils.path_utils import PROJECT_ROOT
+from utils.path_utils import PROJECT_ROOT, MEMBERS_FILE, BOATS_FILE
+from processors.payment_ledger import PaymentLedger, sync_outputs
+from utils.report_renderer import (
+    FORMATS, Column, Report, Table, hull_sort_key, partition, write_report
+)
 
 # Setup logging
 logger = setup_logger('payment_tracker', PROJECT_ROOT / 'logs' / 'reports.log')
@@ -64,109 +70,384 @@ def create_payment_tracker(boats_data, output_file):
         logger.error(f"Error creating payment tracker: {e}")
         raise
 
-def update_payment_status(tracker_file, hull, paid=True, payment_date=None, method=None, amount=150):
-    """Update payment status for a specific boat."""
+def update_payment_status(tracker_file, hull, paid=True, payment_date=None, method=None, amount=150,
+                          ledger=None, boats_file=BOATS_FILE):
+    """
+    Record a fleet dues payment (or its reversal) for a specific boat.
+
+    The payment goes into the payment ledger for the tracker's season; the
+    ledger then rewrites the tracker (and boats_fleet22.json when it holds
+    that season), so a later ledger sync keeps it.
+    """
     try:
         logger.info(f"Updating payment status for hull {hull}")
-        
-        rows = []
-        updated = False
-        
-        with open(tracker_file, 'r') as csvfile:
+
+        with open(tracker_file, 'r', newline='') as csvfile:
             reader = csv.DictReader(csvfile)
-            for row in reader:
-                if row['Hull'] == str(hull):
-                    row['Paid 2026'] = 'YES' if paid else 'NO'
-                    if payment_date:
-                        row['Payment Date'] = payment_date
-                    if method:
-                        row['Payment Method'] = method
-                    if paid and amount:
-                        row['Amount'] = f"${amount}"
-                    updated = True
-                    logger.info(f"Updated hull {hull}: Paid={paid}")
-                rows.append(row)
-        
-        if not updated:
+            paid_column = next((f for f in reader.fieldnames if f.startswith('Paid ')), None)
+            hulls = {row['Hull'] for row in reader}
+        if paid_column is None:
+            raise ValueError(f"No 'Paid <year>' column in {tracker_file}")
+        season = int(paid_column.split()[1])
+
+        if str(hull) not in hulls:
             logger.warning(f"Hull {hull} not found in tracker")
             return False
-        
-        # Write back
-        with open(tracker_file, 'w', newline='') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=rows[0].keys())
-            writer.writeheader()
-            writer.writerows(rows)
-        
+
+        ledger = ledger or PaymentLedger()
+        ledger.record(hull, 'fleet', 'Paid' if paid else 'Not Paid', season,
+                      amount=amount if paid else None, method=method or '', date=payment_date)
+        sync_outputs(ledger, season, boats_file=boats_file, tracker_file=tracker_file)
+        logger.info(f"Updated hull {hull}: Paid={paid}")
         return True
-        
+
     except Exception as e:
         logger.error(f"Error updating payment status: {e}")
         raise
 
-def generate_summary(tracker_file):
-    """Generate summary statistics from tracker."""
+def tracker_report_definition(paid_column):
+    """Report definition for the tracker summary: totals plus the unpaid list."""
+    def is_paid(row):
+        return row.get(paid_column, '').upper() == 'YES'
+
+    def stats(rows, scope):
+        paid_count = len(rows['paid'])
+        unpaid_count = len(rows['unpaid'])
+        total = paid_count + unpaid_count
+        payment_rate = (paid_count / total * 100) if total > 0 else 0
+        return [('SUMMARY', [
+            ('Total Boats', total),
+            ('Paid', f"{paid_count} ({payment_rate:.1f}%)"),
+            ('Unpaid', f"{unpaid_count} ({100-payment_rate:.1f}%)"),
+            ('Total Collected', f"${_collected(rows['paid']):,.2f}"),
+            ('Outstanding', f"${unpaid_count * 150:,.2f} (est.)"),
+        ])]
+
+    return Report('FLEET 22 PAYMENT TRACKER SUMMARY', [
+        Table('paid', 'PAID BOATS', [], where=is_paid, visible=False),
+        Table('unpaid', 'UNPAID BOATS', [
+            Column('Hull', 'Hull', width=4, align='>', prefix='Hull '),
+            Column('Boat Name', 'Boat Name', width=30),
+            Column('Yacht Club', 'Yacht Club', width=10),
+        ], where=lambda row: not is_paid(row), show_count=False),
+    ], stats=stats)
+
+
+def _collected(paid_rows):
+    total = 0
+    for row in paid_rows:
+        amount_str = row.get('Amount', '').replace('$', '').replace(',', '')
+        if amount_str:
+            try:
+                total += float(amount_str)
+            except ValueError:
+                pass
+    return total
+
+
+def generate_summary(tracker_file, output=None, formats=('txt',)):
+    """Generate summary statistics from tracker (printed, or written to `output`)."""
     try:
-        paid_count = 0
-        unpaid_count = 0
-        total_collected = 0
-        paid_boats = []
-        unpaid_boats = []
-        
         with open(tracker_file, 'r') as csvfile:
             reader = csv.DictReader(csvfile)
-            for row in reader:
-                if row['Paid 2026'].upper() == 'YES':
-                    paid_count += 1
-                    paid_boats.append(row)
-                    # Extract amount
-                    amount_str = row.get('Amount', '').replace('$', '').replace(',', '')
-                    if amount_str:
-                        try:
-                            total_collected += float(amount_str)
-                        except ValueError:
-                            pass
-                else:
-                    unpaid_count += 1
-                    unpaid_boats.append(row)
-        
+            paid_column = next((f for f in reader.fieldnames if f.startswith('Paid ')), 'Paid 2026')
+            rows = list(reader)
+
+        report = tracker_report_definition(paid_column)
+        scopes = partition(rows, report.tables, sort_key=lambda row: hull_sort_key(row, 'Hull'))
+        written = write_report(report, scopes, output=output, formats=formats)
+        for path in written.values():
+            print(f"📄 Summary: {path}")
+
+        paid_count = len(scopes[None]['paid'])
+        unpaid_count = len(scopes[None]['unpaid'])
         total = paid_count + unpaid_count
-        payment_rate = (paid_count / total * 100) if total > 0 else 0
-        
-        print("\n" + "=" * 80)
-        print("FLEET 22 PAYMENT TRACKER SUMMARY")
-        print("=" * 80)
-        print(f"Total Boats:       {total}")
-        print(f"Paid:              {paid_count} ({payment_rate:.1f}%)")
-        print(f"Unpaid:            {unpaid_count} ({100-payment_rate:.1f}%)")
-        print(f"Total Collected:   ${total_collected:,.2f}")
-        print(f"Outstanding:       ${unpaid_count * 150:,.2f} (est.)")
-        print()
-        
-        if unpaid_boats:
-            print("\nUNPAID BOATS:")
-            print("-" * 80)
-            for boat in unpaid_boats:
-                print(f"  Hull {boat['Hull']:>4} | {boat['Boat Name']:<30} | {boat['Yacht Club']:<10}")
-        
         return {
             'total': total,
             'paid': paid_count,
             'unpaid': unpaid_count,
-            'collected': total_collected,
-            'rate': payment_rate
+            'collected': _collected(scopes[None]['paid']),
+            'rate': (paid_count / total * 100) if total > 0 else 0
         }
-        
+
     except Exception as e:
         logger.error(f"Error generating summary: {e}")
         raise
 
+
+# Transaction export column -> accepted header spellings (Venmo and bank CSVs)
+TRANSACTION_COLUMNS = {
+    'id': ('id', 'transaction id', 'reference'),
+    'date': ('datetime', 'date', 'posted date', 'transaction date'),
+    'payer': ('from', 'name', 'payer', 'sender'),
+    'memo': ('note', 'memo', 'description', 'details'),
+    'amount': ('amount (total)', 'amount', 'credit'),
+}
+
+# Points each join key contributes to a candidate hull (used for ranking)
+MATCH_WEIGHTS = {'hull': 3, 'boat': 2, 'payer': 2, 'surname': 1}
+
+# What each join key identifies; payer and surname both point at the person
+KEY_KINDS = {'hull': 'hull', 'boat': 'boat', 'payer': 'person', 'surname': 'person'}
+
+HULL_PATTERN = re.compile(r'(?:hull|#)\s*(\d{1,4})\b', re.IGNORECASE)
+
+
+def normalize_text(value):
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return ' '.join(re.sub(r'[^a-z0-9 ]+', ' ', str(value or '').lower()).split())
+
+
+def name_keys(name):
+    """Join keys for a person's name: full name and surname + first initial."""
+    value = str(name or '')
+    if ',' in value:
+        # "Last, First" -> "First Last"
+        last, first = value.split(',', 1)
+        value = f"{first} {last}"
+    words = normalize_text(value).split()
+    if len(words) < 2:
+        return {}
+    return {'payer': ' '.join(words), 'surname': f"{words[-1]} {words[0][0]}"}
+
+
+def parse_amount(value):
+    """Parse '$1,234.50', '+ $150.00' or '(150.00)' into a float (None if blank)."""
+    text = str(value or '').replace('$', '').replace(',', '').replace(' ', '')
+    if not text:
+        return None
+    if text.startswith('(') and text.endswith(')'):
+        text = '-' + text[1:-1]
+    return float(text)
+
+
+def build_match_index(tracker_rows, members_data):
+    """
+    Hash tables from join key to candidate hulls.
+
+    Returns:
+        Dict of key type ('hull', 'boat', 'payer', 'surname') -> {key: set of hulls}
+    """
+    index = {key_type: defaultdict(set) for key_type in MATCH_WEIGHTS}
+    hulls = {row['Hull'] for row in tracker_rows}
+
+    for row in tracker_rows:
+        index['hull'][row['Hull']].add(row['Hull'])
+        boat = normalize_text(row.get('Boat Name'))
+        if boat:
+            index['boat'][boat].add(row['Hull'])
+
+    for member in members_data:
+        hull = str(member.get('Hull', ''))
+        if hull not in hulls:
+            continue
+        for key_type, key in name_keys(member.get('Owners/Helmsmen')).items():
+            index[key_type][key].add(hull)
+
+    return index
+
+
+def _ngrams(words, max_len):
+    for size in range(1, max_len + 1):
+        for start in range(len(words) - size + 1):
+            yield ' '.join(words[start:start + size])
+
+
+def match_transaction(txn, index, max_boat_words):
+    """
+    Score candidate hulls for one transaction.
+
+    Returns:
+        Dict of hull -> (score, list of matched key types)
+    """
+    scores = defaultdict(lambda: [0, []])
+
+    def add(key_type, hulls):
+        # A key shared by several hulls (e.g. a family surname) identifies none
+        if len(hulls) == 1:
+            hull = next(iter(hulls))
+            if key_type not in scores[hull][1]:
+                scores[hull][0] += MATCH_WEIGHTS[key_type]
+                scores[hull][1].append(key_type)
+
+    memo = txn['memo']
+    for number in set(HULL_PATTERN.findall(memo)):
+        add('hull', index['hull'].get(number, set()))
+
+    words = normalize_text(f"{memo} {txn['payer']}").split()
+    for gram in set(_ngrams(words, max_boat_words)):
+        if gram in index['boat']:
+            add('boat', index['boat'][gram])
+
+    # Bank exports have no payer column, so names are also looked for in the memo
+    names = [txn['payer'], memo] + [g for g in set(_ngrams(words, 3)) if ' ' in g]
+    for name in names:
+        for key_type, key in name_keys(name).items():
+            if key in index[key_type]:
+                add(key_type, index[key_type][key])
+
+    return {hull: (score, sources) for hull, (score, sources) in scores.items()}
+
+
+def is_confident(sources):
+    """
+    A candidate is safe to record when the memo names its hull, or when two
+    independent kinds of key agree (e.g. boat name and payer). A boat name
+    alone is too easy to hit by accident ("wish", "trio") to auto-record.
+    """
+    return 'hull' in sources or len({KEY_KINDS[k] for k in sources}) >= 2
+
+
+def read_transactions(export_file):
+    """Stream a transaction export, yielding normalized rows with line numbers."""
+    with open(export_file, 'r', encoding='utf-8-sig', newline='') as csvfile:
+        # Venmo statements put account info above the real header row
+        lines = (line for line in csvfile if line.strip().strip(','))
+        reader = csv.reader(lines)
+        columns = None
+        for line_number, values in enumerate(reader, start=1):
+            lowered = [v.strip().lower() for v in values]
+            if columns is None:
+                found = {
+                    name: next((lowered.index(a) for a in aliases if a in lowered), None)
+                    for name, aliases in TRANSACTION_COLUMNS.items()
+                }
+                if found['amount'] is not None and (found['payer'] is not None or found['memo'] is not None):
+                    columns = found
+                    header = values
+                continue
+
+            row = dict(zip(header, values))
+            txn = {name: (values[i].strip() if i is not None and i < len(values) else '')
+                   for name, i in columns.items()}
+            txn['line'] = line_number
+            txn['raw'] = row
+            yield txn
+
+    if columns is None:
+        raise ValueError(f"No amount and payer/memo columns found in {export_file}")
+
+
+def _transaction_date(value):
+    """YYYY-MM-DD from an export date ('2026-03-01T12:00:00', '03/01/2026')."""
+    value = value.strip()
+    for fmt, length in (('%Y-%m-%d', 10), ('%m/%d/%Y', None), ('%m/%d/%y', None)):
+        try:
+            return datetime.strptime(value[:length] if length else value, fmt).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+
+def reconcile_transactions(tracker_file, export_file, members_data, expected_amount=150,
+                           tolerance=0.0, method='Venmo', ledger=None, boats_file=BOATS_FILE):
+    """
+    Match exported transactions to tracker rows on hull, boat name and payer.
+
+    Confident matches (a single candidate hull matched on its hull number or
+    on two kinds of key, see is_confident(); amount within tolerance, not
+    already paid or matched)
+    are recorded as fleet dues payments in the payment ledger, which then
+    refreshes the tracker (and boats_fleet22.json when it holds that season);
+    everything else is returned as an exception.
+
+    Returns:
+        (matched, exceptions) lists of dicts
+    """
+    with open(tracker_file, 'r', newline='') as csvfile:
+        reader = csv.DictReader(csvfile)
+        fieldnames = reader.fieldnames
+        rows = list(reader)
+    paid_column = next((f for f in fieldnames if f.startswith('Paid ')), None)
+    if paid_column is None:
+        raise ValueError(f"No 'Paid <year>' column in {tracker_file}")
+    season = int(paid_column.split()[1])
+
+    by_hull = {row['Hull']: row for row in rows}
+    index = build_match_index(rows, members_data)
+    max_boat_words = max((len(k.split()) for k in index['boat']), default=1)
+
+    matched, exceptions = [], []
+    for txn in read_transactions(export_file):
+        try:
+            amount = parse_amount(txn['amount'])
+        except ValueError:
+            amount = None
+        if amount is not None and amount <= 0:
+            continue  # Outgoing payment or refund
+
+        candidates = match_transaction(txn, index, max_boat_words)
+        ranked = sorted(candidates.items(), key=lambda c: -c[1][0])
+        summary = '; '.join(f"{h} ({'+'.join(src)})" for h, (_, src) in ranked)
+        paid_date = _transaction_date(txn['date'])
+
+        reason = None
+        if amount is None:
+            reason = "unreadable amount"
+        elif paid_date is None:
+            reason = "unreadable date"
+        elif not ranked:
+            reason = "no matching hull"
+        elif len(ranked) > 1:
+            reason = "matches several hulls"
+        elif not is_confident(ranked[0][1][1]):
+            reason = f"weak match ({'+'.join(ranked[0][1][1])} only)"
+        elif abs(amount - expected_amount) > tolerance:
+            reason = f"amount {amount:.2f} differs from expected {expected_amount:.2f}"
+        else:
+            row = by_hull[ranked[0][0]]
+            if row[paid_column].upper() == 'YES':
+                reason = "hull already marked paid"
+
+        if reason:
+            exceptions.append({**txn, 'reason': reason, 'candidates': summary})
+            continue
+
+        row = by_hull[ranked[0][0]]
+        # Mark in memory so a second transaction for the hull is an exception
+        row[paid_column] = 'YES'
+        matched.append({**txn, 'hull': row['Hull'], 'candidates': summary,
+                        'paid_amount': amount, 'paid_date': paid_date})
+        logger.info(f"Matched line {txn['line']} ({txn['payer']}, {amount:.2f}) to hull {row['Hull']} via {summary}")
+
+    if matched:
+        ledger = ledger or PaymentLedger()
+        for match in matched:
+            ledger.record(match['hull'], 'fleet', 'Paid', season, amount=match['paid_amount'],
+                          method=method, date=match['paid_date'],
+                          note=f"Reconciled from {Path(export_file).name} line {match['line']}")
+        sync_outputs(ledger, season, boats_file=boats_file, tracker_file=tracker_file)
+        logger.info(f"Recorded {len(matched)} matched payments in the ledger and refreshed {tracker_file}")
+
+    return matched, exceptions
+
+
+def write_exceptions(exceptions, output_file):
+    """Write unmatched transactions with reasons and candidate hulls as CSV."""
+    raw_fields = []
+    for exc in exceptions:
+        for key in exc['raw']:
+            if key not in raw_fields:
+                raw_fields.append(key)
+
+    output_path = Path(output_file)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['line', 'reason', 'candidates'] + raw_fields)
+        for exc in exceptions:
+            writer.writerow([exc['line'], exc['reason'], exc['candidates']]
+                            + [exc['raw'].get(k, '') for k in raw_fields])
+    logger.info(f"Reconciliation exceptions saved to {output_path}")
+    return output_path
+
 def main():
     parser = argparse.ArgumentParser(
         description="Payment tracker for Fleet 22 boats"
     )
     parser.add_argument(
         'action',
-        choices=['create', 'update', 'summary'],
+        choices=['create', 'update', 'summary', 'reconcile'],
         help="Action to perform"
     )
     parser.add_argument(
@@ -209,6 +490,40 @@ def main():
         default=150,
         help="Payment amount (default: 150)"
     )
+    parser.add_argument(
+        '--report',
+        type=Path,
+        help="Write the summary to this path instead of printing it (for 'summary' action)"
+    )
+    parser.add_argument(
+        '--format',
+        nargs='+',
+        choices=FORMATS,
+        default=['txt'],
+        help="Summary formats written next to --report (default: txt)"
+    )
+    parser.add_argument(
+        '--export',
+        type=Path,
+        help="Venmo/bank transaction CSV export (for 'reconcile' action)"
+    )
+    parser.add_argument(
+        '--members',
+        type=Path,
+        default=MEMBERS_FILE,
+        help="Path to members JSON used for payer name matching"
+    )
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=0.0,
+        help="Allowed difference from --amount when reconciling (default: 0)"
+    )
+    parser.add_argument(
+        '--exceptions',
+        type=Path,
+        help="Exceptions CSV path (default: <export>_exceptions.csv)"
+    )
     args = parser.parse_args()
     
     try:
@@ -237,7 +552,8 @@ def main():
                 paid=args.paid,
                 payment_date=args.date,
                 method=args.method,
-                amount=args.amount
+                amount=args.amount,
+                boats_file=args.boats
             )
             
             if success:
@@ -247,12 +563,40 @@ def main():
                 print(f"❌ Hull {args.hull} not found in tracker")
                 return 1
                 
+        elif args.action == 'reconcile':
+            if not args.export:
+                print("❌ Error: --export required for reconcile action")
+                return 1
+            if not args.tracker.exists():
+                print(f"❌ Error: Tracker file not found: {args.tracker}")
+                return 1
+
+            members_data = load_json(args.members) if args.members.exists() else []
+            matched, exceptions = reconcile_transactions(
+                args.tracker,
+                args.export,
+                members_data,
+                expected_amount=args.amount,
+                tolerance=args.tolerance,
+                method=args.method or 'Venmo',
+                boats_file=args.boats
+            )
+
+            print(f"✅ Matched {len(matched)} payments")
+            for match in matched:
+                print(f"   Hull {match['hull']:>4} <- {match['payer'] or match['memo']} ({match['candidates']})")
+            if exceptions:
+                exceptions_path = args.exceptions or args.export.with_name(f"{args.export.stem}_exceptions.csv")
+                write_exceptions(exceptions, exceptions_path)
+                print(f"⚠️  {len(exceptions)} transactions need review")
+                print(f"📄 Exceptions: {exceptions_path}")
+
         elif args.action == 'summary':
             if not args.tracker.exists():
                 print(f"❌ Error: Tracker file not found: {args.tracker}")
                 return 1
             
-            generate_summary(args.tracker)
+            generate_summary(args.tracker, output=args.report, formats=args.format)
         
         return 0
         
@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+"""
+Dues reminder dispatch for Fleet22_us repository
+Renders one personalized reminder per unpaid boat (or per yacht club, from the
+follow-up report's club breakdown) and sends them over a single reused SMTP
+connection with batching and rate limiting. --dry-run writes .eml files
+instead, and --debug-server sends to an in-process SMTP stand-in.
+"""
+import sys
+import csv
+import os
+import time
+import argparse
+import smtplib
+import socketserver
+import ssl
+import threading
+from email.message import EmailMessage
+from email.utils import formatdate, make_msgid
+from pathlib import Path
+from datetime import datetime
+from string import Template
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.logger import setup_logger
+from utils.data_loader import load_json
+from utils.membership_index import MembershipIndex
+from utils.report_renderer import partition
+from utils.path_utils import (
+    PROJECT_ROOT,
+    BOATS_FILE,
+    MEMBERS_FILE,
+    PAYMENTS_DATA,
+    REMINDER_CONTACTS_FILE
+)
+from reports.generate_payment_followup import get_payment_status, followup_report_definition
+
+# Setup logging
+logger = setup_logger('dues_reminders', PROJECT_ROOT / 'logs' / 'reports.log')
+
+CURRENT_YEAR = datetime.now().year
+FLEET_DUES_AMOUNT = 150
+
+BOAT_SUBJECT = Template("Fleet 22 dues reminder - $boat_name (Hull $hull)")
+BOAT_BODY = Template("""Hi $greeting,
+
+Our records show that Fleet 22 dues for $boat_name (Hull $hull) are still
+outstanding for the $season season.
+
+Annual fleet dues are $$$amount per boat and help support:
+- Fleet website and member resources
+- Regatta organization and coordination
+- Class rules and certification
+- Communication and member services
+
+Payment can be made via:
+- Venmo: @fleet22 (https://venmo.com/u/fleet22) - please note "Hull $hull"
+- Check: Fleet 22, c/o Treasurer
+- Online: https://fleet22.us/fleetdues.html
+
+If you have already paid, thank you - please reply so we can update our records.
+
+Best regards,
+Fleet 22 Lake Erie
+fleet22@fleet22.us
+""")
+
+CLUB_SUBJECT = Template("Fleet 22 Dues Payment Reminder - $club")
+CLUB_BODY = Template("""Dear $greeting,
+
+This is a friendly reminder that the following Fleet 22 boats from $club
+have outstanding dues payments for the $season season:
+
+$boat_list
+
+Annual fleet dues are $$$amount per boat. Payment can be made via:
+- Venmo: @fleet22 (https://venmo.com/u/fleet22)
+- Check: Fleet 22, c/o Treasurer
+- Online: https://fleet22.us/fleetdues.html
+
+Please forward this to your members or let us know if you need assistance
+reaching these boat owners.
+
+Thank you for your support of Fleet 22!
+
+Best regards,
+Fleet 22 Lake Erie
+fleet22@fleet22.us
+""")
+
+# Class dues are J/105 Class Association membership, renewed with the class
+# (amount set by the class), not paid to Fleet 22
+CLASS_BOAT_SUBJECT = Template("J/105 class membership reminder - $boat_name (Hull $hull)")
+CLASS_BOAT_BODY = Template("""Hi $greeting,
+
+Our records show that the J/105 Class Association membership for
+$boat_name (Hull $hull) has not been renewed for the $season season.
+
+Class membership keeps the boat eligible for class-sanctioned regattas and
+covers class rules, measurement and sail certification.
+
+Class dues are paid to the J/105 Class Association, not to Fleet 22:
+- Renew online: https://archive.j105.org
+
+If you have already renewed, thank you - please reply so we can update our records.
+
+Best regards,
+Fleet 22 Lake Erie
+fleet22@fleet22.us
+""")
+
+CLASS_CLUB_SUBJECT = Template("J/105 Class Membership Reminder - $club")
+CLASS_CLUB_BODY = Template("""Dear $greeting,
+
+This is a friendly reminder that the following Fleet 22 boats from $club
+have not renewed their J/105 Class Association membership for the $season season:
+
+$boat_list
+
+Class dues are paid to the J/105 Class Association, not to Fleet 22:
+- Renew online: https://archive.j105.org
+
+Please forward this to your members or let us know if you need assistance
+reaching these boat owners.
+
+Thank you for your support of Fleet 22!
+
+Best regards,
+Fleet 22 Lake Erie
+fleet22@fleet22.us
+""")
+
+# (boat subject, boat body, club subject, club body) per --dues choice
+TEMPLATES = {
+    'fleet': (BOAT_SUBJECT, BOAT_BODY, CLUB_SUBJECT, CLUB_BODY),
+    'class': (CLASS_BOAT_SUBJECT, CLASS_BOAT_BODY, CLASS_CLUB_SUBJECT, CLASS_CLUB_BODY),
+}
+
+
+# --- Recipients and messages ---------------------------------------------
+
+def load_contacts(contacts_file):
+    """
+    Read reminder contacts CSV (Hull, Yacht Club, Name, Email).
+
+    Rows with a Hull are boat contacts; rows with only a Yacht Club are club
+    contacts (fleet captain / secretary).
+
+    Returns:
+        (boat_contacts, club_contacts) as {hull: [(name, email)]} and {club: [(name, email)]}
+    """
+    boat_contacts, club_contacts = {}, {}
+    if not Path(contacts_file).exists():
+        logger.warning(f"Contacts file not found: {contacts_file}")
+        return boat_contacts, club_contacts
+
+    with open(contacts_file, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            email = (row.get('Email') or '').strip()
+            if not email:
+                continue
+            contact = ((row.get('Name') or '').strip(), email)
+            hull = (row.get('Hull') or '').strip()
+            club = (row.get('Yacht Club') or '').strip()
+            if hull:
+                boat_contacts.setdefault(hull, []).append(contact)
+            elif club:
+                club_contacts.setdefault(club, []).append(contact)
+    return boat_contacts, club_contacts
+
+
+def unpaid_partitions(boats_data, members_data, dues='fleet'):
+    """
+    Unpaid boats overall and by yacht club, from one partitioning pass.
+
+    dues='fleet' uses the Fleet Dues field in boats_fleet22.json; dues='class'
+    uses class membership (see followup_report_definition).
+    """
+    report = followup_report_definition(get_payment_status(members_data), dues=dues)
+    return partition(boats_data, report.tables, split_field='Yacht Club')
+
+
+def _address(name, email):
+    return f"{name} <{email}>" if name else email
+
+
+def build_messages(scopes, membership, boat_contacts, club_contacts, per='boat',
+                   sender='fleet22@fleet22.us', season=CURRENT_YEAR, amount=FLEET_DUES_AMOUNT,
+                   dues='fleet'):
+    """
+    Render personalized reminders with the fleet or class dues templates.
+
+    Returns:
+        (messages, skipped) where skipped lists (target, reason)
+    """
+    messages, skipped = [], []
+    boat_subject, boat_body, club_subject, club_body = TEMPLATES[dues]
+
+    def new_message(recipients, subject, body):
+        msg = EmailMessage()
+        msg['From'] = sender
+        msg['To'] = ', '.join(_address(n, e) for n, e in recipients)
+        msg['Subject'] = subject
+        msg['Date'] = formatdate(localtime=True)
+        msg['Message-ID'] = make_msgid(domain=sender.rsplit('@', 1)[-1])
+        msg.set_content(body)
+        return msg
+
+    if per == 'boat':
+        for boat in scopes[None]['unpaid']:
+            hull = str(boat.get('Hull Number', ''))
+            recipients = boat_contacts.get(hull)
+            if not recipients:
+                skipped.append((f"Hull {hull}", "no contact email"))
+                continue
+            names = [n for n, _ in recipients if n] or \
+                [o['name'] for o in membership.owners(hull) if o['status'] == 'OW']
+            fields = {
+                'hull': hull,
+                'boat_name': boat.get('Boat Name') or membership.boat_name(hull) or 'your boat',
+                'greeting': ' & '.join(n.split()[0] for n in names) or 'Skipper',
+                'season': season,
+                'amount': amount,
+            }
+            messages.append((f"hull_{hull}", new_message(
+                recipients, boat_subject.substitute(fields), boat_body.substitute(fields))))
+    else:
+        for club, rows in scopes.items():
+            if club is None or not rows['unpaid']:
+                continue
+            recipients = club_contacts.get(club)
+            if not recipients:
+                skipped.append((club, "no club contact email"))
+                continue
+            boat_list = '\n'.join(
+                f"- Hull {b.get('Hull Number', ''):>4} | {b.get('Boat Name') or 'Unknown'}"
+                for b in rows['unpaid']
+            )
+            fields = {
+                'club': club,
+                'greeting': ' & '.join(n for n, _ in recipients if n) or f"{club} Fleet Captain",
+                'boat_list': boat_list,
+                'season': season,
+                'amount': amount,
+            }
+            messages.append((f"club_{club}", new_message(
+                recipients, club_subject.substitute(fields), club_body.substitute(fields))))
+
+    return messages, skipped
+
+
+# --- Delivery --------------------------------------------------------------
+
+def write_eml(messages, output_dir):
+    """Dry run: write each message as <name>.eml."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, msg in messages:
+        path = output_dir / f"{name.replace(' ', '_')}.eml"
+        path.write_bytes(bytes(msg))
+        paths.append(path)
+    logger.info(f"Wrote {len(paths)} .eml files to {output_dir}")
+    return paths
+
+
+SECURITY_MODES = ('starttls', 'ssl', 'none')
+
+
+class SmtpDispatcher:
+    """Send messages over one reused SMTP connection with batching and rate limiting.
+
+    security='starttls' (port 587) upgrades the connection and refuses to go
+    on if the server does not offer STARTTLS; 'ssl' (port 465) connects with
+    implicit TLS; 'none' sends in plaintext (local test servers only).
+    """
+
+    def __init__(self, host, port=587, username=None, password=None, security='starttls',
+                 batch_size=20, batch_pause=30.0, rate=30.0, timeout=30):
+        if security not in SECURITY_MODES:
+            raise ValueError(f"security must be one of {', '.join(SECURITY_MODES)}, got '{security}'")
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.security = security
+        self.batch_size = max(1, batch_size)
+        self.batch_pause = batch_pause
+        self.min_interval = 60.0 / rate if rate else 0.0
+        self.timeout = timeout
+        self._smtp = None
+
+    def connect(self):
+        context = ssl.create_default_context()
+        if self.security == 'ssl':
+            self._smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout, context=context)
+            self._smtp.ehlo()
+        else:
+            self._smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            self._smtp.ehlo()
+            if self.security == 'starttls':
+                if not self._smtp.has_extn('starttls'):
+                    self._smtp.close()
+                    self._smtp = None
+                    raise smtplib.SMTPNotSupportedError(
+                        f"{self.host}:{self.port} does not offer STARTTLS; refusing to continue "
+                        f"in plaintext (use --security ssl for port 465)")
+                self._smtp.starttls(context=context)
+                self._smtp.ehlo()
+        if self.username:
+            if self.security == 'none':
+                logger.warning(f"Logging in to {self.host}:{self.port} without TLS")
+            self._smtp.login(self.username, self.password or '')
+        logger.info(f"Connected to SMTP server {self.host}:{self.port} ({self.security})")
+
+    def close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except smtplib.SMTPException:
+                self._smtp.close()
+            self._smtp = None
+
+    def _send_one(self, msg):
+        try:
+            self._smtp.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # Servers drop idle connections during batch pauses; reconnect once
+            logger.info("SMTP connection dropped; reconnecting")
+            self.connect()
+            self._smtp.send_message(msg)
+
+    def send(self, messages):
+        """
+        Send (name, message) pairs.
+
+        Returns:
+            (sent, failed) where failed lists (name, error)
+        """
+        sent, failed = [], []
+        self.connect()
+        try:
+            last = 0.0
+            for i, (name, msg) in enumerate(messages):
+                if i and i % self.batch_size == 0 and self.batch_pause:
+                    logger.info(f"Sent {i} messages; pausing {self.batch_pause:.0f}s between batches")
+                    time.sleep(self.batch_pause)
+                wait = self.min_interval - (time.monotonic() - last)
+                if wait > 0:
+                    time.sleep(wait)
+                last = time.monotonic()
+
+                try:
+                    self._send_one(msg)
+                    sent.append(name)
+                    logger.info(f"Sent reminder {name} to {msg['To']}")
+                except (smtplib.SMTPException, OSError) as e:
+                    failed.append((name, str(e)))
+                    logger.error(f"Failed to send {name}: {e}")
+        finally:
+            self.close()
+        return sent, failed
+
+
+# --- Local SMTP stand-in ---------------------------------------------------
+
+class _DebugSMTPHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP dialogue: accepts every message and hands it to the server."""
+
+    def _reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self._reply("220 fleet22 debug SMTP ready")
+        mail_from, rcpt_to = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command.split(' ', 1)[0].upper()
+
+            if verb == 'EHLO':
+                self._reply("250-fleet22-debug")
+                self._reply("250 8BITMIME")
+            elif verb == 'HELO':
+                self._reply("250 fleet22-debug")
+            elif verb == 'MAIL':
+                mail_from, rcpt_to = command[10:].strip(), []
+                self._reply("250 OK")
+            elif verb == 'RCPT':
+                rcpt_to.append(command[8:].strip())
+                self._reply("250 OK")
+            elif verb == 'DATA':
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data in (b".\r\n", b".\n"):
+                        break
+                    lines.append(data[1:] if data.startswith(b"..") else data)
+                self.server.deliver(mail_from, rcpt_to, b"".join(lines))
+                self._reply("250 OK: queued")
+            elif verb in ('RSET', 'NOOP'):
+                mail_from, rcpt_to = (None, []) if verb == 'RSET' else (mail_from, rcpt_to)
+                self._reply("250 OK")
+            elif verb == 'QUIT':
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class DebugSMTPServer(socketserver.ThreadingTCPServer):
+    """
+    Local SMTP stand-in for end-to-end runs.
+
+    Received messages are kept in `received` and, when outbox is given,
+    written there as .eml files. Use as a context manager; `port` is the
+    bound port (pass port=0 to pick a free one).
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0, outbox=None):
+        super().__init__((host, port), _DebugSMTPHandler)
+        self.outbox = Path(outbox) if outbox else None
+        self.received = []
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def deliver(self, mail_from, rcpt_to, data):
+        with self._lock:
+            self.received.append((mail_from, list(rcpt_to), data))
+            if self.outbox:
+                self.outbox.mkdir(parents=True, exist_ok=True)
+                (self.outbox / f"received_{len(self.received):03d}.eml").write_bytes(data)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Send personalized dues reminders to unpaid boats or yacht clubs"
+    )
+    parser.add_argument('--per', choices=['boat', 'club'], default='boat',
+                        help="One message per unpaid boat or per yacht club (default: boat)")
+    parser.add_argument('--dues', choices=['fleet', 'class'], default='fleet',
+                        help="Which dues to remind about (default: fleet)")
+    parser.add_argument('--club', type=str, help="Only this yacht club")
+    parser.add_argument('--boats', type=Path, default=BOATS_FILE, help="Path to boats data JSON file")
+    parser.add_argument('--members', type=Path, default=MEMBERS_FILE, help="Path to members status JSON file")
+    parser.add_argument('--contacts', type=Path, default=REMINDER_CONTACTS_FILE,
+                        help=f"Contacts CSV with Hull, Yacht Club, Name, Email (default: {REMINDER_CONTACTS_FILE})")
+    parser.add_argument('--dry-run', action='store_true', help="Write .eml files instead of sending")
+    parser.add_argument('--outbox', type=Path,
+                        help="Directory for .eml files (default: data/payments/reminders/<timestamp>)")
+    parser.add_argument('--debug-server', action='store_true',
+                        help="Send to a local in-process SMTP stand-in that saves to --outbox")
+    parser.add_argument('--host', default=os.environ.get('FLEET22_SMTP_HOST', 'localhost'),
+                        help="SMTP host (env FLEET22_SMTP_HOST)")
+    parser.add_argument('--port', type=int, default=int(os.environ.get('FLEET22_SMTP_PORT', 587)),
+                        help="SMTP port (env FLEET22_SMTP_PORT, default: 587)")
+    parser.add_argument('--security', choices=SECURITY_MODES, default=os.environ.get('FLEET22_SMTP_SECURITY'),
+                        help="starttls, ssl (implicit TLS) or none (env FLEET22_SMTP_SECURITY; "
+                             "default: ssl on port 465, otherwise starttls)")
+    parser.add_argument('--sender', default=os.environ.get('FLEET22_SMTP_FROM', 'fleet22@fleet22.us'),
+                        help="From address (env FLEET22_SMTP_FROM)")
+    parser.add_argument('--batch-size', type=int, default=20, help="Messages per batch (default: 20)")
+    parser.add_argument('--batch-pause', type=float, default=30.0,
+                        help="Seconds to pause between batches (default: 30)")
+    parser.add_argument('--rate', type=float, default=30.0,
+                        help="Maximum messages per minute (default: 30, 0 = unlimited)")
+    args = parser.parse_args()
+
+    try:
+        boats_data = load_json(args.boats)
+        members_data = load_json(args.members)
+        if args.club:
+            boats_data = [b for b in boats_data if b.get('Yacht Club') == args.club]
+
+        scopes = unpaid_partitions(boats_data, members_data, args.dues)
+        boat_contacts, club_contacts = load_contacts(args.contacts)
+        messages, skipped = build_messages(
+            scopes, MembershipIndex.from_records(members_data), boat_contacts, club_contacts,
+            per=args.per, sender=args.sender, dues=args.dues
+        )
+
+        print(f"📧 {len(messages)} reminders for {len(scopes[None]['unpaid'])} unpaid boats")
+        for target, reason in skipped:
+            print(f"   ⚠️  Skipped {target}: {reason}")
+        if not messages:
+            print(f"💡 Add email addresses to {args.contacts}")
+            return 0 if not skipped else 1
+
+        outbox = args.outbox or PAYMENTS_DATA / 'reminders' / datetime.now().strftime('%Y%m%d_%H%M%S')
+
+        if args.dry_run:
+            paths = write_eml(messages, outbox)
+            print(f"✅ Dry run: wrote {len(paths)} .eml files")
+            print(f"📁 {outbox}")
+            return 0
+
+        if args.debug_server:
+            with DebugSMTPServer(outbox=outbox) as server:
+                dispatcher = SmtpDispatcher('127.0.0.1', server.port, security='none',
+                                            batch_size=args.batch_size, batch_pause=0, rate=0)
+                sent, failed = dispatcher.send(messages)
+                received = len(server.received)
+            print(f"🧪 Debug server received {received} messages")
+            print(f"📁 {outbox}")
+        else:
+            dispatcher = SmtpDispatcher(
+                args.host, args.port,
+                username=os.environ.get('FLEET22_SMTP_USER'),
+                password=os.environ.get('FLEET22_SMTP_PASSWORD'),
+                security=args.security or ('ssl' if args.port == 465 else 'starttls'),
+                batch_size=args.batch_size, batch_pause=args.batch_pause, rate=args.rate
+            )
+            sent, failed = dispatcher.send(messages)
+
+        print(f"✅ Sent {len(sent)} reminders")
+        for name, error in failed:
+            print(f"   ❌ {name}: {error}")
+        return 1 if failed else 0
+
+    except Exception as e:
+        logger.error(f"Error sending dues reminders: {e}")
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
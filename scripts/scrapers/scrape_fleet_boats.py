@@ -13,6 +13,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from utils.logger import setup_logger
 from utils.data_loader import load_json, save_json
+from utils.membership_index import MembershipIndex
 from utils.path_utils import BOATS_FILE, MEMBERS_FILE
 
 # Setup logging
@@ -24,7 +25,7 @@ PRESERVE_FIELDS = [
     'Yacht Club'
 ]
 
-CURRENT_YEAR = str(date.today().year)
+CURRENT_YEAR = date.today().year
 
 def get_existing_fleet_data():
     """Try to load existing boats_fleet22.json data if available"""
@@ -49,11 +50,12 @@ def extract_preserved_data(existing_data):
         logger.info(f"Extracted preserved data for {len(preserved_map)} boats")
     return preserved_map
 
-def merge_preserved_data(scraped_data, preserved_map):
+def merge_preserved_data(scraped_data, preserved_map, membership):
     """Merge scraped boat data with existing fleet dues and yacht club information.
     
-    Class Dues are derived from the members JSON Class Membership field.
-    Fleet Dues are manually maintained — only preserved from existing data.
+    Class Dues are derived from the members JSON Class Membership field
+    (via the MembershipIndex). Fleet Dues are manually maintained — only
+    preserved from existing data.
     """
     merged_count = 0
     for boat in scraped_data:
@@ -71,41 +73,35 @@ def merge_preserved_data(scraped_data, preserved_map):
             boat['Fleet Dues'] = 'Not Paid'
 
         # Class Dues derived from members data Class Membership field
-        class_membership = boat.pop('Class Membership', '')
-        boat['Class Dues'] = 'Paid' if f'Member {CURRENT_YEAR}' in class_membership else 'Not Paid'
+        boat['Class Dues'] = 'Paid' if membership.paid_in(hull, CURRENT_YEAR) else 'Not Paid'
     
     logger.info(f"Merged preserved data for {merged_count} boats")
     return scraped_data
 
 def load_fleet22_from_members():
-    """Load Fleet 22 boats from j105_members_status.json, deduplicated by hull number."""
+    """Load Fleet 22 boats from j105_members_status.json, deduplicated by hull number.
+
+    Returns:
+        (boats, membership_index), or (None, None) if the members file is unavailable
+    """
     if not MEMBERS_FILE.exists():
         logger.warning(f"Members file not found: {MEMBERS_FILE}")
-        return None
+        return None, None
 
     try:
-        all_members = load_json(MEMBERS_FILE)
-        fleet22_entries = [m for m in all_members if m.get('Fleet') == '22']
-        logger.info(f"Found {len(fleet22_entries)} Fleet 22 entries in members data")
+        membership = MembershipIndex.load(MEMBERS_FILE)
 
-        # Deduplicate by hull number (multiple entries = co-owners)
-        seen_hulls = set()
-        boats = []
-        for entry in fleet22_entries:
-            hull = str(entry.get('Hull', ''))
-            if hull and hull not in seen_hulls:
-                seen_hulls.add(hull)
-                boats.append({
-                    'Hull Number': hull,
-                    'Boat Name': entry.get('Boat Name', ''),
-                    'Class Membership': entry.get('Class Membership', ''),
-                })
+        # One entry per hull (multiple member records = co-owners)
+        boats = [
+            {'Hull Number': hull, 'Boat Name': membership.boat_name(hull)}
+            for hull in membership.hulls(fleet='22')
+        ]
         
-        logger.info(f"Deduplicated to {len(boats)} unique Fleet 22 boats")
-        return boats
+        logger.info(f"Found {len(boats)} unique Fleet 22 boats in members data")
+        return boats, membership
     except Exception as e:
         logger.error(f"Error loading members data: {str(e)}")
-        return None
+        return None, None
 
 def main():
     """Main execution function."""
@@ -116,11 +112,11 @@ def main():
     preserved_map = extract_preserved_data(existing_data)
     
     # Load Fleet 22 boats from members JSON
-    fresh_data = load_fleet22_from_members()
+    fresh_data, membership = load_fleet22_from_members()
     
     if fresh_data:
         # Merge fresh data with existing preserved data
-        data = merge_preserved_data(fresh_data, preserved_map)
+        data = merge_preserved_data(fresh_data, preserved_map, membership)
         logger.info("Updated boat list with preserved data")
     elif existing_data:
         # Use existing data if members file unavailable
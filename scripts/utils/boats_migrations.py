@@ -0,0 +1,261 @@
+"""Versioned schema migrations for boats_fleet22.json.
+
+The boats file stays a plain JSON list (the web pages read it directly), so
+its schema version and dues season are stamped in a sidecar file,
+boats_fleet22.schema.json. Migrations are registered per target version as
+per-boat transforms; every pending step, plus an optional season rollover,
+is applied to each boat in one pass and the result is saved once.
+
+Schema versions:
+    1: legacy detailed format ("Fleet Dues 2025", payment date/method, Owner, ...);
+       the dues fields are replaced, other keys (Owner, ...) are carried over
+    2: simplified format ("Fleet Dues" / "Class Dues")
+    3: normalized simplified format (string hulls, exact "Paid"/"Not Paid",
+       canonical key order; any other keys are kept after the standard ones)
+"""
+import difflib
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .logger import setup_logger
+from .path_utils import BOATS_FILE, BOATS_SCHEMA_FILE
+
+logger = setup_logger(__name__)
+
+BOAT_KEYS = ('Hull Number', 'Boat Name', 'Fleet Dues', 'Yacht Club', 'Class Dues')
+PAID, NOT_PAID = 'Paid', 'Not Paid'
+
+LEGACY_DUES = re.compile(r'^(Fleet|Class) Dues (\d{4})$')
+# Per-season detail fields of the legacy format, replaced by the ledger
+LEGACY_DUES_DETAIL = re.compile(r'^(Fleet|Class) Dues Payment \w+$')
+
+_MIGRATIONS: Dict[int, Tuple[str, Callable]] = {}
+
+
+def register(version: int, description: str):
+    """Register a per-boat transform that upgrades a record to `version`."""
+    def decorator(func):
+        if version in _MIGRATIONS:
+            raise ValueError(f"Migration to version {version} already registered")
+        _MIGRATIONS[version] = (description, func)
+        return func
+    return decorator
+
+
+def latest_version() -> int:
+    return max(_MIGRATIONS)
+
+
+def _dues_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return PAID if value else NOT_PAID
+    return PAID if str(value or '').strip().lower() in ('paid', 'yes', 'y', 'true') else NOT_PAID
+
+
+@register(2, "Convert detailed year-specific dues fields to simplified Fleet/Class Dues")
+def _simplify(boat: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    # Use the most recent year present for each dues type
+    latest = {}
+    for key in boat:
+        match = LEGACY_DUES.match(key)
+        if match:
+            kind, year = match.group(1), int(match.group(2))
+            if year >= latest.get(kind, (0, None))[0]:
+                latest[kind] = (year, key)
+
+    simplified = {
+        'Hull Number': boat.get('Hull Number', ''),
+        'Boat Name': boat.get('Boat Name', ''),
+        'Yacht Club': boat.get('Yacht Club', ''),
+    }
+    for kind in ('Fleet', 'Class'):
+        field = f"{kind} Dues"
+        source = latest[kind][1] if kind in latest else field
+        simplified[field] = PAID if boat.get(source) == PAID else NOT_PAID
+    # Only the dues fields are replaced; anything else on the record is kept
+    simplified.update((key, value) for key, value in boat.items()
+                      if key not in simplified and key not in ('Fleet Dues', 'Class Dues')
+                      and not LEGACY_DUES.match(key) and not LEGACY_DUES_DETAIL.match(key))
+    return simplified
+
+
+@register(3, "Normalize hull numbers, dues values and key order")
+def _normalize(boat: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    normalized = {}
+    for key in BOAT_KEYS:
+        value = boat.get(key, '')
+        if key in ('Fleet Dues', 'Class Dues'):
+            value = _dues_value(value)
+        else:
+            value = '' if value is None else str(value).strip()
+        normalized[key] = value
+    # Keys added by hand (notes, contacts) are kept, after the standard ones
+    normalized.update((key, value) for key, value in boat.items() if key not in normalized)
+    return normalized
+
+
+def _rollover(boat: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    boat = dict(boat)
+    boat['Fleet Dues'] = NOT_PAID
+    if not context.get('fleet_only'):
+        boat['Class Dues'] = NOT_PAID
+    return boat
+
+
+def detect_version(boats: List[Dict[str, Any]]) -> int:
+    """Infer the schema version of an unstamped boats list."""
+    keys = {key for boat in boats for key in boat}
+    if any(LEGACY_DUES.match(key) for key in keys):
+        return 1
+    if not boats:
+        return latest_version()
+    conforming = all(
+        list(boat)[:len(BOAT_KEYS)] == list(BOAT_KEYS)
+        and isinstance(boat['Hull Number'], str)
+        and boat['Fleet Dues'] in (PAID, NOT_PAID)
+        and boat['Class Dues'] in (PAID, NOT_PAID)
+        for boat in boats
+    )
+    return 3 if conforming else 2
+
+
+def stamp_file_for(boats_file: Path) -> Path:
+    """Schema stamp sidecar for a boats file (boats_fleet22.schema.json for the default)."""
+    boats_file = Path(boats_file)
+    if boats_file.resolve() == BOATS_FILE.resolve():
+        return BOATS_SCHEMA_FILE
+    return boats_file.with_suffix('.schema.json')
+
+
+def read_stamp(stamp_file: Path = BOATS_SCHEMA_FILE) -> Dict[str, Any]:
+    stamp_file = Path(stamp_file)
+    if not stamp_file.exists():
+        return {}
+    with open(stamp_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def stamped_season(stamp_file: Path = BOATS_SCHEMA_FILE) -> Optional[int]:
+    """Dues season boats_fleet22.json holds, from its stamp (None when unstamped)."""
+    season = read_stamp(stamp_file).get('season')
+    return int(season) if season else None
+
+
+def plan_migration(current_version: int, current_season: Optional[int],
+                   target_season: Optional[int] = None) -> List[Tuple[str, Callable]]:
+    """
+    Ordered (description, transform) steps needed to reach the latest schema and target season.
+
+    An unknown current season (no stamp) with a target season is a rollover.
+    """
+    steps = [
+        (f"v{version}: {description}", func)
+        for version, (description, func) in sorted(_MIGRATIONS.items())
+        if version > current_version
+    ]
+    if target_season is not None and (current_season is None or target_season > current_season):
+        source = current_season if current_season is not None else 'unstamped'
+        steps.append((f"season rollover {source} -> {target_season}: reset dues to Not Paid", _rollover))
+    return steps
+
+
+def apply_steps(boats: List[Dict[str, Any]], steps: List[Tuple[str, Callable]],
+                context: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Run every step on each boat in a single pass.
+
+    Returns:
+        (migrated boats, {step description: records changed by that step})
+    """
+    changed = {description: 0 for description, _ in steps}
+    migrated = []
+    for boat in boats:
+        for description, func in steps:
+            updated = func(boat, context)
+            if updated != boat:
+                changed[description] += 1
+            boat = updated
+        migrated.append(boat)
+    return migrated, changed
+
+
+def json_diff(before: Any, after: Any, name: str = BOATS_FILE.name) -> str:
+    """Unified diff of the JSON text as save_json would write it."""
+    old = json.dumps(before, indent=4, ensure_ascii=False).splitlines(keepends=True)
+    new = json.dumps(after, indent=4, ensure_ascii=False).splitlines(keepends=True)
+    return ''.join(difflib.unified_diff(old, new, f"a/{name}", f"b/{name}"))
+
+
+def migrate_boats_file(boats_file: Path = BOATS_FILE, stamp_file: Path = BOATS_SCHEMA_FILE,
+                       season: Optional[int] = None, fleet_only: bool = False,
+                       dry_run: bool = False, from_season: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Bring boats_fleet22.json to the latest schema (and optionally a new season).
+
+    Args:
+        season: Target dues season; a season later than the stamped one
+            resets dues (the rollover step). Without a stamped season (and no
+            from_season) any target season is treated as a rollover.
+        from_season: Season the data currently holds, for files without a
+            stamp; the stamped season wins when there is one
+        fleet_only: On rollover, keep Class Dues
+        dry_run: Compute the result and diff without writing anything
+
+    Returns:
+        Dict with from/to version and season, steps, per-step change counts,
+        the diff and whether anything was written
+    """
+    from .data_loader import load_json, save_json
+
+    boats = load_json(boats_file)
+    stamp = read_stamp(stamp_file)
+    current_version = stamp.get('schema_version') or detect_version(boats)
+    # Never guess the season from the clock: in January the stamp-less file
+    # still holds last season's dues
+    current_season = stamp.get('season') or from_season
+    target_season = season or current_season
+
+    if current_season is not None and target_season < current_season:
+        raise ValueError(f"Cannot roll back from season {current_season} to {target_season}")
+
+    steps = plan_migration(current_version, current_season, target_season)
+    migrated, changed = apply_steps(boats, steps, {'season': target_season, 'fleet_only': fleet_only})
+
+    result = {
+        'from_version': current_version,
+        'to_version': latest_version(),
+        'from_season': current_season,
+        'to_season': target_season,
+        'steps': [description for description, _ in steps],
+        'rollover': any(func is _rollover for _, func in steps),
+        'changed': changed,
+        'diff': json_diff(boats, migrated, Path(boats_file).name),
+        'written': False,
+    }
+
+    needs_stamp = (stamp.get('schema_version') != latest_version()
+                   or stamp.get('season') != target_season)
+    if dry_run or not (steps or needs_stamp):
+        return result
+
+    if migrated != boats:
+        save_json(migrated, boats_file)
+    history = stamp.get('history', [])
+    if steps:
+        history.append({
+            'applied': datetime.now().isoformat(timespec='seconds'),
+            'steps': result['steps'],
+        })
+    save_json({
+        'schema_version': latest_version(),
+        'season': target_season,
+        'history': history,
+    }, stamp_file, create_backup=False)
+
+    logger.info(f"Migrated {Path(boats_file).name} v{current_version}/{current_season} -> "
+                f"v{latest_version()}/{target_season} ({len(steps)} steps)")
+    result['written'] = True
+    return result
@@ -0,0 +1,163 @@
+"""
+Sail certificate number decoding.
+
+J/105 sail certificate numbers have the form YYMMSSSL:
+    YY   issue year (20YY; 19YY when that would be in the future)
+    MM   issue month
+    SSS  sequence number within the month
+    L    sailmaker code letter
+
+Decoding and the cross-checks against Delivery Date / Sailmaker work on whole
+pandas columns at once.
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .sailmakers import get_canonicalizer
+
+CERTIFICATE_PATTERN = r'^(?P<yy>\d{2})(?P<mm>\d{2})(?P<seq>\d{3})(?P<code>[A-Z])$'
+
+# Sailmaker code letters as issued by the class (one code per loft); names
+# are the canonical makers from sailmakers.SAILMAKER_ALIASES
+MAKER_CODES = {
+    'A': 'Hallett Canvas & Sails',
+    'B': 'Banks',
+    'C': 'Sinbad Sails',
+    'D': 'Doyle',
+    'E': 'Elliot Pattison',
+    'F': 'Schurr Sails',
+    'G': 'C&C Sailmakers',
+    'H': 'Hood Sailmakers',
+    'I': 'Block Island Sails & Canvas',
+    'K': 'UK Halsey',
+    'L': 'Performance Sails Ltd.',
+    'M': 'Maine Sailing Partners',
+    'N': 'North',
+    'O': 'Evolution Sails Toronto',
+    'P': 'Point Sails',
+    'Q': 'Quantum',
+    'S': 'Shore',
+    'T': 'Sail Technologies',
+    'U': 'Ullman',
+    'W': 'West Wind Sails',
+    'Z': 'Z Sails',
+}
+
+DECODED_COLUMNS = ['issue_year', 'issue_month', 'sequence', 'maker_code', 'maker']
+
+# Delivery may precede the certificate's issue month by this much (paperwork lag)
+EARLY_DELIVERY_MONTHS = 1
+# Certificates delivered later than this after issue are flagged
+LATE_DELIVERY_MONTHS = 36
+# First year of J/105 production; earlier delivery dates are placeholders
+# (1969-12-31 epoch values), reported by scan_data_quality.py instead
+FIRST_J105_YEAR = 1991
+
+
+def decode_certificates(certificates):
+    """
+    Decode certificate numbers.
+
+    Args:
+        certificates: Sequence or Series of certificate strings
+
+    Returns:
+        DataFrame aligned with the input (same index for a Series) with
+        DECODED_COLUMNS plus 'valid'; undecodable numbers have valid=False
+        and missing components
+    """
+    series = certificates if isinstance(certificates, pd.Series) else pd.Series(list(certificates))
+    parts = series.fillna('').astype(str).str.strip().str.upper().str.extract(CERTIFICATE_PATTERN)
+
+    month = pd.to_numeric(parts['mm'], errors='coerce')
+    valid = parts['yy'].notna() & month.between(1, 12)
+
+    current_yy = datetime.now().year % 100
+    yy = pd.to_numeric(parts['yy'], errors='coerce')
+    # Two-digit years past the current year can only be 1990s certificates
+    year = np.where(yy > current_yy + 1, 1900 + yy, 2000 + yy)
+
+    decoded = pd.DataFrame({
+        'issue_year': pd.array(np.where(valid, year, np.nan), dtype='Int64'),
+        'issue_month': pd.array(month.where(valid), dtype='Int64'),
+        'sequence': pd.array(pd.to_numeric(parts['seq'], errors='coerce').where(valid), dtype='Int64'),
+        'maker_code': parts['code'].where(valid),
+        'valid': valid,
+    }, index=series.index)
+    decoded['maker'] = decoded['maker_code'].map(MAKER_CODES)
+    return decoded[DECODED_COLUMNS + ['valid']]
+
+
+def cross_check(df, decoded=None, early_months=EARLY_DELIVERY_MONTHS, late_months=LATE_DELIVERY_MONTHS):
+    """
+    Flag sail tags whose certificate disagrees with the rest of the record.
+
+    Args:
+        df: Sail tags with 'Certificate No.', 'Delivery Date' and 'Sailmaker'
+        decoded: Result of decode_certificates() for df, if already computed
+        early_months: Allowed months of delivery before the issue month
+        late_months: Allowed months of delivery after the issue month
+
+    Returns:
+        DataFrame (index = df index) with the decoded fields, 'months_to_delivery'
+        and 'issue', one row per flagged record
+    """
+    if decoded is None:
+        decoded = decode_certificates(df['Certificate No.'])
+
+    delivery = pd.to_datetime(df['Delivery Date'], format='%Y-%m-%d', errors='coerce')
+    delivery = delivery.where(delivery.dt.year >= FIRST_J105_YEAR)
+    months = ((delivery.dt.year * 12 + delivery.dt.month)
+              - (decoded['issue_year'].astype('float') * 12 + decoded['issue_month'].astype('float')))
+
+    # Compare canonical makers so "Evolution" matches "Evolution Sails Toronto"
+    raw = df['Sailmaker'].fillna('').astype(str).str.strip()
+    sailmaker = raw.map(get_canonicalizer().canonical)
+    same_maker = sailmaker == decoded['maker']
+
+    checks = [
+        (~decoded['valid'], "certificate is not YYMMSSSL"),
+        (decoded['valid'] & decoded['maker'].isna(), "unknown sailmaker code"),
+        (decoded['maker'].notna() & (sailmaker != '') & ~same_maker,
+         "sailmaker does not match certificate code"),
+        (months < -early_months, "delivered before the certificate was issued"),
+        (months > late_months, f"delivered more than {late_months} months after issue"),
+    ]
+
+    flagged = []
+    for mask, issue in checks:
+        mask = mask.fillna(False).astype(bool)
+        if mask.any():
+            rows = decoded[mask].assign(months_to_delivery=months[mask], issue=issue)
+            flagged.append(rows)
+    if not flagged:
+        return pd.DataFrame(columns=DECODED_COLUMNS + ['months_to_delivery', 'issue'])
+    return pd.concat(flagged).drop(columns='valid').sort_index(kind='stable')
+
+
+def build_certificate_index(certificates, hulls, decoded=None):
+    """
+    Lookup tables from issue year and maker code to [hull, certificate] pairs.
+
+    Returns:
+        Dict with 'by_issue_year' and 'by_maker_code', each {key: [[hull, certificate], ...]}
+    """
+    if decoded is None:
+        decoded = decode_certificates(certificates)
+    frame = pd.DataFrame({
+        'hull': list(hulls),
+        'certificate': list(certificates),
+        'issue_year': decoded['issue_year'].to_numpy(),
+        'maker_code': decoded['maker_code'].to_numpy(),
+    })
+    frame = frame[decoded['valid'].to_numpy()]
+
+    def group(column):
+        return {
+            str(key): rows[['hull', 'certificate']].values.tolist()
+            for key, rows in frame.sort_values('certificate').groupby(column, sort=True)
+        }
+
+    return {'by_issue_year': group('issue_year'), 'by_maker_code': group('maker_code')}
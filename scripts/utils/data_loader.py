@@ -1,5 +1,6 @@
 """Standardized data loading utilities for Fleet22 scripts."""
 import json
+import os
 from pathlib import Path
 from typing import List, Dict, Any
 from .logger import setup_logger
@@ -51,9 +52,15 @@ def save_json(data: Any, filepath: Path, indent: int = 4,
         shutil.copy2(filepath, backup_path)
         logger.info(f"Created backup: {backup_path.name}")
     
-    # Save new data
+    # Write to a temp file and rename so readers never see a partial file
     filepath.parent.mkdir(parents=True, exist_ok=True)
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=indent, ensure_ascii=False)
+    tmp_path = filepath.with_name(f".{filepath.name}.tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=indent, ensure_ascii=False)
+        os.replace(tmp_path, filepath)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
     
     logger.info(f"Saved {len(data) if isinstance(data, list) else 'data'} to {filepath.name}")
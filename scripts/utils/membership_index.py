@@ -0,0 +1,142 @@
+"""Per-hull class membership index built from j105_members_status.json.
+
+The ``Class Membership`` field holds strings like ``"Member 2026"``,
+``"Associate 2026"`` or ``""`` (lapsed). Every record for a hull (owner,
+co-owners, associate members) contributes its year to that hull's bitset, so
+"paid in year Y" and "latest paid year" are single bit operations.
+"""
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .logger import setup_logger
+from .path_utils import MEMBERS_FILE
+
+logger = setup_logger(__name__)
+
+# Bit 0 of every year bitset is this year
+BASE_YEAR = 1990
+
+MEMBER = 'Member'
+ASSOCIATE = 'Associate'
+
+
+def parse_membership(value: Any) -> Tuple[Optional[str], Optional[int]]:
+    """
+    Parse a Class Membership string.
+
+    Returns:
+        (kind, year) such as ('Member', 2026), or (None, None) when blank or
+        unrecognized
+    """
+    parts = str(value or '').split()
+    if len(parts) < 2 or not parts[-1].isdigit():
+        return None, None
+    year = int(parts[-1])
+    if year < BASE_YEAR:
+        return None, None
+    return ' '.join(parts[:-1]), year
+
+
+def _normalize_hull(hull: Any) -> str:
+    return str(hull if hull is not None else '').strip()
+
+
+class MembershipIndex:
+    """Hull -> paid membership years (bitset), owners and fleet."""
+
+    def __init__(self):
+        self._member_years: Dict[str, int] = {}
+        self._associate_years: Dict[str, int] = {}
+        self._owners: Dict[str, List[Dict[str, str]]] = {}
+        self._fleet: Dict[str, str] = {}
+        self._boat_name: Dict[str, str] = {}
+
+    @classmethod
+    def from_records(cls, members_data: Iterable[Dict[str, Any]]) -> 'MembershipIndex':
+        """Build the index in a single pass over member records."""
+        index = cls()
+        for member in members_data:
+            hull = _normalize_hull(member.get('Hull'))
+            if not hull:
+                continue
+
+            if hull not in index._owners:
+                index._owners[hull] = []
+                index._member_years[hull] = 0
+                index._associate_years[hull] = 0
+                index._fleet[hull] = str(member.get('Fleet', '') or '')
+                index._boat_name[hull] = member.get('Boat Name', '') or ''
+
+            membership = member.get('Class Membership', '')
+            index._owners[hull].append({
+                'name': member.get('Owners/Helmsmen', '') or '',
+                'status': member.get('Status', '') or '',
+                'class_membership': membership or '',
+            })
+
+            kind, year = parse_membership(membership)
+            if year is None:
+                continue
+            bit = 1 << (year - BASE_YEAR)
+            if kind == ASSOCIATE:
+                index._associate_years[hull] |= bit
+            else:
+                index._member_years[hull] |= bit
+
+        logger.info(f"Built membership index for {len(index._owners)} hulls")
+        return index
+
+    @classmethod
+    def load(cls, filepath: Path = MEMBERS_FILE) -> 'MembershipIndex':
+        """Load j105_members_status.json and index it."""
+        from .data_loader import load_json
+        return cls.from_records(load_json(filepath))
+
+    def _bits(self, hull: Any, include_associates: bool) -> int:
+        hull = _normalize_hull(hull)
+        bits = self._member_years.get(hull, 0)
+        if include_associates:
+            bits |= self._associate_years.get(hull, 0)
+        return bits
+
+    def paid_in(self, hull: Any, year: int, include_associates: bool = False) -> bool:
+        """True if any membership on the hull covers `year`."""
+        if year < BASE_YEAR:
+            return False
+        return bool(self._bits(hull, include_associates) >> (int(year) - BASE_YEAR) & 1)
+
+    def latest_year(self, hull: Any, include_associates: bool = False) -> Optional[int]:
+        """Most recent paid membership year, or None if never paid."""
+        bits = self._bits(hull, include_associates)
+        return BASE_YEAR + bits.bit_length() - 1 if bits else None
+
+    def years(self, hull: Any, include_associates: bool = False) -> List[int]:
+        """All paid membership years for a hull, ascending."""
+        bits = self._bits(hull, include_associates)
+        return [BASE_YEAR + i for i in range(bits.bit_length()) if bits >> i & 1]
+
+    def year_bits(self, hull: Any, include_associates: bool = False) -> int:
+        """Raw year bitset (bit i == BASE_YEAR + i)."""
+        return self._bits(hull, include_associates)
+
+    def owners(self, hull: Any) -> List[Dict[str, str]]:
+        """Member records for the hull: name, status (OW/CO/AM), class_membership."""
+        return list(self._owners.get(_normalize_hull(hull), []))
+
+    def fleet(self, hull: Any) -> str:
+        return self._fleet.get(_normalize_hull(hull), '')
+
+    def boat_name(self, hull: Any) -> str:
+        return self._boat_name.get(_normalize_hull(hull), '')
+
+    def hulls(self, fleet: Optional[str] = None) -> List[str]:
+        """Indexed hulls in source order, optionally limited to one fleet."""
+        if fleet is None:
+            return list(self._owners)
+        return [h for h, f in self._fleet.items() if f == str(fleet)]
+
+    def __contains__(self, hull: Any) -> bool:
+        return _normalize_hull(hull) in self._owners
+
+    def __len__(self) -> int:
+        return len(self._owners)
@@ -17,11 +17,23 @@ PAYMENTS_DATA = DATA_DIR / "payments"
 
 # Commonly used files
 BOATS_FILE = BOATS_DATA / "boats_fleet22.json"
+BOATS_SCHEMA_FILE = BOATS_DATA / "boats_fleet22.schema.json"
 SAIL_TAGS_FILE = SAILS_DATA / "sail_tags.json"
 SAILS_FILE = SAIL_TAGS_FILE  # Alias for consistency
+SAIL_CUBE_FILE = SAILS_DATA / "sail_cube.npz"
+SAIL_CUBE_JSON = SAILS_DATA / "sail_cube.json"
+SAIL_LIMITS_STATE = SAILS_DATA / "sail_limits_state.json"
+SAIL_ELIGIBILITY_FILE = SAILS_DATA / "sail_eligibility.npz"
 MEMBERS_FILE = MEMBERS_DATA / "j105_members_status.json"
 COMBINED_FILE = COMBINED_DATA / "combined_fleet_data.json"
 STATISTICS_FILE = COMBINED_DATA / "fleet_statistics.json"
+INTEGRITY_REPORT_FILE = COMBINED_DATA / "integrity_report.json"
+CERTIFICATE_INDEX_FILE = COMBINED_DATA / "certificate_index.json"
+OWNERSHIP_HISTORY_FILE = COMBINED_DATA / "ownership_history.json"
+ACTIVE_ROSTER_FILE = DATA_DIR / "fleet22_active_roster.json"
+PAYMENT_LEDGER_FILE = PAYMENTS_DATA / "payment_ledger.jsonl"
+PAYMENT_LEDGER_CHECKPOINT = PAYMENTS_DATA / "payment_ledger_checkpoint.json"
+REMINDER_CONTACTS_FILE = PAYMENTS_DATA / "reminder_contacts.csv"
 
 def ensure_directories():
     """Create all required directories if they don't exist."""
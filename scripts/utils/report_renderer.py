@@ -0,0 +1,467 @@
+"""Shared report rendering for Fleet22 payment reports.
+
+Records are sorted once and routed into every table of a report, and into an
+optional per-group split (e.g. one report per yacht club), in a single pass.
+Each partition is then streamed row by row to one writer per output format
+(text, CSV, Markdown, HTML), so all formats come from the same data pass.
+"""
+import csv
+import html
+import re
+import sys
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .logger import setup_logger
+
+logger = setup_logger(__name__)
+
+BANNER = '=' * 80
+RULE = '-' * 80
+
+
+def hull_sort_key(record: Dict[str, Any], field: str = 'Hull Number') -> Tuple[int, Any]:
+    """Numeric hulls first in numeric order, anything else after."""
+    hull = str(record.get(field, '') or '')
+    return (0, int(hull)) if hull.isdigit() else (1, hull)
+
+
+class Column:
+    """One report column: header, record field (or getter) and text layout."""
+
+    def __init__(self, header: str, field: Any, width: Optional[int] = None,
+                 align: str = '<', prefix: str = ''):
+        self.header = header
+        self.field = field
+        self.width = width
+        self.align = align
+        self.prefix = prefix
+
+    def value(self, record: Dict[str, Any]) -> str:
+        value = self.field(record) if callable(self.field) else record.get(self.field, '')
+        return '' if value is None else str(value)
+
+    def text(self, record: Dict[str, Any]) -> str:
+        value = self.value(record)
+        if self.width:
+            value = f"{value:{self.align}{self.width}}"
+        return f"{self.prefix}{value}"
+
+
+class Table:
+    """A titled list of records selected by `where`, optionally grouped.
+
+    Tables with visible=False are partitioned (e.g. for summary counts) but
+    not written.
+    """
+
+    def __init__(self, key: str, title: str, columns: Sequence[Column],
+                 where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                 group_by: Optional[str] = None, text_header: bool = False,
+                 show_count: bool = True, visible: bool = True):
+        self.key = key
+        self.title = title
+        self.columns = list(columns)
+        self.where = where
+        self.group_by = group_by
+        self.text_header = text_header
+        self.show_count = show_count
+        self.visible = visible
+
+    def heading(self, count: int) -> str:
+        return f"{self.title} ({count})" if self.show_count else self.title
+
+    def group_of(self, record: Dict[str, Any]) -> str:
+        return str(record.get(self.group_by, '') or 'Unknown')
+
+
+class Report:
+    """
+    Report definition.
+
+    Args:
+        title: Report title
+        tables: Tables in output order
+        stats: Optional callable(rows_by_table, scope) returning a list of
+            (heading, [(label, value), ...]) blocks shown before the tables
+        notes: Optional list of (heading, text) blocks, or a callable(scope)
+            returning one, shown after the tables
+    """
+
+    def __init__(self, title: str, tables: Sequence[Table],
+                 stats: Optional[Callable] = None, notes: Any = None):
+        self.title = title
+        self.tables = list(tables)
+        self.stats = stats
+        self.notes = notes
+
+
+def partition(records: Iterable[Dict[str, Any]], tables: Sequence[Table],
+              sort_key: Callable = hull_sort_key,
+              split_field: Optional[str] = None) -> Dict[Optional[str], Dict[str, List[Dict[str, Any]]]]:
+    """
+    Sort records once and route each into every matching table.
+
+    Returns:
+        {scope: {table key: [records]}} where scope None is the full report
+        and other scopes are the values of split_field
+    """
+    def empty():
+        return {table.key: [] for table in tables}
+
+    scopes = {None: empty()}
+    for record in sorted(records, key=sort_key):
+        targets = [scopes[None]]
+        if split_field:
+            scope = str(record.get(split_field, '') or 'Unknown')
+            if scope not in scopes:
+                scopes[scope] = empty()
+            targets.append(scopes[scope])
+        for table in tables:
+            if table.where is None or table.where(record):
+                for target in targets:
+                    target[table.key].append(record)
+    return scopes
+
+
+# --- Writers ---------------------------------------------------------------
+
+class ReportWriter:
+    """Base writer; subclasses write each piece to the stream as it arrives."""
+
+    extension = ''
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def begin(self, title: str, generated: str) -> None:
+        pass
+
+    def stats(self, heading: str, items: List[Tuple[str, Any]]) -> None:
+        pass
+
+    def table(self, table: Table, rows: List[Dict[str, Any]]) -> None:
+        self.start_table(table, len(rows))
+        if table.group_by:
+            counts = Counter(table.group_of(r) for r in rows)
+            # Stable sort keeps the hull order inside each group
+            rows = sorted(rows, key=table.group_of)
+        current = None
+        for row in rows:
+            if table.group_by and table.group_of(row) != current:
+                current = table.group_of(row)
+                self.group(table, current, counts[current])
+            self.row(table, row)
+        self.end_table(table)
+
+    def start_table(self, table: Table, count: int) -> None:
+        pass
+
+    def group(self, table: Table, name: str, count: int) -> None:
+        pass
+
+    def row(self, table: Table, record: Dict[str, Any]) -> None:
+        pass
+
+    def end_table(self, table: Table) -> None:
+        pass
+
+    def note(self, heading: str, text: str) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+class TextWriter(ReportWriter):
+    """Fixed-width plain text in the style of the existing .txt reports."""
+
+    extension = 'txt'
+
+    def _line(self, text: str = '') -> None:
+        self.stream.write(text + '\n')
+
+    def begin(self, title, generated):
+        self._line(BANNER)
+        self._line(title)
+        self._line(f"Generated: {generated}")
+        self._line(BANNER)
+        self._line()
+
+    def stats(self, heading, items):
+        self._line(heading)
+        self._line(RULE)
+        width = max([19] + [len(label) + 4 for label, _ in items])
+        for label, value in items:
+            self._line(f"{label + ':':<{width}}{value}")
+        self._line()
+
+    def start_table(self, table, count):
+        self._indent = ''
+        self._line(table.heading(count))
+        self._line(RULE)
+        if table.text_header and not table.group_by:
+            self._line(' | '.join(
+                f"{c.header:{c.align}{(c.width or 0) + len(c.prefix)}}" for c in table.columns))
+            self._line(RULE)
+
+    def group(self, table, name, count):
+        self._indent = '  '
+        self._line()
+        self._line(f"{name} ({count} boat{'s' if count != 1 else ''})")
+        self._line('  ' + '-' * 76)
+
+    def row(self, table, record):
+        self._line(self._indent + ' | '.join(c.text(record) for c in table.columns))
+
+    def end_table(self, table):
+        self._line()
+
+    def note(self, heading, text):
+        self._line(heading)
+        self._line(RULE)
+        self._line(text.rstrip('\n'))
+        self._line()
+
+
+class CsvWriter(ReportWriter):
+    """One CSV row per record, tagged with its section (and group)."""
+
+    extension = 'csv'
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        self._writer = csv.writer(stream)
+        self._header = None
+        self._group = ''
+
+    def start_table(self, table, count):
+        self._group = ''
+        header = ['Section'] + (['Group'] if table.group_by else []) + [c.header for c in table.columns]
+        if header != self._header:
+            self._writer.writerow(header)
+            self._header = header
+
+    def group(self, table, name, count):
+        self._group = name
+
+    def row(self, table, record):
+        self._writer.writerow([table.title] + ([self._group] if table.group_by else [])
+                              + [c.value(record) for c in table.columns])
+
+
+class MarkdownWriter(ReportWriter):
+    """GitHub-flavored Markdown."""
+
+    extension = 'md'
+
+    @staticmethod
+    def _cell(value: Any) -> str:
+        return str(value).replace('|', '\\|')
+
+    def _line(self, text: str = '') -> None:
+        self.stream.write(text + '\n')
+
+    def _table_header(self, table):
+        self._line('| ' + ' | '.join(self._cell(c.header) for c in table.columns) + ' |')
+        self._line('|' + '|'.join('---:' if c.align == '>' else '---' for c in table.columns) + '|')
+
+    def begin(self, title, generated):
+        self._line(f"# {title}")
+        self._line()
+        self._line(f"_Generated: {generated}_")
+        self._line()
+
+    def stats(self, heading, items):
+        self._line(f"## {heading}")
+        self._line()
+        for label, value in items:
+            self._line(f"- **{label}:** {self._cell(value)}")
+        self._line()
+
+    def start_table(self, table, count):
+        self._line(f"## {table.heading(count)}")
+        if not table.group_by:
+            self._line()
+            self._table_header(table)
+
+    def group(self, table, name, count):
+        self._line()
+        self._line(f"### {self._cell(name)} ({count})")
+        self._line()
+        self._table_header(table)
+
+    def row(self, table, record):
+        self._line('| ' + ' | '.join(self._cell(c.value(record)) for c in table.columns) + ' |')
+
+    def end_table(self, table):
+        self._line()
+
+    def note(self, heading, text):
+        self._line(f"## {heading}")
+        self._line()
+        self._line(text.strip('\n'))
+        self._line()
+
+
+class HtmlWriter(ReportWriter):
+    """Standalone HTML page."""
+
+    extension = 'html'
+
+    STYLE = ("body{font-family:sans-serif;margin:2em;color:#222}"
+             "table{border-collapse:collapse;margin-bottom:1em}"
+             "th,td{border:1px solid #ccc;padding:4px 8px;text-align:left}"
+             "th{background:#f0f0f0}td.num{text-align:right}"
+             "dl{display:grid;grid-template-columns:max-content auto;gap:2px 12px}"
+             "dt{font-weight:bold}pre{white-space:pre-wrap}")
+    NUMERIC = ' class="num"'
+
+    def _write(self, text: str) -> None:
+        self.stream.write(text + '\n')
+
+    def _open_table(self, table):
+        cells = ''.join(f"<th>{html.escape(c.header)}</th>" for c in table.columns)
+        self._write(f"<table><thead><tr>{cells}</tr></thead><tbody>")
+        self._table_open = True
+
+    def _close_table(self):
+        if getattr(self, '_table_open', False):
+            self._write("</tbody></table>")
+            self._table_open = False
+
+    def begin(self, title, generated):
+        self._write("<!DOCTYPE html>")
+        self._write(f"<html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title>")
+        self._write(f"<style>{self.STYLE}</style></head><body>")
+        self._write(f"<h1>{html.escape(title)}</h1>")
+        self._write(f"<p><em>Generated: {html.escape(generated)}</em></p>")
+
+    def stats(self, heading, items):
+        self._write(f"<h2>{html.escape(heading)}</h2><dl>")
+        for label, value in items:
+            self._write(f"<dt>{html.escape(label)}</dt><dd>{html.escape(str(value))}</dd>")
+        self._write("</dl>")
+
+    def start_table(self, table, count):
+        self._write(f"<h2>{html.escape(table.heading(count))}</h2>")
+        if not table.group_by:
+            self._open_table(table)
+
+    def group(self, table, name, count):
+        self._close_table()
+        self._write(f"<h3>{html.escape(name)} ({count})</h3>")
+        self._open_table(table)
+
+    def row(self, table, record):
+        cells = ''.join(
+            f"<td{self.NUMERIC if c.align == '>' else ''}>{html.escape(c.value(record))}</td>"
+            for c in table.columns
+        )
+        self._write(f"<tr>{cells}</tr>")
+
+    def end_table(self, table):
+        self._close_table()
+
+    def note(self, heading, text):
+        self._write(f"<h2>{html.escape(heading)}</h2><pre>{html.escape(text.strip())}</pre>")
+
+    def end(self):
+        self._write("</body></html>")
+
+
+WRITERS = {cls.extension: cls for cls in (TextWriter, CsvWriter, MarkdownWriter, HtmlWriter)}
+FORMATS = tuple(WRITERS)
+
+
+class _Fanout:
+    """Forward every writer call to several writers."""
+
+    def __init__(self, writers):
+        self._writers = writers
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            for writer in self._writers:
+                getattr(writer, name)(*args, **kwargs)
+        return call
+
+
+def _slug(value: str) -> str:
+    return re.sub(r'[^A-Za-z0-9]+', '_', value).strip('_') or 'Unknown'
+
+
+def _emit(report: Report, rows_by_table, scope, writer) -> None:
+    title = report.title if scope is None else f"{report.title} - {scope}"
+    writer.begin(title, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    for heading, items in (report.stats(rows_by_table, scope) if report.stats else []):
+        writer.stats(heading, items)
+    for table in report.tables:
+        if table.visible:
+            writer.table(table, rows_by_table[table.key])
+    notes = report.notes(scope) if callable(report.notes) else (report.notes or [])
+    for heading, text in notes:
+        writer.note(heading, text)
+    writer.end()
+
+
+def write_report(report: Report, scopes: Dict[Optional[str], Dict[str, List[Dict[str, Any]]]],
+                 output: Optional[Path] = None,
+                 formats: Sequence[str] = ('txt',)) -> Dict[Tuple[Optional[str], str], Path]:
+    """
+    Stream already partitioned records to one writer per format.
+
+    Args:
+        report: Report definition
+        scopes: Result of partition()
+        output: Output path; its stem names every file (payment_report.txt,
+            payment_report.md, payment_report_EYC.txt, ...). When None the
+            full text report is written to stdout.
+        formats: Any of 'txt', 'csv', 'md', 'html'
+
+    Returns:
+        Mapping of (scope, format) -> written path (scope None is the full report)
+    """
+    unknown = set(formats) - set(WRITERS)
+    if unknown:
+        raise ValueError(f"Unknown report formats: {', '.join(sorted(unknown))}")
+
+    if output is None:
+        _emit(report, scopes[None], None, TextWriter(sys.stdout))
+        return {}
+
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    written = {}
+    for scope, rows_by_table in scopes.items():
+        stem = output.stem if scope is None else f"{output.stem}_{_slug(scope)}"
+        paths = {fmt: output.with_name(f"{stem}.{fmt}") for fmt in formats}
+        handles = [open(path, 'w', encoding='utf-8', newline='' if fmt == 'csv' else None)
+                   for fmt, path in paths.items()]
+        try:
+            writers = [WRITERS[fmt](handle) for fmt, handle in zip(paths, handles)]
+            _emit(report, rows_by_table, scope, _Fanout(writers))
+        finally:
+            for handle in handles:
+                handle.close()
+        for fmt, path in paths.items():
+            written[(scope, fmt)] = path
+
+    logger.info(f"Rendered '{report.title}' to {len(written)} files")
+    return written
+
+
+def render_report(report: Report, records: Iterable[Dict[str, Any]],
+                  output: Optional[Path] = None, formats: Sequence[str] = ('txt',),
+                  split_field: Optional[str] = None,
+                  sort_key: Callable = hull_sort_key) -> Dict[Tuple[Optional[str], str], Path]:
+    """
+    Partition records and render the report in every requested format.
+
+    split_field additionally writes one report per value of that field (e.g.
+    'Yacht Club'); see write_report() for output naming.
+    """
+    scopes = partition(records, report.tables, sort_key, split_field)
+    return write_report(report, scopes, output, formats)
@@ -1,58 +1,53 @@
 #!/usr/bin/env python3
 """
 Reset all fleet dues to 'Not Paid' at the start of a new sailing season.
-This script resets both Fleet Dues and Class Dues for all boats.
+This script resets both Fleet Dues and Class Dues for all boats and stamps
+the new season in the boats schema file; it runs the season rollover step of
+processors/migrate_boats.py.
 """
 
 import json
 import sys
 from pathlib import Path
-from datetime import datetime
 
-def reset_dues_season(input_file: str, output_file: str = None, reset_class_dues: bool = True):
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.boats_migrations import migrate_boats_file, read_stamp, stamp_file_for
+
+
+def reset_dues_season(input_file: str, season: int = None, reset_class_dues: bool = True):
     """
     Reset all dues to 'Not Paid' for a new season.
     
     Args:
         input_file: Path to the boats_fleet22.json file
-        output_file: Optional output path (defaults to input_file)
+        season: New dues season (default: the stamped season + 1)
         reset_class_dues: Whether to also reset class dues (default: True)
+
+    Returns:
+        The migrate_boats_file() result
     """
-    
-    # Read the input file
+    stamp_file = stamp_file_for(Path(input_file))
+    if season is None:
+        stamped = read_stamp(stamp_file).get('season')
+        if not stamped:
+            raise ValueError(f"{stamp_file.name} has no season stamp; pass --season")
+        season = int(stamped) + 1
+
+    plan = migrate_boats_file(Path(input_file), stamp_file, season=season,
+                              fleet_only=not reset_class_dues, dry_run=True)
+    if not plan['rollover']:
+        raise ValueError(f"{Path(input_file).name} already holds season {plan['from_season']}")
+    result = migrate_boats_file(Path(input_file), stamp_file, season=season,
+                                fleet_only=not reset_class_dues)
+
     with open(input_file, 'r') as f:
         data = json.load(f)
-    
-    # Reset dues for each boat
-    reset_count = 0
-    for boat in data:
-        # Always reset Fleet Dues
-        if boat.get("Fleet Dues") != "Not Paid":
-            boat["Fleet Dues"] = "Not Paid"
-            reset_count += 1
-        
-        # Optionally reset Class Dues
-        if reset_class_dues and boat.get("Class Dues") != "Not Paid":
-            boat["Class Dues"] = "Not Paid"
-            reset_count += 1
-    
-    # Determine output file
-    if output_file is None:
-        output_file = input_file
-    
-    # Create backup before overwriting
-    if output_file == input_file:
-        backup_file = Path(input_file).parent / f"boats_fleet22_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(backup_file, 'w') as f:
-            json.dump(data, f, indent=4)
-        print(f"📁 Backup created: {backup_file}")
-    
-    # Write the reset data
-    with open(output_file, 'w') as f:
-        json.dump(data, f, indent=4)
-    
-    print(f"✅ Reset dues for {len(data)} boats")
-    print(f"📁 Output written to: {output_file}")
+
+    print(f"✅ Reset dues for {len(data)} boats (season {result['from_season'] or 'unknown'} -> {season})")
+    print(f"📁 Output written to: {input_file} (backup created)")
+    print(f"📝 Stamp: {stamp_file}")
     
     # Print summary
     fleet_reset = sum(1 for b in data if b.get("Fleet Dues") == "Not Paid")
@@ -64,6 +59,7 @@ def reset_dues_season(input_file: str, output_file: str = None, reset_class_dues
         print(f"   All Class Dues: Not Paid ({class_reset}/{len(data)})")
     else:
         print(f"   Class Dues: Preserved")
+    return result
 
 def main():
     """Main execution function."""
@@ -84,6 +80,9 @@ Examples:
   # Reset only Fleet Dues (preserve Class Dues)
   python3 scripts/utils/reset_dues_season.py --fleet-only
   
+  # Roll over to a specific season (required when the file has no stamp)
+  python3 scripts/utils/reset_dues_season.py --season 2027
+
   # Specify custom input file
   python3 scripts/utils/reset_dues_season.py --input /path/to/boats.json
         '''
@@ -91,8 +90,8 @@ Examples:
     parser.add_argument('--input', '-i', 
                        help='Input file path (default: data/boats/boats_fleet22.json)',
                        default=str(boats_file))
-    parser.add_argument('--output', '-o',
-                       help='Output file path (default: same as input)')
+    parser.add_argument('--season', type=int,
+                       help='New dues season (default: the stamped season + 1)')
     parser.add_argument('--fleet-only', 
                        action='store_true',
                        help='Reset only Fleet Dues, preserve Class Dues')
@@ -135,14 +134,14 @@ Examples:
     
     # Perform reset
     reset_dues_season(
-        str(input_file), 
-        args.output,
+        str(input_file),
+        args.season,
         reset_class_dues=not args.fleet_only
     )
     
     print("\n✅ Season reset complete!")
     print("\n💡 Next steps:")
-    print("   1. Update Fleet Dues to 'Paid' as payments arrive")
+    print("   1. Record Fleet Dues payments with payment_ledger.py as they arrive")
     print("   2. Run update_payment_status.py to sync Class Dues from membership data")
     print("   3. Commit and push changes to update the website")
 
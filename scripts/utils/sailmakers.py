@@ -0,0 +1,142 @@
+"""Sailmaker name canonicalization.
+
+``Sailmaker`` is free text in sail_tags.json, so one loft can appear under
+several spellings ("North", "North Sails", "North Sails Annapolis"). Every
+name is mapped to one canonical maker through:
+
+1. the alias table below (exact match on the normalized key), then
+2. a token index: a name whose tokens contain the key of exactly one
+   canonical maker or alias maps to that maker.
+
+Results are memoized per distinct name, so callers can canonicalize a whole
+column at the cost of one lookup per distinct spelling. Names that match
+nothing are kept as-is and collected for review.
+"""
+import hashlib
+import json
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Set
+
+from .logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Canonical maker -> other spellings seen or expected. Canonical names match
+# the sailmaker code table in certificates.MAKER_CODES.
+SAILMAKER_ALIASES: Dict[str, List[str]] = {
+    'Banks': ['Banks Sails', 'Banks Sails Canada'],
+    'Block Island Sails & Canvas': ['Block Island Sails'],
+    'C&C Sailmakers': ['C&C', 'C and C Sailmakers', 'C & C Sails'],
+    'Doyle': ['Doyle Sails', 'Doyle Sailmakers'],
+    'Elliot Pattison': ['Elliott Pattison', 'Pattison'],
+    'Evolution Sails Toronto': ['Evolution', 'Evolution Sails'],
+    'Hallett Canvas & Sails': ['Hallett', 'Hallett Sails'],
+    'Hood Sailmakers': ['Hood', 'Hood Sails'],
+    'Maine Sailing Partners': ['MSP'],
+    'North': ['North Sails', 'North Sails One Design', 'North Sails OD'],
+    'Performance Sails Ltd.': ['Performance Sails'],
+    'Point Sails': [],
+    'Quantum': ['Quantum Sails', 'Quantum Sail Design Group'],
+    'Sail Technologies': ['Sail Tech'],
+    'Schurr Sails': ['Schurr'],
+    'Shore': ['Shore Sails'],
+    'Sinbad Sails': ['Sinbad'],
+    'UK Halsey': ['UK Sailmakers', 'UK', 'Halsey', 'UK Halsey Sailmakers'],
+    'Ullman': ['Ullman Sails'],
+    'West Wind Sails': ['West Wind'],
+    'Z Sails': [],
+}
+
+# Words dropped when comparing sailmaker names
+SAILMAKER_NOISE = re.compile(r'\b(sails?|sailmakers?|lofts?|inc|ltd|llc|co)\b|[^a-z0-9 ]')
+
+# Token-index matches on keys shorter than this are too ambiguous ("z", "uk")
+MIN_TOKEN_KEY_LENGTH = 3
+
+
+def sailmaker_key(name: Any) -> str:
+    """Comparison key: lowercase, no punctuation or generic words like 'Sails'."""
+    return ' '.join(SAILMAKER_NOISE.sub(' ', str(name or '').lower()).split())
+
+
+def aliases_digest(aliases: Optional[Dict[str, List[str]]] = None) -> str:
+    """Short hash of an alias table, for invalidating data built from it."""
+    table = SAILMAKER_ALIASES if aliases is None else aliases
+    return hashlib.sha256(json.dumps(table, sort_keys=True).encode()).hexdigest()[:12]
+
+
+class SailmakerCanonicalizer:
+    """Memoized free-text sailmaker -> canonical maker mapping."""
+
+    def __init__(self, aliases: Optional[Dict[str, List[str]]] = None):
+        self.aliases = SAILMAKER_ALIASES if aliases is None else aliases
+        self._by_key: Dict[str, str] = {}
+        self._by_token: Dict[str, Set[str]] = defaultdict(set)
+        for canonical, others in self.aliases.items():
+            for name in [canonical] + list(others):
+                key = sailmaker_key(name)
+                if not key:
+                    continue
+                self._by_key[key] = canonical
+                if len(key) >= MIN_TOKEN_KEY_LENGTH:
+                    self._by_token[key.split()[0]].add(key)
+        self._cache: Dict[str, str] = {}
+        self.unknown: Counter = Counter()
+
+    def _resolve(self, name: str) -> Optional[str]:
+        key = sailmaker_key(name)
+        if not key:
+            return None
+        if key in self._by_key:
+            return self._by_key[key]
+        tokens = key.split()
+        padded = f' {key} '
+        matches = {
+            self._by_key[candidate]
+            for token in set(tokens)
+            for candidate in self._by_token.get(token, ())
+            if f' {candidate} ' in padded
+        }
+        return matches.pop() if len(matches) == 1 else None
+
+    def canonical(self, name: Any) -> str:
+        """Canonical maker for `name`; unknown names are returned stripped."""
+        raw = str(name or '').strip()
+        if raw in self._cache:
+            if raw in self.unknown:
+                self.unknown[raw] += 1
+            return self._cache[raw]
+        resolved = self._resolve(raw)
+        if resolved is None:
+            resolved = raw
+            if raw:
+                self.unknown[raw] += 1
+                logger.debug(f"Unknown sailmaker: {raw!r}")
+        self._cache[raw] = resolved
+        return resolved
+
+    def is_known(self, name: Any) -> bool:
+        """True when `name` resolves through the alias table or token index."""
+        self.canonical(name)
+        return str(name or '').strip() not in self.unknown
+
+    def review_list(self) -> List[Dict[str, Any]]:
+        """Unrecognized names with how often they were seen, most frequent first."""
+        return [{'Sailmaker': name, 'count': count} for name, count in self.unknown.most_common()]
+
+
+_default: Optional[SailmakerCanonicalizer] = None
+
+
+def get_canonicalizer() -> SailmakerCanonicalizer:
+    """Process-wide canonicalizer (shares its memo across callers)."""
+    global _default
+    if _default is None:
+        _default = SailmakerCanonicalizer()
+    return _default
+
+
+def canonical_sailmaker(name: Any) -> str:
+    """Canonical maker for one name using the shared canonicalizer."""
+    return get_canonicalizer().canonical(name)
@@ -0,0 +1,342 @@
+"""Shared-memory columnar fleet dataset for multi-process workers.
+
+The parent process loads sail tags and members once, dictionary-encodes the
+string columns and lays every column out in a single
+``multiprocessing.shared_memory`` block. Workers attach by name and get
+read-only numpy views over the same pages instead of a pickled DataFrame.
+
+Run ``python -m utils.shared_dataset --benchmark`` to compare pool startup and
+worker RSS against pickling the DataFrame to each worker.
+"""
+import json
+import struct
+import sys
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .logger import setup_logger
+from .path_utils import SAILS_FILE, MEMBERS_FILE
+
+logger = setup_logger(__name__)
+
+# Columns stored as datetime64[D] (NaT when unparsable) instead of strings
+DATE_COLUMNS = {'Delivery Date'}
+
+ALIGNMENT = 64
+HEADER_PREFIX = struct.Struct('<Q')
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def encode_records(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Convert a list of records into numpy columns.
+
+    String columns become int32 codes into a sorted category array; date
+    columns become datetime64[D].
+
+    Returns:
+        Mapping of column name to {'values': ndarray, 'categories': list or None}
+    """
+    columns: Dict[str, Dict[str, Any]] = {}
+    names = list(records[0].keys()) if records else []
+
+    for name in names:
+        raw = [str(r.get(name, '') or '') for r in records]
+        if name in DATE_COLUMNS:
+            columns[name] = {'values': _parse_dates(raw), 'categories': None}
+        else:
+            categories, codes = np.unique(np.array(raw, dtype=object), return_inverse=True)
+            columns[name] = {
+                'values': codes.astype(np.int32),
+                'categories': [str(c) for c in categories],
+            }
+    return columns
+
+
+def _parse_dates(values: List[str]) -> np.ndarray:
+    """Parse ISO dates to datetime64[D], mapping blank or bad values to NaT."""
+    try:
+        return np.array([v if v else 'NaT' for v in values], dtype='datetime64[D]')
+    except ValueError:
+        out = np.empty(len(values), dtype='datetime64[D]')
+        for i, v in enumerate(values):
+            try:
+                out[i] = np.datetime64(v, 'D') if v else np.datetime64('NaT')
+            except ValueError:
+                out[i] = np.datetime64('NaT')
+        return out
+
+
+class SharedFleetDataset:
+    """Columnar tables living in one named shared-memory block."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, layout: Dict[str, Any], owner: bool):
+        self._shm = shm
+        self._layout = layout
+        self._owner = owner
+        self._views: Dict[tuple, np.ndarray] = {}
+
+    @property
+    def name(self) -> str:
+        """Shared-memory block name; pass this to workers."""
+        return self._shm.name
+
+    @classmethod
+    def create(cls, tables: Dict[str, List[Dict[str, Any]]],
+               name: Optional[str] = None) -> 'SharedFleetDataset':
+        """
+        Encode tables and copy them into a new shared-memory block.
+
+        Args:
+            tables: Mapping of table name to list of records
+            name: Optional block name (default: generated)
+        """
+        encoded = {table: encode_records(records) for table, records in tables.items()}
+
+        # Column offsets are relative to the start of the data section
+        layout: Dict[str, Any] = {'tables': {}}
+        offset = 0
+        for table, columns in encoded.items():
+            table_layout = {'rows': len(tables[table]), 'columns': {}}
+            for col, info in columns.items():
+                values = info['values']
+                offset = _align(offset)
+                table_layout['columns'][col] = {
+                    'dtype': values.dtype.str,
+                    'offset': offset,
+                    'categories': info['categories'],
+                }
+                offset += values.nbytes
+            layout['tables'][table] = table_layout
+
+        header = json.dumps(layout).encode('utf-8')
+        data_start = _align(HEADER_PREFIX.size + len(header))
+        layout['data_start'] = data_start
+
+        shm = shared_memory.SharedMemory(name=name, create=True, size=max(data_start + offset, 1))
+        HEADER_PREFIX.pack_into(shm.buf, 0, len(header))
+        shm.buf[HEADER_PREFIX.size:HEADER_PREFIX.size + len(header)] = header
+
+        for table, columns in encoded.items():
+            for col, info in columns.items():
+                spec = layout['tables'][table]['columns'][col]
+                values = info['values']
+                target = np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf,
+                                    offset=data_start + spec['offset'])
+                target[:] = values
+
+        logger.info(f"Created shared dataset {shm.name} ({shm.size / 1024:.0f} KiB, "
+                    f"tables: {', '.join(f'{t}={len(r)}' for t, r in tables.items())})")
+        return cls(shm, layout, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedFleetDataset':
+        """Attach to an existing block by name without copying the data."""
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python < 3.13 registers attached blocks with the resource tracker,
+            # which would unlink them when the worker exits; skip registration
+            from multiprocessing import resource_tracker
+            register = resource_tracker.register
+            resource_tracker.register = lambda *args, **kwargs: None
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+            finally:
+                resource_tracker.register = register
+
+        (header_len,) = HEADER_PREFIX.unpack_from(shm.buf, 0)
+        header = bytes(shm.buf[HEADER_PREFIX.size:HEADER_PREFIX.size + header_len])
+        layout = json.loads(header)
+        layout['data_start'] = _align(HEADER_PREFIX.size + header_len)
+        return cls(shm, layout, owner=False)
+
+    def tables(self) -> List[str]:
+        return list(self._layout['tables'])
+
+    def columns(self, table: str) -> List[str]:
+        return list(self._layout['tables'][table]['columns'])
+
+    def rows(self, table: str) -> int:
+        return self._layout['tables'][table]['rows']
+
+    def column(self, table: str, col: str) -> np.ndarray:
+        """Read-only view of a column (codes for string columns)."""
+        key = (table, col)
+        if key not in self._views:
+            spec = self._layout['tables'][table]['columns'][col]
+            view = np.ndarray((self.rows(table),), dtype=np.dtype(spec['dtype']),
+                              buffer=self._shm.buf,
+                              offset=self._layout['data_start'] + spec['offset'])
+            view.flags.writeable = False
+            self._views[key] = view
+        return self._views[key]
+
+    def categories(self, table: str, col: str) -> Optional[np.ndarray]:
+        """Dictionary for a string column, or None for non-encoded columns."""
+        cats = self._layout['tables'][table]['columns'][col]['categories']
+        return None if cats is None else np.array(cats, dtype=object)
+
+    def code_for(self, table: str, col: str, value: str) -> int:
+        """Return the dictionary code for a value, or -1 if absent."""
+        cats = self._layout['tables'][table]['columns'][col]['categories'] or []
+        idx = int(np.searchsorted(np.array(cats, dtype=object), value))
+        return idx if idx < len(cats) and cats[idx] == value else -1
+
+    def rows_where(self, table: str, col: str, value: str) -> np.ndarray:
+        """Row indices whose encoded column equals value (empty if absent)."""
+        code = self.code_for(table, col, value)
+        if code < 0:
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero(self.column(table, col) == code)
+
+    def decode(self, table: str, col: str) -> np.ndarray:
+        """Materialize a column as values (strings for encoded columns)."""
+        values = self.column(table, col)
+        cats = self.categories(table, col)
+        return values if cats is None else cats[values]
+
+    def to_frame(self, table: str):
+        """Build a pandas DataFrame with categorical string columns."""
+        import pandas as pd
+
+        data = {}
+        for col in self.columns(table):
+            cats = self.categories(table, col)
+            values = self.column(table, col)
+            data[col] = values if cats is None else pd.Categorical.from_codes(values, cats)
+        return pd.DataFrame(data)
+
+    def close(self) -> None:
+        """Release this process's mapping (views become invalid)."""
+        self._views.clear()
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Destroy the block; only the creating process should call this."""
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        self.unlink()
+
+
+def load_shared_fleet_dataset(sails_file: Path = SAILS_FILE,
+                              members_file: Path = MEMBERS_FILE,
+                              name: Optional[str] = None) -> SharedFleetDataset:
+    """Load sail tags and members from disk into a new shared dataset."""
+    from .data_loader import load_json
+
+    return SharedFleetDataset.create({
+        'sail_tags': load_json(sails_file),
+        'members': load_json(members_file),
+    }, name=name)
+
+
+# --- Benchmark -------------------------------------------------------------
+
+_worker_state: Dict[str, Any] = {}
+
+
+def _rss_kib() -> int:
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _init_pickled(arrays: Dict[str, np.ndarray]) -> None:
+    _worker_state['arrays'] = arrays
+
+
+def _init_shared(name: str) -> None:
+    dataset = SharedFleetDataset.attach(name)
+    _worker_state['dataset'] = dataset
+    # Views over the shared pages; nothing is copied into the worker
+    _worker_state['arrays'] = {
+        'hull': dataset.column('sail_tags', 'Hull'),
+        'delivered': dataset.column('sail_tags', 'Delivery Date'),
+    }
+
+
+def _task(_):
+    # Same numpy work in both modes: tags per hull and per delivery year
+    arrays = _worker_state['arrays']
+    per_hull = np.bincount(arrays['hull'])
+    delivered = arrays['delivered']
+    years = delivered[~np.isnat(delivered)].astype('datetime64[Y]').astype(np.int64)
+    per_year = np.bincount(years - years.min()) if len(years) else per_hull[:0]
+    return int(np.count_nonzero(per_hull)), int(np.count_nonzero(per_year)), _rss_kib()
+
+
+def run_benchmark(workers: int = 4) -> Dict[str, Dict[str, float]]:
+    """
+    Time pool startup + first task and record worker RSS for both approaches.
+
+    Both pools run the same numpy aggregation over the hull codes and delivery
+    dates; the pickle pool receives private copies of the arrays, the shared
+    pool reads views over the shared block.
+    """
+    import time
+    from multiprocessing import get_context
+
+    ctx = get_context('spawn')
+    results = {}
+
+    with load_shared_fleet_dataset() as dataset:
+        arrays = {
+            'hull': dataset.column('sail_tags', 'Hull').copy(),
+            'delivered': dataset.column('sail_tags', 'Delivery Date').copy(),
+        }
+        for mode, initializer, initargs in (('pickle', _init_pickled, (arrays,)),
+                                            ('shared_memory', _init_shared, (dataset.name,))):
+            started = time.perf_counter()
+            with ctx.Pool(workers, initializer=initializer, initargs=initargs) as pool:
+                stats = pool.map(_task, range(workers))
+            results[mode] = {
+                'startup_s': time.perf_counter() - started,
+                'worker_rss_kib': sum(r for _, _, r in stats) / len(stats),
+                'hulls': stats[0][0],
+                'years': stats[0][1],
+            }
+
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Shared-memory fleet dataset")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="Compare pool startup and worker RSS against pickling")
+    parser.add_argument('--workers', type=int, default=4, help="Pool size (default: 4)")
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        with load_shared_fleet_dataset() as ds:
+            for table in ds.tables():
+                print(f"{table}: {ds.rows(table)} rows, columns: {', '.join(ds.columns(table))}")
+        sys.exit(0)
+
+    results = run_benchmark(args.workers)
+    print(f"\n{'Mode':<15} | {'Startup (s)':>12} | {'Worker RSS (MiB)':>17}")
+    print("-" * 50)
+    for mode, r in results.items():
+        print(f"{mode:<15} | {r['startup_s']:>12.3f} | {r['worker_rss_kib'] / 1024:>17.1f}")
+    print(f"\n{results['shared_memory']['hulls']} hulls, "
+          f"{results['shared_memory']['years']} delivery years")
@@ -2,14 +2,20 @@
 """
 Convert detailed fleet dues format to simplified format.
 This script converts the year-specific dues format to a simple Paid/Not Paid format
-that is easier to maintain and reset each season.
+that is easier to maintain and reset each season. It runs the schema steps of
+processors/migrate_boats.py, so the schema version is stamped in the boats
+schema file as well.
 """
 
-import json
 import sys
 from pathlib import Path
 
-def convert_to_simplified_format(input_file: str, output_file: str = None):
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.boats_migrations import migrate_boats_file, stamp_file_for
+
+def convert_to_simplified_format(input_file: str, from_season: int = None):
     """
     Convert detailed dues format to simplified format.
     
@@ -23,34 +29,22 @@ def convert_to_simplified_format(input_file: str, output_file: str = None):
     Simplified format:
         "Fleet Dues": "Paid"/"Not Paid"
         "Class Dues": "Paid"/"Not Paid"
+
+    Args:
+        input_file: Path to the boats file (converted in place)
+        from_season: Season the file holds, recorded in the stamp when the
+            file has none yet
     """
-    
-    # Read the input file
-    with open(input_file, 'r') as f:
-        data = json.load(f)
-    
-    # Convert each boat entry
-    simplified_data = []
-    for boat in data:
-        simplified_boat = {
-            "Hull Number": boat.get("Hull Number", ""),
-            "Boat Name": boat.get("Boat Name", ""),
-            "Yacht Club": boat.get("Yacht Club", ""),
-            "Fleet Dues": "Paid" if boat.get("Fleet Dues 2025") == "Paid" else "Not Paid",
-            "Class Dues": "Paid" if boat.get("Class Dues 2025") == "Paid" else "Not Paid"
-        }
-        simplified_data.append(simplified_boat)
-    
-    # Determine output file
-    if output_file is None:
-        output_file = input_file
-    
-    # Write the simplified data
-    with open(output_file, 'w') as f:
-        json.dump(simplified_data, f, indent=4)
-    
-    print(f"✅ Converted {len(simplified_data)} boat entries to simplified format")
-    print(f"📁 Output written to: {output_file}")
+    stamp_file = stamp_file_for(Path(input_file))
+    result = migrate_boats_file(Path(input_file), stamp_file, from_season=from_season)
+
+    from utils.data_loader import load_json
+    simplified_data = load_json(Path(input_file))
+
+    print(f"✅ Converted {len(simplified_data)} boat entries to simplified format "
+          f"(schema v{result['from_version']} -> v{result['to_version']})")
+    print(f"📁 Output written to: {input_file}")
+    print(f"📝 Stamp: {stamp_file} (season {result['to_season'] or 'unknown'})")
     
     # Print summary statistics
     fleet_paid = sum(1 for b in simplified_data if b["Fleet Dues"] == "Paid")
@@ -59,20 +53,27 @@ def convert_to_simplified_format(input_file: str, output_file: str = None):
     print(f"\n📊 Summary:")
     print(f"   Fleet Dues Paid: {fleet_paid}/{len(simplified_data)}")
     print(f"   Class Dues Paid: {class_paid}/{len(simplified_data)}")
+    return result
 
 if __name__ == "__main__":
+    import argparse
+
     # Default paths
     project_root = Path(__file__).parent.parent.parent
-    input_file = project_root / "data" / "boats" / "boats_fleet22.json"
+    parser = argparse.ArgumentParser(description='Convert detailed dues format to simplified format')
+    parser.add_argument('input', nargs='?', type=Path,
+                        default=project_root / "data" / "boats" / "boats_fleet22.json",
+                        help='Boats file to convert in place (default: data/boats/boats_fleet22.json)')
+    parser.add_argument('--from-season', type=int,
+                        help='Season the file holds, stamped when it has no stamp yet')
+    args = parser.parse_args()
     
-    # Allow command-line override
-    if len(sys.argv) > 1:
-        input_file = Path(sys.argv[1])
-    
-    output_file = sys.argv[2] if len(sys.argv) > 2 else None
-    
-    if not input_file.exists():
-        print(f"❌ Error: Input file not found: {input_file}")
+    if not args.input.exists():
+        print(f"❌ Error: Input file not found: {args.input}")
         sys.exit(1)
     
-    convert_to_simplified_format(str(input_file), output_file)
+    try:
+        convert_to_simplified_format(str(args.input), args.from_season)
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
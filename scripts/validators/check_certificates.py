@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Sail certificate validator for Fleet22_us repository
+Decodes every certificate number (YYMMSSSL: issue year, month, sequence,
+sailmaker code) and flags records whose certificate disagrees with their
+Delivery Date or Sailmaker.
+"""
+import sys
+import argparse
+from pathlib import Path
+
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.logger import setup_logger
+from utils.data_loader import load_json
+from utils.path_utils import PROJECT_ROOT, SAILS_FILE
+from utils.certificates import (
+    decode_certificates,
+    cross_check,
+    EARLY_DELIVERY_MONTHS,
+    LATE_DELIVERY_MONTHS,
+)
+
+# Setup logging
+logger = setup_logger('certificates', PROJECT_ROOT / 'logs' / 'scraping.log')
+
+REPORT_COLUMNS = ['Hull', 'Certificate No.', 'Sailmaker', 'Delivery Date', 'issue_year', 'issue_month',
+                  'maker', 'months_to_delivery', 'issue']
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Decode sail certificate numbers and flag inconsistent sail tags"
+    )
+    parser.add_argument('input_file', type=Path, nargs='?', default=SAILS_FILE,
+                        help=f"Path to sail_tags.json (default: {SAILS_FILE})")
+    parser.add_argument('--output', type=Path, help="Optional CSV file to write flagged records to")
+    parser.add_argument('--decoded', type=Path, help="Optional CSV of every record with decoded fields")
+    parser.add_argument('--hull', help="Only report this hull")
+    parser.add_argument('--early-months', type=int, default=EARLY_DELIVERY_MONTHS,
+                        help=f"Allowed delivery months before issue (default: {EARLY_DELIVERY_MONTHS})")
+    parser.add_argument('--late-months', type=int, default=LATE_DELIVERY_MONTHS,
+                        help=f"Allowed delivery months after issue (default: {LATE_DELIVERY_MONTHS})")
+    args = parser.parse_args()
+
+    try:
+        df = pd.DataFrame(load_json(args.input_file))
+        if args.hull:
+            df = df[df['Hull'] == str(args.hull)]
+        decoded = decode_certificates(df['Certificate No.'])
+        flagged = cross_check(df, decoded, args.early_months, args.late_months)
+        report = df.join(flagged, how='inner')[REPORT_COLUMNS]
+
+        print(f"📄 Decoded {int(decoded['valid'].sum())} of {len(df)} certificates")
+        if report.empty:
+            print("✅ All certificates agree with delivery date and sailmaker")
+        else:
+            print(f"⚠️  {len(report)} flagged records:")
+            for issue, count in report['issue'].value_counts().items():
+                print(f"   {issue}: {count}")
+            print()
+            print(report.head(20).to_string(index=False))
+            logger.warning(f"Flagged {len(report)} certificate inconsistencies")
+
+        if args.output:
+            report.to_csv(args.output, index_label='Record')
+            print(f"\n📁 Flagged records written to: {args.output}")
+        if args.decoded:
+            df.join(decoded).to_csv(args.decoded, index_label='Record')
+            print(f"📁 Decoded records written to: {args.decoded}")
+        return 0
+
+    except Exception as e:
+        logger.error(f"Error checking certificates: {e}")
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Cross-file integrity checker for Fleet22_us repository
+Checks that the boats file, J/105 membership, sail tags, the season's
+payment tracker and the active roster agree with each other. Each dataset
+is indexed by hull once; every check is then a dictionary join, so the
+whole run is linear in the size of the data. Findings are written as JSON
+and the exit status can fail a pipeline.
+"""
+import sys
+import csv
+import re
+import argparse
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.logger import setup_logger
+from utils.data_loader import load_json, save_json
+from utils.path_utils import (
+    PROJECT_ROOT,
+    BOATS_FILE,
+    MEMBERS_FILE,
+    SAILS_FILE,
+    PAYMENTS_DATA,
+    ACTIVE_ROSTER_FILE,
+    INTEGRITY_REPORT_FILE,
+)
+
+# Setup logging
+logger = setup_logger('integrity', PROJECT_ROOT / 'logs' / 'scraping.log')
+
+FLEET = '22'
+CURRENT_YEAR = datetime.now().year
+SEVERITIES = ('error', 'warning')
+
+
+def _name_key(name):
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return ' '.join(re.sub(r'[^a-z0-9 ]+', ' ', str(name or '').lower()).split())
+
+
+def _hull_sort_key(hull):
+    return (0, int(hull)) if str(hull).isdigit() else (1, str(hull))
+
+
+def build_indexes(boats, members, sail_tags, tracker_rows=None, roster=None, recent_years=2):
+    """
+    Index every dataset by hull in one pass each.
+
+    Args:
+        recent_years: Sail tags delivered within this many seasons are
+            expected to be bought by a current owner
+
+    Returns:
+        Dict of hull-keyed lookups used by the checks
+    """
+    members_by_hull = defaultdict(list)
+    member_names = defaultdict(set)
+    for row in members:
+        hull = str(row.get('Hull', ''))
+        members_by_hull[hull].append(row)
+        member_names[hull].add(_name_key(row.get('Owners/Helmsmen')))
+
+    cutoff = str(CURRENT_YEAR - recent_years + 1)
+    recent_tags = defaultdict(list)
+    for tag in sail_tags:
+        if str(tag.get('Delivery Date', '')) >= cutoff:
+            recent_tags[str(tag.get('Hull', ''))].append(tag)
+
+    roster_boats = (roster or {}).get('boats', [])
+    return {
+        'boats': {str(b.get('Hull Number', '')): b for b in boats},
+        'members': dict(members_by_hull),
+        'member_names': dict(member_names),
+        'recent_tags': dict(recent_tags),
+        'tracker': {str(r.get('Hull', '')): r for r in tracker_rows} if tracker_rows is not None else None,
+        'roster': {str(b.get('hull_number', '')): b for b in roster_boats} if roster is not None else None,
+        'roster_fleet': (roster or {}).get('fleet'),
+    }
+
+
+def _finding(check, severity, hull, message, **details):
+    return {'check': check, 'severity': severity, 'hull': hull, 'message': message,
+            **({'details': details} if details else {})}
+
+
+def check_boats_in_membership(ix):
+    """Every fleet boat is in the membership data with Fleet 22."""
+    for hull, boat in ix['boats'].items():
+        rows = ix['members'].get(hull)
+        if not rows:
+            yield _finding('boats_in_membership', 'error', hull, "hull not in j105_members_status.json")
+            continue
+        fleets = sorted({str(r.get('Fleet', '')) for r in rows})
+        if FLEET not in fleets:
+            yield _finding('boats_in_membership', 'error', hull,
+                           f"membership lists hull in fleet {', '.join(fleets)}, not {FLEET}")
+        names = {_name_key(r.get('Boat Name')) for r in rows} - {''}
+        if names and _name_key(boat.get('Boat Name')) not in names:
+            yield _finding('boats_in_membership', 'warning', hull, "boat name differs from membership",
+                           boats=boat.get('Boat Name'), membership=sorted({r.get('Boat Name') for r in rows}))
+
+
+def check_membership_in_boats(ix):
+    """Every fleet 22 hull in the membership data is in the boats file."""
+    for hull, rows in ix['members'].items():
+        if hull not in ix['boats'] and any(str(r.get('Fleet', '')) == FLEET for r in rows):
+            yield _finding('membership_in_boats', 'warning', hull,
+                           f"fleet {FLEET} hull in membership data but not in boats_fleet22.json",
+                           boat_name=rows[0].get('Boat Name'))
+
+
+def check_sail_purchasers(ix):
+    """Recent sail tags for fleet boats were bought by a current owner."""
+    for hull in ix['boats']:
+        owners = ix['member_names'].get(hull, set())
+        for tag in ix['recent_tags'].get(hull, []):
+            if _name_key(tag.get('Purchaser')) not in owners:
+                yield _finding('sail_purchasers', 'warning', hull,
+                               "recent sail tag purchaser is not a current owner",
+                               certificate=tag.get('Certificate No.'), purchaser=tag.get('Purchaser'),
+                               delivered=tag.get('Delivery Date'))
+
+
+def check_tracker(ix):
+    """Payment tracker rows match the boats file one-to-one."""
+    tracker = ix['tracker']
+    if tracker is None:
+        return
+    for hull in ix['boats'].keys() - tracker.keys():
+        yield _finding('payment_tracker', 'error', hull, "boat missing from payment tracker")
+    for hull in tracker.keys() - ix['boats'].keys():
+        yield _finding('payment_tracker', 'error', hull, "tracker row for hull not in boats_fleet22.json")
+    for hull in tracker.keys() & ix['boats'].keys():
+        row, boat = tracker[hull], ix['boats'][hull]
+        if _name_key(row.get('Boat Name')) != _name_key(boat.get('Boat Name')):
+            yield _finding('payment_tracker', 'warning', hull, "boat name differs from boats file",
+                           tracker=row.get('Boat Name'), boats=boat.get('Boat Name'))
+        paid_column = next((k for k in row if k and k.startswith('Paid ')), None)
+        tracker_paid = paid_column and str(row.get(paid_column, '')).upper() == 'YES'
+        if paid_column and tracker_paid != (boat.get('Fleet Dues') == 'Paid'):
+            yield _finding('payment_tracker', 'warning', hull, "Fleet Dues status differs from tracker",
+                           tracker=row.get(paid_column), boats=boat.get('Fleet Dues'))
+
+
+def check_roster(ix):
+    """Active roster boats are fleet boats and list current members."""
+    roster = ix['roster']
+    if roster is None:
+        return
+    if ix['roster_fleet'] not in (None, FLEET):
+        yield _finding('active_roster', 'error', None, f"roster is for fleet {ix['roster_fleet']}")
+    for hull, entry in roster.items():
+        boat = ix['boats'].get(hull)
+        if boat is None:
+            yield _finding('active_roster', 'error', hull, "roster boat not in boats_fleet22.json")
+            continue
+        if _name_key(entry.get('boat_name')) != _name_key(boat.get('Boat Name')):
+            yield _finding('active_roster', 'warning', hull, "boat name differs from boats file",
+                           roster=entry.get('boat_name'), boats=boat.get('Boat Name'))
+        members = ix['member_names'].get(hull, set())
+        for group in ('owners', 'co_owners', 'affiliate_members'):
+            for person in entry.get(group, []):
+                if _name_key(person.get('name')) not in members:
+                    yield _finding('active_roster', 'warning', hull,
+                                   f"roster {group.replace('_', ' ').rstrip('s')} not in membership data for hull",
+                                   name=person.get('name'))
+
+
+CHECKS = (
+    check_boats_in_membership,
+    check_membership_in_boats,
+    check_sail_purchasers,
+    check_tracker,
+    check_roster,
+)
+
+
+def run_checks(indexes, checks=CHECKS):
+    """Run all checks; findings sorted by severity, check and hull."""
+    findings = [finding for check in checks for finding in check(indexes)]
+    order = {name: i for i, name in enumerate(SEVERITIES)}
+    findings.sort(key=lambda f: (order[f['severity']], f['check'], _hull_sort_key(f['hull'] or '')))
+    return findings
+
+
+def load_tracker_rows(tracker_file):
+    if not tracker_file or not Path(tracker_file).exists():
+        return None
+    with open(tracker_file, 'r', newline='') as csvfile:
+        return list(csv.DictReader(csvfile))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check Fleet 22 data files against each other")
+    parser.add_argument('--season', type=int, default=CURRENT_YEAR,
+                        help=f"Payment tracker season (default: {CURRENT_YEAR})")
+    parser.add_argument('--tracker', type=Path,
+                        help="Payment tracker CSV (default: data/payments/payment_tracker_<season>.csv)")
+    parser.add_argument('--recent-years', type=int, default=2,
+                        help="Seasons of sail tags expected to match current owners (default: 2)")
+    parser.add_argument('--output', type=Path, default=INTEGRITY_REPORT_FILE, help="Findings JSON file")
+    parser.add_argument('--fail-on', choices=('error', 'warning', 'never'), default='error',
+                        help="Exit non-zero when findings of this severity exist (default: error)")
+    args = parser.parse_args()
+
+    try:
+        tracker_file = args.tracker or PAYMENTS_DATA / f"payment_tracker_{args.season}.csv"
+        tracker_rows = load_tracker_rows(tracker_file)
+        roster = load_json(ACTIVE_ROSTER_FILE) if ACTIVE_ROSTER_FILE.exists() else None
+
+        indexes = build_indexes(load_json(BOATS_FILE), load_json(MEMBERS_FILE), load_json(SAILS_FILE),
+                                tracker_rows, roster, args.recent_years)
+        findings = run_checks(indexes)
+        counts = {s: sum(1 for f in findings if f['severity'] == s) for s in SEVERITIES}
+
+        save_json({
+            'generated': datetime.now().isoformat(timespec='seconds'),
+            'sources': {
+                'boats': str(BOATS_FILE.relative_to(PROJECT_ROOT)),
+                'members': str(MEMBERS_FILE.relative_to(PROJECT_ROOT)),
+                'sail_tags': str(SAILS_FILE.relative_to(PROJECT_ROOT)),
+                'tracker': str(tracker_file) if tracker_rows is not None else None,
+                'roster': str(ACTIVE_ROSTER_FILE.relative_to(PROJECT_ROOT)) if roster is not None else None,
+            },
+            'summary': counts,
+            'findings': findings,
+        }, args.output, create_backup=False)
+
+        if tracker_rows is None:
+            print(f"💡 No payment tracker at {tracker_file}; tracker checks skipped")
+        for finding in findings:
+            icon = '❌' if finding['severity'] == 'error' else '⚠️ '
+            print(f"   {icon} [{finding['check']}] hull {finding['hull']}: {finding['message']}")
+        print(f"{'❌' if counts['error'] else '✅'} {counts['error']} errors, {counts['warning']} warnings")
+        print(f"📄 Findings written to: {args.output}")
+
+        failing = {'error': ('error',), 'warning': SEVERITIES, 'never': ()}[args.fail_on]
+        return 1 if any(counts[s] for s in failing) else 0
+
+    except Exception as e:
+        logger.error(f"Error checking data integrity: {e}")
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
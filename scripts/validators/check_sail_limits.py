@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 """
 Sail purchase limits validator for Fleet22_us repository
-Analyzes sail purchase records against J/105 class rules.
+Analyzes sail purchase records against J/105 class rules declared in
+validators/sail_rules.yaml. The rules are evaluated for all hulls at once by
+the sail_rules engine; --incremental re-checks only hulls with changed tags.
 """
 import argparse
 import json
@@ -15,14 +17,12 @@ import pandas as pd
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from utils.logger import setup_logger
-from utils.path_utils import PROJECT_ROOT, SAILS_FILE
+from utils.path_utils import PROJECT_ROOT, SAILS_FILE, SAIL_LIMITS_STATE
+from validators.sail_rules import SAIL_RULES_FILE, load_rules, check_limits, check_limits_incremental
 
 # Setup logging
 logger = setup_logger('sail_limits', PROJECT_ROOT / 'logs' / 'scraping.log')
 
-# Keywords indicating a sail replacement/defect exempt from limits
-REPLACEMENT_KEYWORDS = {"replacement", "replaced", "destroyed", "defective"}
-
 def load_data(file_path):
     """Load JSON sail tags into a DataFrame and parse dates."""
     try:
@@ -41,54 +41,9 @@ def load_data(file_path):
         logger.error(f"Error loading data from {file_path}: {e}")
         raise
 
-def is_replacement(note):
-    """Determine if a sail entry is a replacement/exempt based on notes."""
-    if not isinstance(note, str):
-        return False
-    note_lower = note.lower()
-    return any(kw in note_lower for kw in REPLACEMENT_KEYWORDS)
-
-def analyze_limits(df):
+def analyze_limits(df, config=None):
     """Analyze sail purchases against class rules and return violations."""
-    # Flag replacements
-    df['IsReplacement'] = df['Notes'].apply(is_replacement)
-    # Filter out replacements
-    valid = df[~df['IsReplacement']].copy()
-
-    violations = []
-
-    for hull, group in valid.groupby('Hull'):
-        # Determine first use year for extra sail allowance
-        first_year = group['Year'].min()
-        # Count sails per year
-        yearly = group.groupby('Year').size().to_dict()
-
-        # Check per-year violations
-        for year, count in yearly.items():
-            allowed = 2 + (1 if year == first_year else 0)
-            if count > allowed:
-                violations.append({
-                    'Hull': hull,
-                    'Year': year,
-                    'Count': count,
-                    'Allowed': allowed,
-                    'Violation': 'Yearly limit exceeded'
-                })
-
-        # Check two-year rolling-window violations (allowed = 3)
-        years = sorted(yearly)
-        for y in years:
-            count_two_year = yearly.get(y, 0) + yearly.get(y + 1, 0)
-            if count_two_year > 3:
-                violations.append({
-                    'Hull': hull,
-                    'Year': f'{y}-{y+1}',
-                    'Count': count_two_year,
-                    'Allowed': 3,
-                    'Violation': 'Two-year limit exceeded'
-                })
-
-    return pd.DataFrame(violations)
+    return check_limits(df, config or load_rules())
 
 def main():
     parser = argparse.ArgumentParser(
@@ -107,13 +62,35 @@ def main():
         default=None,
         help="Optional CSV file to write violations to"
     )
+    parser.add_argument(
+        '--rules',
+        type=Path,
+        default=SAIL_RULES_FILE,
+        help="Rule config YAML (default: validators/sail_rules.yaml)"
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help="Only re-check hulls whose sail tags changed since the last incremental run"
+    )
+    parser.add_argument(
+        '--state',
+        type=Path,
+        default=SAIL_LIMITS_STATE,
+        help=f"Incremental state file (default: {SAIL_LIMITS_STATE})"
+    )
     args = parser.parse_args()
 
     logger.info(f"Starting sail limits analysis...")
     
     try:
+        config = load_rules(args.rules)
         df = load_data(args.input_file)
-        violations = analyze_limits(df)
+        if args.incremental:
+            violations, rechecked = check_limits_incremental(df, config, args.state)
+            print(f"🔄 Re-checked {len(rechecked)} hulls with new or changed sail tags")
+        else:
+            violations = analyze_limits(df, config)
 
         if violations.empty:
             print("✅ No violations found (excluding Hull 0).")
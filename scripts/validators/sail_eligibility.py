@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Sail purchase eligibility index for Fleet22_us repository
+Precomputes, for every hull and year, how many more sails (any type, and per
+sail type) can be delivered without breaking a rule in sail_rules.yaml, so
+"can hull 144 still buy a jib this year?" is an array lookup instead of a
+full check_sail_limits run. The index is saved to sail_eligibility.npz and
+refreshed incrementally: only hulls whose sail tags changed are recomputed.
+"""
+import sys
+import json
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.logger import setup_logger
+from utils.path_utils import PROJECT_ROOT, SAILS_FILE, SAIL_ELIGIBILITY_FILE
+from processors.build_sail_cube import latest_fleet_by_hull
+from validators.check_sail_limits import load_data
+from validators.sail_rules import (
+    SAIL_RULES_FILE,
+    load_rules,
+    rules_digest,
+    flag_replacements,
+    hull_fingerprints,
+    window_totals,
+    rule_counts,
+)
+
+# Setup logging
+logger = setup_logger('sail_eligibility', PROJECT_ROOT / 'logs' / 'scraping.log')
+
+ANY_TYPE = 'any'
+NO_LIMIT = np.iinfo(np.int16).max
+
+
+def _hull_sort_key(hull):
+    return (0, int(hull)) if str(hull).isdigit() else (1, str(hull))
+
+
+def compute_remaining(counts, types, columns, rules, first_year):
+    """
+    Remaining allowance for hulls x years x columns.
+
+    For a purchase in year Y, every window containing Y is checked: the
+    allowance is the smallest (allowed - sails already counted) over those
+    windows and over the rules that apply to the column's sail type. The
+    first-year bonus applies when the window holds the hull's first counted
+    year, which is Y itself for a hull with no earlier sails.
+
+    Args:
+        counts: Counted (non-replacement) sails, hulls x years x sail types
+        types: Sail type labels of the last axis
+        columns: ANY_TYPE followed by sail types to answer for
+        rules: Loaded rules
+        first_year: Year index of each hull's first counted sail (large if none)
+    """
+    n_hulls, n_years = counts.shape[:2]
+    year_index = np.arange(n_years)
+    # A purchase in Y before the first recorded sail makes Y the first year
+    first_eff = np.minimum(first_year[:, None], year_index[None, :])
+
+    per_rule = []
+    for rule in rules:
+        totals = window_totals(rule_counts(counts, types, rule), rule['window'])
+        slack = np.full((n_hulls, n_years), NO_LIMIT, dtype=np.int64)
+        for k in range(rule['window']):
+            # Window starting k years before Y (starts before the axis add nothing)
+            start = year_index - k
+            valid = start >= 0
+            window_total = np.where(valid, totals[:, np.clip(start, 0, None)], 0)
+            bonus = rule['first_year_bonus'] * (first_eff >= start[None, :])
+            candidate = np.where(valid, rule['limit'] + bonus - window_total, NO_LIMIT)
+            slack = np.minimum(slack, candidate)
+        per_rule.append(slack)
+
+    remaining = np.full((n_hulls, n_years, len(columns)), NO_LIMIT, dtype=np.int64)
+    for c, column in enumerate(columns):
+        for rule, slack in zip(rules, per_rule):
+            if not rule['sail_types'] or (column != ANY_TYPE and column in rule['sail_types']):
+                remaining[:, :, c] = np.minimum(remaining[:, :, c], slack)
+    return np.clip(remaining, 0, NO_LIMIT).astype(np.int16)
+
+
+class SailEligibilityIndex:
+    """Per-hull remaining sail allowance by year and sail type."""
+
+    def __init__(self, hulls, years, types, counts, replacements, remaining, hull_fleet, meta):
+        self.hulls = list(hulls)
+        self.years = np.asarray(years, dtype=int)
+        self.types = list(types)
+        self.columns = [ANY_TYPE] + [t for t in self.types if t]
+        self.counts = counts
+        self.replacements = replacements
+        self.remaining = remaining
+        self.hull_fleet = list(hull_fleet)
+        self.meta = meta
+        self._hull_pos = {h: i for i, h in enumerate(self.hulls)}
+        self._column_pos = {c: i for i, c in enumerate(self.columns)}
+
+    @staticmethod
+    def _year_axis(df, rules, today):
+        """Data years through next season plus the longest window."""
+        longest = max((rule['window'] for rule in rules), default=1)
+        first = int(df['Year'].min()) if len(df) else today
+        last = max(int(df['Year'].max()) if len(df) else today, today + 1) + longest
+        return np.arange(first, last + 1)
+
+    @staticmethod
+    def _hull_rows(df, hulls, years, types, keywords):
+        """Counted and replacement sails per hull/year(/type) on fixed axes."""
+        hull_pos = {h: i for i, h in enumerate(hulls)}
+        type_pos = {t: i for i, t in enumerate(types)}
+        counts = np.zeros((len(hulls), len(years), len(types)), dtype=np.int16)
+        replacements = np.zeros((len(hulls), len(years)), dtype=np.int16)
+        if len(df):
+            h = df['Hull'].map(hull_pos).to_numpy()
+            y = df['Year'].to_numpy(dtype=int) - int(years[0])
+            t = df['Sail Type'].fillna('').map(type_pos).to_numpy()
+            exempt = flag_replacements(df['Notes'], keywords).to_numpy()
+            np.add.at(counts, (h[~exempt], y[~exempt], t[~exempt]), 1)
+            np.add.at(replacements, (h[exempt], y[exempt]), 1)
+        return counts, replacements
+
+    @staticmethod
+    def _first_years(counts):
+        counted = counts.sum(axis=2) > 0
+        return np.where(counted.any(axis=1), counted.argmax(axis=1), np.iinfo(np.int32).max)
+
+    @classmethod
+    def build(cls, df, config, today=None):
+        """
+        Build the index from sail tags (as returned by check_sail_limits.load_data).
+        """
+        today = today or datetime.now().year
+        hulls = sorted(df['Hull'].unique(), key=_hull_sort_key)
+        years = cls._year_axis(df, config['rules'], today)
+        types = sorted(set(df['Sail Type'].fillna('')) | {
+            t for rule in config['rules'] for t in (rule['sail_types'] or [])})
+        counts, replacements = cls._hull_rows(df, hulls, years, types, config['replacement_keywords'])
+        columns = [ANY_TYPE] + [t for t in types if t]
+        remaining = compute_remaining(counts, types, columns, config['rules'], cls._first_years(counts))
+
+        fleet_by_hull = latest_fleet_by_hull(df['Hull'], df['Delivery Date'], df['Fleet'].astype(str))
+        meta = {
+            'rules': rules_digest(config),
+            'config': config,
+            'built': datetime.now().isoformat(timespec='seconds'),
+            'fingerprints': hull_fingerprints(df),
+        }
+        logger.info(f"Built sail eligibility index: {len(hulls)} hulls x {len(years)} years "
+                    f"x {len(columns)} sail type columns")
+        return cls(hulls, years, types, counts, replacements, remaining,
+                   [fleet_by_hull[h] for h in hulls], meta)
+
+    def update(self, df, config):
+        """
+        Recompute only hulls whose sail tags changed.
+
+        Returns:
+            (index, list of recomputed hulls). A new index is built instead
+            when the rules changed or new tags fall outside the year/type axes.
+        """
+        today = datetime.now().year
+        fingerprints = hull_fingerprints(df)
+        previous = self.meta.get('fingerprints', {})
+        changed = sorted((h for h, fp in fingerprints.items() if previous.get(h) != fp), key=_hull_sort_key)
+        removed = set(previous) - set(fingerprints)
+
+        subset = df[df['Hull'].isin(changed)]
+        rebuild = (
+            self.meta.get('rules') != rules_digest(config)
+            or today + 1 + max((r['window'] for r in config['rules']), default=1) > self.years[-1]
+            or (len(subset) and (subset['Year'].min() < self.years[0] or subset['Year'].max() > self.years[-1]))
+            or not set(subset['Sail Type'].fillna('')) <= set(self.types)
+        )
+        if rebuild:
+            return SailEligibilityIndex.build(df, config), sorted(fingerprints, key=_hull_sort_key)
+        if not changed and not removed:
+            return self, []
+
+        keep = [i for i, h in enumerate(self.hulls) if h not in removed]
+        hulls = [self.hulls[i] for i in keep] + [h for h in changed if h not in self._hull_pos]
+        pad = len(hulls) - len(keep)
+        counts = np.concatenate([self.counts[keep], np.zeros((pad,) + self.counts.shape[1:], self.counts.dtype)])
+        replacements = np.concatenate(
+            [self.replacements[keep], np.zeros((pad,) + self.replacements.shape[1:], self.replacements.dtype)])
+        remaining = np.concatenate(
+            [self.remaining[keep], np.zeros((pad,) + self.remaining.shape[1:], self.remaining.dtype)])
+        fleet_by_hull = dict(zip(self.hulls, self.hull_fleet))
+        fleet_by_hull.update(latest_fleet_by_hull(subset['Hull'], subset['Delivery Date'],
+                                                  subset['Fleet'].astype(str)))
+
+        if changed:
+            rows = [hulls.index(h) for h in changed]
+            new_counts, new_replacements = self._hull_rows(
+                subset, changed, self.years, self.types, config['replacement_keywords'])
+            counts[rows] = new_counts
+            replacements[rows] = new_replacements
+            remaining[rows] = compute_remaining(new_counts, self.types, self.columns, config['rules'],
+                                                self._first_years(new_counts))
+
+        order = sorted(range(len(hulls)), key=lambda i: _hull_sort_key(hulls[i]))
+        hulls = [hulls[i] for i in order]
+        counts, replacements, remaining = counts[order], replacements[order], remaining[order]
+
+        meta = {**self.meta, 'fingerprints': fingerprints,
+                'updated': datetime.now().isoformat(timespec='seconds')}
+        logger.info(f"Updated sail eligibility index: {len(changed)} hulls recomputed, {len(removed)} removed")
+        index = SailEligibilityIndex(hulls, self.years, self.types, counts, replacements, remaining,
+                                     [fleet_by_hull[h] for h in hulls], meta)
+        return index, changed
+
+    def save(self, path=SAIL_ELIGIBILITY_FILE):
+        """Save as a compressed .npz archive."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            counts=self.counts,
+            replacements=self.replacements,
+            remaining=self.remaining,
+            years=self.years,
+            labels=json.dumps({'hull': self.hulls, 'sail_type': self.types, 'fleet': self.hull_fleet}),
+            meta=json.dumps(self.meta),
+        )
+        logger.info(f"Sail eligibility index saved to {path}")
+        return path
+
+    @classmethod
+    def load(cls, path=SAIL_ELIGIBILITY_FILE):
+        """Load an index written by save()."""
+        with np.load(path) as archive:
+            labels = json.loads(str(archive['labels']))
+            return cls(labels['hull'], archive['years'], labels['sail_type'], archive['counts'],
+                       archive['replacements'], archive['remaining'], labels['fleet'],
+                       json.loads(str(archive['meta'])))
+
+    def _column(self, sail_type):
+        column = sail_type or ANY_TYPE
+        if column not in self._column_pos:
+            raise ValueError(f"Unknown sail type '{sail_type}' (known: {', '.join(self.columns[1:])})")
+        return self._column_pos[column]
+
+    def _year(self, year):
+        year = int(year)
+        if not self.years[0] <= year <= self.years[-1]:
+            raise ValueError(f"Year {year} outside the index ({self.years[0]}-{self.years[-1]})")
+        return year - int(self.years[0])
+
+    def _fresh_allowance(self, column):
+        """Allowance of a hull with no sail tags (first-year bonus applies)."""
+        rules = self.meta['config']['rules']
+        allowed = [r['limit'] + r['first_year_bonus'] for r in rules
+                   if not r['sail_types'] or (column != ANY_TYPE and column in r['sail_types'])]
+        return min(allowed, default=None)
+
+    def remaining_allowance(self, hull, year, sail_type=None):
+        """
+        Sails hull can still take delivery of in `year` without a violation.
+
+        Returns:
+            int, or None when no rule limits that sail type
+        """
+        column = self._column(sail_type)
+        pos = self._hull_pos.get(str(hull))
+        if pos is None:
+            return self._fresh_allowance(self.columns[column])
+        value = int(self.remaining[pos, self._year(year), column])
+        return None if value == NO_LIMIT else value
+
+    def fleet_remaining(self, year, sail_type=None, fleet=None):
+        """{hull: remaining allowance} for every hull (optionally one fleet)."""
+        values = self.remaining[:, self._year(year), self._column(sail_type)]
+        return {
+            hull: (None if value == NO_LIMIT else int(value))
+            for hull, value, hull_fleet in zip(self.hulls, values.tolist(), self.hull_fleet)
+            if fleet is None or hull_fleet == str(fleet)
+        }
+
+    def hull_summary(self, hull, year):
+        """Counts and allowances behind a hull's eligibility in `year`."""
+        pos = self._hull_pos.get(str(hull))
+        if pos is None:
+            return None
+        y = self._year(year)
+        counted = self.counts[pos].sum(axis=1)
+        nonzero = np.nonzero(counted)[0]
+        return {
+            'hull': str(hull),
+            'fleet': self.hull_fleet[pos],
+            'year': int(year),
+            'first_year': int(self.years[nonzero[0]]) if len(nonzero) else None,
+            'counted_this_year': {t or '?': int(n) for t, n in zip(self.types, self.counts[pos, y]) if n},
+            'counted_last_year': int(counted[y - 1]) if y else 0,
+            'replacements_this_year': int(self.replacements[pos, y]),
+            'remaining': {c: self.remaining_allowance(hull, year, None if c == ANY_TYPE else c)
+                          for c in self.columns},
+        }
+
+
+def load_eligibility_index(sails_file=SAILS_FILE, index_file=SAIL_ELIGIBILITY_FILE,
+                           rules_file=SAIL_RULES_FILE, rebuild=False, save=True):
+    """
+    Load the saved index and bring it up to date with sails_file.
+
+    Returns:
+        (index, list of hulls recomputed)
+    """
+    config = load_rules(rules_file)
+    df = load_data(sails_file)
+    index_file = Path(index_file)
+    if rebuild or not index_file.exists():
+        index = SailEligibilityIndex.build(df, config)
+        changed = index.hulls
+    else:
+        index, changed = SailEligibilityIndex.load(index_file).update(df, config)
+    if save and changed:
+        index.save(index_file)
+    return index, changed
+
+
+def _format_allowance(value):
+    return 'no limit' if value is None else str(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Query remaining sail purchase allowance per hull"
+    )
+    parser.add_argument('--hull', help="Hull number to check")
+    parser.add_argument('--fleet', help="List every hull in this fleet (default: all hulls)")
+    parser.add_argument('--year', type=int, default=datetime.now().year,
+                        help="Delivery year (default: current year)")
+    parser.add_argument('--type', dest='sail_type', help="Sail type (M, J, S89, S77); default: any")
+    parser.add_argument('--input', type=Path, default=SAILS_FILE, help="Path to sail_tags.json")
+    parser.add_argument('--index', type=Path, default=SAIL_ELIGIBILITY_FILE, help="Index file")
+    parser.add_argument('--rules', type=Path, default=SAIL_RULES_FILE, help="Rule config YAML")
+    parser.add_argument('--rebuild', action='store_true', help="Rebuild the index from scratch")
+    args = parser.parse_args()
+
+    try:
+        index, changed = load_eligibility_index(args.input, args.index, args.rules, rebuild=args.rebuild)
+        if changed:
+            print(f"🔄 Index updated for {len(changed)} hulls")
+
+        if args.hull:
+            summary = index.hull_summary(args.hull, args.year)
+            if summary is None:
+                fresh = index.remaining_allowance(args.hull, args.year, args.sail_type)
+                print(f"💡 Hull {args.hull} has no sail tags; first-year allowance: {_format_allowance(fresh)}")
+                return 0
+            remaining = index.remaining_allowance(args.hull, args.year, args.sail_type)
+            label = args.sail_type or 'sail'
+            icon = '✅' if remaining is None or remaining > 0 else '❌'
+            print(f"{icon} Hull {args.hull} can take {_format_allowance(remaining)} more {label}(s) in {args.year}")
+            print(f"   Fleet {summary['fleet']}, first counted year {summary['first_year']}")
+            counted = ', '.join(f"{t}: {n}" for t, n in summary['counted_this_year'].items()) or 'none'
+            print(f"   {args.year}: {counted}; {args.year - 1}: {summary['counted_last_year']}; "
+                  f"replacements (exempt) in {args.year}: {summary['replacements_this_year']}")
+            print("   Remaining by type: " + ', '.join(
+                f"{c}: {_format_allowance(v)}" for c, v in summary['remaining'].items()))
+            return 0
+
+        allowances = index.fleet_remaining(args.year, args.sail_type, args.fleet)
+        scope = f"fleet {args.fleet}" if args.fleet else "all hulls"
+        print(f"📄 Remaining {args.sail_type or 'sail'} allowance for {args.year} ({scope}):")
+        for hull, value in allowances.items():
+            print(f"   Hull {hull:>4}: {_format_allowance(value)}")
+        exhausted = sum(1 for v in allowances.values() if v == 0)
+        print(f"💡 {len(allowances)} hulls, {exhausted} with no allowance left")
+        return 0
+
+    except Exception as e:
+        logger.error(f"Error querying sail eligibility: {e}")
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+"""
+Sail purchase rule engine for Fleet22_us repository
+Evaluates the class sail limits declared in sail_rules.yaml for every hull at
+once on a hull x year x sail type count array. Rolling windows are computed
+from cumulative sums along the year axis. Per-hull fingerprints let callers
+re-check only hulls whose sail tags changed.
+"""
+import sys
+import json
+import hashlib
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.logger import setup_logger
+from utils.data_loader import load_json, save_json
+from utils.path_utils import PROJECT_ROOT
+
+# Setup logging
+logger = setup_logger('sail_rules', PROJECT_ROOT / 'logs' / 'scraping.log')
+
+SAIL_RULES_FILE = Path(__file__).parent / 'sail_rules.yaml'
+VIOLATION_COLUMNS = ['Hull', 'Year', 'Count', 'Allowed', 'Violation']
+FINGERPRINT_COLUMNS = ['Hull', 'Certificate No.', 'Delivery Date', 'Sail Type', 'Notes']
+
+
+def load_rules(path=SAIL_RULES_FILE):
+    """
+    Load and check the rule config.
+
+    Raises:
+        ValueError: If a rule is missing its name/window/limit or has bad values
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f) or {}
+
+    rules = []
+    for i, rule in enumerate(config.get('rules') or []):
+        missing = {'name', 'window', 'limit'} - set(rule)
+        if missing:
+            raise ValueError(f"Rule {i + 1} in {path} is missing: {', '.join(sorted(missing))}")
+        if int(rule['window']) < 1 or int(rule['limit']) < 0:
+            raise ValueError(f"Rule '{rule['name']}' needs window >= 1 and limit >= 0")
+        rules.append({
+            'name': str(rule['name']),
+            'window': int(rule['window']),
+            'limit': int(rule['limit']),
+            'first_year_bonus': int(rule.get('first_year_bonus', 0)),
+            'sail_types': [str(t) for t in rule['sail_types']] if rule.get('sail_types') else None,
+        })
+
+    return {
+        'replacement_keywords': [str(k).lower() for k in config.get('replacement_keywords') or []],
+        'rules': rules,
+    }
+
+
+def rules_digest(config):
+    """Stable hash of a loaded config, used to invalidate incremental state."""
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def flag_replacements(notes, keywords):
+    """Boolean Series: Notes mention any replacement keyword (case-insensitive)."""
+    if not keywords:
+        return pd.Series(False, index=notes.index)
+    pattern = '|'.join(re.escape(k) for k in keywords)
+    return notes.fillna('').astype(str).str.contains(pattern, case=False, regex=True)
+
+
+def build_count_matrix(df):
+    """
+    Count sails per hull, year and sail type.
+
+    Args:
+        df: Sail tags with Hull, Year and Sail Type columns
+
+    Returns:
+        (counts[hull, year, sail_type], hull labels, year labels, sail type labels);
+        the year axis is contiguous from the first to the last year
+    """
+    hull_codes, hulls = pd.factorize(df['Hull'], sort=False)
+    type_codes, types = pd.factorize(df['Sail Type'].fillna(''), sort=True)
+    if len(df):
+        first_year = int(df['Year'].min())
+        years = np.arange(first_year, int(df['Year'].max()) + 1)
+    else:
+        first_year, years = 0, np.array([], dtype=int)
+    year_codes = df['Year'].to_numpy(dtype=int) - first_year
+
+    counts = np.zeros((len(hulls), len(years), len(types)), dtype=np.int32)
+    np.add.at(counts, (hull_codes, year_codes, type_codes), 1)
+    return counts, list(hulls), years, list(types)
+
+
+def window_totals(per_year, window):
+    """totals[h, y] = sails in years y .. y + window - 1, from a cumulative sum."""
+    cumulative = np.concatenate(
+        [np.zeros((per_year.shape[0], 1), dtype=np.int64), per_year.cumsum(axis=1)], axis=1)
+    start = np.arange(per_year.shape[1])
+    end = np.minimum(start + window, per_year.shape[1])
+    return cumulative[:, end] - cumulative[:, start]
+
+
+def rule_counts(counts, types, rule):
+    """Per hull and year counts of the sail types a rule applies to."""
+    if not rule['sail_types']:
+        return counts.sum(axis=2)
+    type_index = {t: i for i, t in enumerate(types)}
+    selected = [type_index[t] for t in rule['sail_types'] if t in type_index]
+    return counts[:, :, selected].sum(axis=2)
+
+
+def evaluate_rules(counts, hulls, years, types, rules):
+    """
+    Apply every rule to every hull with array operations.
+
+    A window is checked only when its first year has sails counted by the rule,
+    so each run of purchases is reported once per rule.
+
+    Returns:
+        DataFrame with VIOLATION_COLUMNS, ordered by hull, rule, year
+    """
+    if counts.size == 0:
+        return pd.DataFrame(columns=VIOLATION_COLUMNS)
+
+    all_types = counts.sum(axis=2)
+    # First year with any counted sail, per hull (every hull has at least one)
+    first_year = (all_types > 0).argmax(axis=1)
+    year_index = np.arange(len(years))
+
+    frames = []
+    for order, rule in enumerate(rules):
+        per_year = rule_counts(counts, types, rule)
+
+        window = rule['window']
+        totals = window_totals(per_year, window)
+
+        in_window = ((first_year[:, None] >= year_index[None, :])
+                     & (first_year[:, None] < year_index[None, :] + window))
+        allowed = rule['limit'] + rule['first_year_bonus'] * in_window
+
+        hull_idx, year_idx = np.nonzero((per_year > 0) & (totals > allowed))
+        if not len(hull_idx):
+            continue
+        start = years[year_idx]
+        frames.append(pd.DataFrame({
+            'Hull': [hulls[h] for h in hull_idx],
+            'Year': start if window == 1 else [f"{y}-{y + window - 1}" for y in start],
+            'Count': totals[hull_idx, year_idx],
+            'Allowed': allowed[hull_idx, year_idx],
+            'Violation': rule['name'],
+            '_order': order,
+            '_start': start,
+        }))
+
+    if not frames:
+        return pd.DataFrame(columns=VIOLATION_COLUMNS)
+
+    result = pd.concat(frames, ignore_index=True)
+    result['_hull'] = pd.to_numeric(result['Hull'], errors='coerce')
+    result = result.sort_values(['_hull', 'Hull', '_order', '_start'], kind='stable')
+    return result[VIOLATION_COLUMNS].reset_index(drop=True)
+
+
+def check_limits(df, config):
+    """
+    Evaluate the configured rules against sail tags.
+
+    Args:
+        df: Sail tags with Hull, Year, Sail Type and Notes columns
+        config: Result of load_rules()
+
+    Returns:
+        Violations DataFrame
+    """
+    counted = df[~flag_replacements(df['Notes'], config['replacement_keywords'])]
+    counts, hulls, years, types = build_count_matrix(counted)
+    violations = evaluate_rules(counts, hulls, years, types, config['rules'])
+    logger.info(f"Checked {len(config['rules'])} rules over {counts.shape[0]} hulls x "
+                f"{counts.shape[1]} years x {counts.shape[2]} sail types: {len(violations)} violations")
+    return violations
+
+
+def hull_fingerprints(df):
+    """Order-independent hash of each hull's sail tags: {hull: hex digest}."""
+    columns = [c for c in FINGERPRINT_COLUMNS if c in df.columns]
+    row_hashes = pd.util.hash_pandas_object(df[columns].astype(str), index=False)
+    # uint64 addition wraps, which keeps the sum order-independent
+    sums = row_hashes.groupby(df['Hull'].to_numpy()).agg(
+        lambda s: int(np.add.reduce(s.to_numpy(dtype=np.uint64))))
+    counts = df.groupby('Hull').size()
+    return {str(hull): f"{sums[hull]:016x}:{counts[hull]}" for hull in sums.index}
+
+
+def check_limits_incremental(df, config, state_file):
+    """
+    Re-check only hulls whose sail tags changed since the last run.
+
+    The state file keeps per-hull fingerprints and violations along with the
+    rules digest; a rules change (or no state) triggers a full check.
+
+    Returns:
+        (violations DataFrame for all hulls, list of re-checked hulls)
+    """
+    state_file = Path(state_file)
+    state = load_json(state_file) if state_file.exists() else {}
+    digest = rules_digest(config)
+    fingerprints = hull_fingerprints(df)
+
+    if state.get('rules') != digest:
+        changed = set(fingerprints)
+        cached = pd.DataFrame(columns=VIOLATION_COLUMNS)
+    else:
+        previous = state.get('hulls', {})
+        changed = {hull for hull, fp in fingerprints.items() if previous.get(hull) != fp}
+        cached = pd.DataFrame(state.get('violations', []), columns=VIOLATION_COLUMNS)
+        cached = cached[cached['Hull'].isin(fingerprints.keys() - changed)]
+
+    rechecked = check_limits(df[df['Hull'].isin(changed)], config) if changed else \
+        pd.DataFrame(columns=VIOLATION_COLUMNS)
+    frames = [f for f in (cached, rechecked) if not f.empty]
+    violations = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=VIOLATION_COLUMNS)
+    if not violations.empty:
+        violations = violations.astype({'Count': int, 'Allowed': int})
+        violations['_hull'] = pd.to_numeric(violations['Hull'], errors='coerce')
+        violations = violations.sort_values(['_hull', 'Hull'], kind='stable')[VIOLATION_COLUMNS]
+        violations = violations.reset_index(drop=True)
+
+    records = violations.astype({'Year': str}).to_dict('records')
+    for record in records:
+        if record['Year'].isdigit():
+            record['Year'] = int(record['Year'])
+    save_json({'rules': digest, 'hulls': fingerprints, 'violations': records},
+              state_file, create_backup=False)
+    logger.info(f"Incremental check: {len(changed)} of {len(fingerprints)} hulls re-checked")
+    return violations, sorted(changed, key=lambda h: (not h.isdigit(), int(h) if h.isdigit() else 0, h))
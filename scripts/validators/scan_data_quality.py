@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Sail tag data-quality scanner for Fleet22_us repository
+Reports records the other tools silently drop or ignore: hull 0 sailmaker
+entries, unparsable / placeholder / out-of-range delivery dates, duplicate
+certificate numbers, unknown sail types, sailmaker names missing from the
+alias table and likely spelling variants of them.
+The data is loaded into one DataFrame, sorted by certificate once, and every
+check is a vectorized column operation.
+"""
+import sys
+import argparse
+from datetime import datetime
+from difflib import SequenceMatcher
+from pathlib import Path
+
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.logger import setup_logger
+from utils.data_loader import load_json, save_json
+from utils.path_utils import PROJECT_ROOT, SAILS_FILE
+from utils.sailmakers import SailmakerCanonicalizer, sailmaker_key
+from validators.validate_fleet_data import SCHEMAS
+
+# Setup logging
+logger = setup_logger('data_quality', PROJECT_ROOT / 'logs' / 'scraping.log')
+
+SAIL_TYPES = SCHEMAS['sail_tags.json']['fields']['Sail Type']['choices']
+FIRST_J105_YEAR = 1991
+# Notes explaining why the same certificate appears on two hulls
+TRANSFER_PATTERN = r'\bused\b|\bbot\b|\bbought\b|purchased|\bfrom\b|donated|transfer|sold'
+VARIANT_SIMILARITY = 0.85
+SEVERITIES = ('error', 'warning', 'info')
+
+
+def _findings(frame, check, severity, message, columns=('Hull', 'Certificate No.', 'Delivery Date')):
+    """One finding per row of `frame` (index = record index in sail_tags.json)."""
+    rows = frame[list(columns)].rename_axis('index').reset_index()
+    rows.insert(0, 'message', message)
+    rows.insert(0, 'severity', severity)
+    rows.insert(0, 'check', check)
+    return rows.to_dict('records')
+
+
+def scan_sail_tags(records, today=None):
+    """
+    Scan sail tag records.
+
+    Returns:
+        (findings list, summary dict of counts per check)
+    """
+    today = pd.Timestamp(today or datetime.now().date())
+    df = pd.DataFrame.from_records(records)
+    for column in ('Hull', 'Certificate No.', 'Delivery Date', 'Sail Type', 'Sailmaker', 'Notes'):
+        if column not in df.columns:
+            df[column] = ''
+        df[column] = df[column].fillna('').astype(str)
+
+    # Sort once; duplicate certificates are then adjacent
+    df = df.sort_values('Certificate No.', kind='stable')
+    findings = []
+
+    hull_zero = df[df['Hull'] == '0']
+    findings += _findings(hull_zero, 'hull_zero', 'info', "hull 0 (sailmaker/demo entry)")
+
+    dates = pd.to_datetime(df['Delivery Date'], format='%Y-%m-%d', errors='coerce')
+    placeholder = df['Delivery Date'].isin(['0000-00-00', ''])
+    unparsable = dates.isna() & ~placeholder
+    findings += _findings(df[placeholder], 'unknown_date', 'warning', "delivery date missing or 0000-00-00")
+    findings += _findings(df[unparsable], 'unparsable_date', 'error', "delivery date is not YYYY-MM-DD")
+    findings += _findings(df[dates > today], 'future_date', 'error', "delivery date in the future")
+    findings += _findings(df[dates.dt.year < FIRST_J105_YEAR], 'early_date', 'warning',
+                          f"delivery date before {FIRST_J105_YEAR} (epoch placeholder?)")
+
+    unknown_type = ~df['Sail Type'].isin(SAIL_TYPES)
+    findings += _findings(df[unknown_type], 'unknown_sail_type', 'warning',
+                          f"sail type not one of {', '.join(SAIL_TYPES)}",
+                          columns=('Hull', 'Certificate No.', 'Sail Type'))
+
+    certificate = df['Certificate No.']
+    duplicate = (certificate != '') & (certificate.eq(certificate.shift()) | certificate.eq(certificate.shift(-1)))
+    if duplicate.any():
+        dupes = df[duplicate].rename_axis('index').reset_index()
+        dupes['explained'] = dupes['Notes'].str.contains(TRANSFER_PATTERN, case=False, regex=True)
+        # One finding per certificate; explained when any record notes a transfer
+        groups = dupes.groupby('Certificate No.', sort=False).agg(
+            indexes=('index', list), hulls=('Hull', list), explained=('explained', 'any'))
+        for cert, explained, indexes, hulls in zip(groups.index, groups['explained'],
+                                                   groups['indexes'], groups['hulls']):
+            findings.append({
+                'check': 'duplicate_certificate',
+                'severity': 'info' if explained else 'warning',
+                'index': int(indexes[0]),
+                'message': f"certificate on {len(indexes)} records (hulls {', '.join(hulls)})"
+                           + ("; notes describe a transfer" if explained else ''),
+                'Hull': hulls[0], 'Certificate No.': cert, 'indexes': [int(i) for i in indexes],
+            })
+
+    findings += sailmaker_variants(df['Sailmaker'])
+
+    order = {name: i for i, name in enumerate(SEVERITIES)}
+    findings.sort(key=lambda f: (order[f['severity']], f['check'], f.get('index', -1)))
+    summary = {}
+    for finding in findings:
+        summary[finding['check']] = summary.get(finding['check'], 0) + 1
+    logger.info(f"Scanned {len(df)} sail tags: {len(findings)} findings")
+    return findings, summary
+
+
+def sailmaker_variants(sailmakers):
+    """
+    Findings for sailmaker names the alias table does not recognize, and for
+    those that look like spellings of another name in the data.
+
+    Only the distinct names are compared, so the cost does not grow with the
+    number of records.
+    """
+    counts = sailmakers[sailmakers != ''].value_counts()
+    names = list(counts.index)
+    keys = {name: sailmaker_key(name) for name in names}
+    canonicalizer = SailmakerCanonicalizer()
+    unknown = {name for name in names if not canonicalizer.is_known(name)}
+    findings = [{
+        'check': 'unknown_sailmaker', 'severity': 'warning',
+        'message': f"'{name}' ({counts[name]} tags) is not in the sailmaker alias table",
+        'Sailmaker': name,
+    } for name in names if name in unknown]
+    for i, name in enumerate(names):
+        for other in names[i + 1:]:
+            if name not in unknown and other not in unknown:
+                # The alias table already decides whether two known names are one maker
+                continue
+            a, b = keys[name], keys[other]
+            same = a == b or (a and b and (a.startswith(b + ' ') or b.startswith(a + ' ')))
+            if same or SequenceMatcher(None, a, b).ratio() >= VARIANT_SIMILARITY:
+                # names are ordered by frequency, so `name` is the more common spelling
+                findings.append({
+                    'check': 'sailmaker_variant', 'severity': 'warning',
+                    'message': f"'{other}' ({counts[other]} tags) may be a variant of "
+                               f"'{name}' ({counts[name]} tags)",
+                    'Sailmaker': other, 'canonical': name,
+                })
+    return findings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan sail_tags.json for data-quality problems")
+    parser.add_argument('input_file', type=Path, nargs='?', default=SAILS_FILE,
+                        help=f"Path to sail_tags.json (default: {SAILS_FILE})")
+    parser.add_argument('--output', type=Path, help="Write all findings to this JSON file")
+    parser.add_argument('--examples', type=int, default=5, help="Findings to print per check (default: 5)")
+    parser.add_argument('--fail-on', choices=('error', 'warning', 'never'), default='never',
+                        help="Exit non-zero when findings of this severity exist (default: never)")
+    args = parser.parse_args()
+
+    try:
+        findings, summary = scan_sail_tags(load_json(args.input_file))
+
+        shown = {}
+        for finding in findings:
+            check = finding['check']
+            shown[check] = shown.get(check, 0) + 1
+            if shown[check] > args.examples:
+                continue
+            icon = {'error': '❌', 'warning': '⚠️ ', 'info': '💡'}[finding['severity']]
+            where = f"[{finding['index']}] hull {finding['Hull']}: " if 'index' in finding else ''
+            print(f"   {icon} {check}: {where}{finding['message']}"
+                  + (f" ({finding['Certificate No.']})" if 'Certificate No.' in finding else ''))
+
+        print("\n📄 Summary:")
+        for check, count in summary.items():
+            print(f"   {check}: {count}")
+        if not findings:
+            print("✅ No data-quality findings")
+
+        if args.output:
+            save_json({'generated': datetime.now().isoformat(timespec='seconds'),
+                       'source': str(args.input_file), 'summary': summary, 'findings': findings},
+                      args.output, create_backup=False)
+            print(f"📁 Findings written to: {args.output}")
+
+        failing = {'error': ('error',), 'warning': ('error', 'warning'), 'never': ()}[args.fail_on]
+        return 1 if any(f['severity'] in failing for f in findings) else 0
+
+    except Exception as e:
+        logger.error(f"Error scanning data quality: {e}")
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,18 @@
 #!/usr/bin/env python3
 """
 Data validation script for Fleet22_us repository
-Checks the integrity and structure of scraped JSON data files.
+Checks every record of the scraped JSON data files against per-dataset
+schemas (required fields, types, hull format, ISO dates, allowed values).
+Schemas are compiled once into field checkers, each file is streamed in a
+single pass, and the files are validated in parallel.
 """
 import json
 import os
+import re
 import sys
-import logging
-from datetime import datetime
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
 from pathlib import Path
 
 # Add parent directory to path for imports
@@ -15,9 +20,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from utils.logger import setup_logger
 from utils.path_utils import (
-    PROJECT_ROOT, 
-    BOATS_FILE, 
-    SAILS_FILE, 
+    PROJECT_ROOT,
+    BOATS_FILE,
+    SAILS_FILE,
     MEMBERS_FILE,
     ensure_directories
 )
@@ -25,177 +30,270 @@ from utils.path_utils import (
 # Setup logging
 logger = setup_logger('validator', PROJECT_ROOT / 'logs' / 'scraping.log')
 
+HULL_PATTERN = r'\d+'
+UNKNOWN_DATE = '0000-00-00'  # Placeholder used by the class sail tag listing
+
+# Field specs (values must be strings): required (non-blank) and at most one of
+# pattern/choices/date.
+# `warn_blank` fields may be blank in the source data; blanks are reported as
+# warnings rather than errors (a missing key is still an error). `strict`
+# datasets reject fields not listed.
+SCHEMAS = {
+    'sail_tags.json': {
+        'path': SAILS_FILE,
+        'strict': False,
+        'fields': {
+            'Hull': {'required': True, 'pattern': HULL_PATTERN},
+            'Purchaser': {'required': True},
+            'Certificate No.': {'required': True, 'pattern': r'\d{7}[A-Z]'},
+            'Sailmaker': {'required': True},
+            'Delivery Date': {'required': True, 'date': True},
+            'Sail Type': {'choices': ('M', 'J', 'S89', 'S77'), 'warn_blank': True},
+            'Fleet': {'pattern': HULL_PATTERN},
+            'Notes': {},
+        },
+    },
+    'j105_members_status.json': {
+        'path': MEMBERS_FILE,
+        'strict': False,
+        'fields': {
+            'Hull': {'required': True, 'pattern': HULL_PATTERN},
+            'Owners/Helmsmen': {'required': True, 'warn_blank': True},
+            'Status': {'required': True, 'choices': ('OW', 'CO', 'AM')},
+            'Boat Name': {},
+            'Location': {},
+            'Fleet': {'pattern': HULL_PATTERN},
+            'Class Membership': {'pattern': r'((Member|Associate) \d{4})?'},
+        },
+    },
+    'boats_fleet22.json': {
+        'path': BOATS_FILE,
+        'strict': True,
+        'fields': {
+            'Hull Number': {'required': True, 'pattern': HULL_PATTERN},
+            'Boat Name': {'required': True},
+            'Fleet Dues': {'required': True, 'choices': ('Paid', 'Not Paid')},
+            'Yacht Club': {},
+            'Class Dues': {'required': True, 'choices': ('Paid', 'Not Paid')},
+        },
+    },
+}
+
+
+def _iso_date(value):
+    if value == UNKNOWN_DATE:
+        return 'warning', "unknown date placeholder"
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return 'error', f"not an ISO date (YYYY-MM-DD): {value!r}"
+    return None
+
+
+def compile_schema(schema):
+    """
+    Turn a schema spec into a list of (field, check) pairs.
+
+    Each check takes the raw field value and returns None or a
+    (severity, message) tuple.
+    """
+    checkers = []
+    for field, spec in schema['fields'].items():
+        required = spec.get('required', False)
+        warn_blank = spec.get('warn_blank', False)
+        if 'pattern' in spec:
+            regex = re.compile(spec['pattern'])
+            value_check = lambda v, regex=regex: (
+                None if regex.fullmatch(v) else ('error', f"does not match {regex.pattern}: {v!r}"))
+        elif 'choices' in spec:
+            choices = frozenset(spec['choices'])
+            allowed = ', '.join(spec['choices'])
+            value_check = lambda v, choices=choices, allowed=allowed: (
+                None if v in choices else ('error', f"{v!r} not one of {allowed}"))
+        elif spec.get('date'):
+            value_check = _iso_date
+        else:
+            value_check = None
+
+        def check(value, required=required, warn_blank=warn_blank, value_check=value_check):
+            if value is None:
+                return ('error', "missing") if required else None
+            if not isinstance(value, str):
+                return 'error', f"expected string, got {type(value).__name__}"
+            if not value.strip():
+                if warn_blank:
+                    return 'warning', "blank"
+                return ('error', "blank") if required else None
+            return value_check(value) if value_check else None
+
+        checkers.append((field, check))
+    return checkers
+
+
+def iter_records(filepath):
+    """
+    Yield (index, record) from a JSON array file, decoding one element at a time.
+
+    Raises:
+        ValueError: If the file is not a JSON array or an element is malformed
+    """
+    decoder = json.JSONDecoder()
+    with open(filepath, 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    ws = re.compile(r'[\s,]*')
+    pos = ws.match(text, 0).end()
+    if not text.startswith('[', pos):
+        raise ValueError("top level should be a list")
+    pos = ws.match(text, pos + 1).end()
+    index = 0
+    while not text.startswith(']', pos):
+        try:
+            record, pos = decoder.raw_decode(text, pos)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"invalid JSON at record {index}: {e}") from None
+        yield index, record
+        index += 1
+        pos = ws.match(text, pos).end()
+        if pos >= len(text):
+            raise ValueError("unterminated list")
+
+
+def validate_file(name, filepath=None, max_errors=None):
+    """
+    Validate every record of one data file.
+
+    Args:
+        name: Key into SCHEMAS
+        filepath: Override the schema's default path
+        max_errors: Stop after this many errors (budget mode)
+
+    Returns:
+        Dict with name, path, records, errors and warnings; each issue is
+        (record index, field, message), index None for file-level problems
+    """
+    schema = SCHEMAS[name]
+    filepath = Path(filepath or schema['path'])
+    result = {'name': name, 'path': str(filepath), 'records': 0,
+              'errors': [], 'warnings': [], 'truncated': False}
+
+    if not validate_file_exists(filepath):
+        result['errors'].append((None, None, "file missing or empty"))
+        return result
+
+    checkers = compile_schema(schema)
+    known = set(schema['fields'])
+    errors, warnings = result['errors'], result['warnings']
+
+    try:
+        for index, record in iter_records(filepath):
+            result['records'] += 1
+            if not isinstance(record, dict):
+                errors.append((index, None, f"expected object, got {type(record).__name__}"))
+            else:
+                for field, check in checkers:
+                    issue = check(record.get(field))
+                    if issue:
+                        (errors if issue[0] == 'error' else warnings).append((index, field, issue[1]))
+                if schema['strict']:
+                    for field in record.keys() - known:
+                        errors.append((index, field, "unexpected field"))
+            if max_errors and len(errors) >= max_errors:
+                result['truncated'] = True
+                del errors[max_errors:]
+                break
+    except ValueError as e:
+        errors.append((None, None, str(e)))
+
+    if result['records'] == 0 and not errors:
+        warnings.append((None, None, "no records"))
+    return result
+
+
 def validate_file_exists(filepath):
     """Check if a file exists and is not empty."""
     if not os.path.exists(filepath):
         logger.error(f"File not found: {filepath}")
         return False
-    
+
     if os.path.getsize(filepath) == 0:
         logger.error(f"File is empty: {filepath}")
         return False
-    
-    return True
 
-def validate_json_format(filepath):
-    """Check if a file contains valid JSON."""
-    try:
-        with open(filepath, 'r') as f:
-            json.load(f)
-        return True
-    except json.JSONDecodeError as e:
-        logger.error(f"Invalid JSON in {filepath}: {str(e)}")
-        return False
+    return True
 
-def validate_sail_tags_data(filepath):
-    """Validate the structure of sail_tags.json."""
-    try:
-        with open(filepath, 'r') as f:
-            data = json.load(f)
-        
-        if not isinstance(data, list):
-            logger.error(f"Sail tags data should be a list: {filepath}")
-            return False
-        
-        if len(data) == 0:
-            logger.warning(f"Sail tags data is empty: {filepath}")
-            return True  # Empty is valid, just suspicious
-        
-        # Print out the keys in the first item to help debug
-        first_item = data[0]
-        logger.info(f"First sail_tags.json item has keys: {list(first_item.keys())}")
-        
-        # Be more flexible with field names
-        hull_fields = ["Hull", "Hull #", "Hull Number"]
-        has_hull = any(field in first_item for field in hull_fields)
-        
-        owner_fields = ["Purchaser", "Owner", "Owners/Helmsmen"]
-        has_owner = any(field in first_item for field in owner_fields)
-        
-        if not (has_hull and has_owner):
-            logger.error(f"Missing required fields in sail tags data. Needs hull and owner information.")
-            logger.error(f"Available fields: {list(first_item.keys())}")
-            return False
-        
-        return True
-    except Exception as e:
-        logger.error(f"Error validating sail tags data {filepath}: {str(e)}")
-        return False
 
-def validate_membership_data(filepath):
-    """Validate the structure of j105_members_status.json."""
-    try:
-        with open(filepath, 'r') as f:
-            data = json.load(f)
-        
-        if not isinstance(data, list):
-            logger.error(f"Membership data should be a list: {filepath}")
-            return False
-        
-        if len(data) == 0:
-            logger.warning(f"Membership data is empty: {filepath}")
-            return True  # Empty is valid, just suspicious
-        
-        # Print out the keys in the first item to help debug
-        first_item = data[0]
-        logger.info(f"First j105_members_status.json item has keys: {list(first_item.keys())}")
-        
-        # Be more flexible with field names
-        hull_fields = ["Hull", "Hull #", "Hull Number"]
-        has_hull = any(field in first_item for field in hull_fields)
-        
-        owner_fields = ["Owner", "Owners/Helmsmen", "Owner Name"]
-        has_owner = any(field in first_item for field in owner_fields)
-        
-        if not (has_hull and has_owner):
-            logger.error(f"Missing required fields in membership data. Needs hull and owner information.")
-            logger.error(f"Available fields: {list(first_item.keys())}")
-            return False
-        
-        return True
-    except Exception as e:
-        logger.error(f"Error validating membership data {filepath}: {str(e)}")
-        return False
+def _format_issue(name, issue):
+    index, field, message = issue
+    location = name if index is None else f"{name}[{index}]"
+    if field:
+        location += f".{field}"
+    return f"{location}: {message}"
 
-def validate_fleet_boats_data(filepath):
-    """Validate the structure of boats_fleet22.json."""
-    try:
-        with open(filepath, 'r') as f:
-            data = json.load(f)
-        
-        if not isinstance(data, list):
-            logger.error(f"Fleet boats data should be a list: {filepath}")
-            return False
-        
-        if len(data) == 0:
-            logger.warning(f"Fleet boats data is empty: {filepath}")
-            return True  # Empty is valid, just suspicious
-        
-        # Print out the keys in the first item to help debug
-        first_item = data[0]
-        logger.info(f"First boats_fleet22.json item has keys: {list(first_item.keys())}")
-        
-        # Be more flexible with field names
-        hull_fields = ["Hull", "Hull #", "Hull Number"]
-        has_hull = any(field in first_item for field in hull_fields)
-        
-        boat_name_fields = ["Boat Name", "Name"]
-        has_boat_name = any(field in first_item for field in boat_name_fields)
-        
-        if not (has_hull and has_boat_name):
-            logger.error(f"Missing required fields in fleet boats data. Needs hull and boat name information.")
-            logger.error(f"Available fields: {list(first_item.keys())}")
-            return False
-        
-        return True
-    except Exception as e:
-        logger.error(f"Error validating fleet boats data {filepath}: {str(e)}")
-        return False
 
-def run_validations():
+def run_validations(names=None, max_errors=None, workers=None, show_warnings=False):
     """Run all validations and return overall status."""
     logger.info("Starting data validation...")
-    
+
     # Ensure directories exist
     ensure_directories()
-    
+
+    names = list(names or SCHEMAS)
+    if workers == 1 or len(names) == 1:
+        results = [validate_file(name, max_errors=max_errors) for name in names]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or len(names)) as pool:
+            results = list(pool.map(validate_file, names, [None] * len(names),
+                                    [max_errors] * len(names)))
+
     validation_status = True
-    
-    # Files to validate with their new paths
-    files_to_validate = {
-        'sail_tags.json': (SAILS_FILE, validate_sail_tags_data),
-        'j105_members_status.json': (MEMBERS_FILE, validate_membership_data),
-        'boats_fleet22.json': (BOATS_FILE, validate_fleet_boats_data)
-    }
-    
-    for filename, (filepath, validation_func) in files_to_validate.items():
-        logger.info(f"Validating: {filepath}")
-        
-        # Check if file exists and is not empty
-        if not validate_file_exists(filepath):
-            validation_status = False
-            continue
-        
-        # Check if file contains valid JSON
-        if not validate_json_format(filepath):
-            validation_status = False
-            continue
-        
-        # Validate the structure of the data
-        if not validation_func(filepath):
+    for result in results:
+        name, errors, warnings = result['name'], result['errors'], result['warnings']
+        for issue in errors:
+            logger.error(_format_issue(name, issue))
+            print(f"   ❌ {_format_issue(name, issue)}")
+        for issue in warnings:
+            logger.warning(_format_issue(name, issue))
+            if show_warnings:
+                print(f"   ⚠️  {_format_issue(name, issue)}")
+
+        summary = f"{name}: {result['records']} records, {len(errors)} errors, {len(warnings)} warnings"
+        if result['truncated']:
+            summary += f" (stopped after {max_errors} errors)"
+        if errors:
             validation_status = False
+            print(f"❌ {summary}")
         else:
-            logger.info(f"✅ {filename} passed validation.")
-    
+            logger.info(f"✅ {name} passed validation.")
+            print(f"✅ {summary}")
+
     if validation_status:
         logger.info("All data files are valid.")
         print("✅ All data files are valid.")
     else:
         logger.error("One or more data files are invalid.")
         print("❌ One or more data files are invalid. See logs for details.")
-    
+
     return validation_status
 
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate Fleet 22 data files record by record")
+    parser.add_argument('--file', nargs='+', choices=list(SCHEMAS), help="Only validate these files")
+    parser.add_argument('--max-errors', type=int, help="Stop each file after N errors")
+    parser.add_argument('--workers', type=int, help="Worker processes (1 = validate in-process)")
+    parser.add_argument('--show-warnings', action='store_true', help="Print warnings as well as errors")
+    args = parser.parse_args()
+
+    try:
+        success = run_validations(args.file, max_errors=args.max_errors,
+                                  workers=args.workers, show_warnings=args.show_warnings)
+        return 0 if success else 1
+    except Exception as e:
+        logger.error(f"Error validating data: {e}")
+        print(f"❌ Error: {e}")
+        return 1
+
+
 if __name__ == "__main__":
-    success = run_validations()
-    sys.exit(0 if success else 1)
\ No newline at end of file
+    sys.exit(main())